@@ -0,0 +1,95 @@
+from lexico import Lexico
+from gramatica import Gramatica
+
+
+class Acciones:
+    #Acciones semánticas que corren dentro del ciclo del parser (oyente de Lexico.parse):
+    #se registran funciones por símbolo y se llaman en el mismo paso que la expansión o la
+    #coincidencia, sin recorrer después el árbol ni tener que crearlo.
+    #  - al_expandir(no_terminal, fn): fn(no_terminal, producción)
+    #  - al_coincidir(terminal, fn): fn(token) con el dict {"type","lexeme","line","col"}
+    #  - al_insertar(símbolo, fn): fn(símbolo) cuando el parser da por insertado un terminal faltante
+    #    o, en recuperación de modo pánico, descarta un no terminal sin expandirlo
+    #Con el símbolo TODOS (None) la acción se registra para todos los símbolos. Se pueden
+    #encadenar otros oyentes (p. ej. nodos_ast.ConstructorAST) para que reciban los mismos eventos.
+    #El parser solo arma el token de los terminales que devuelve terminales().
+    TODOS = None
+
+    def __init__(self, *oyentes):
+        self._expandir = {}
+        self._coincidir = {}
+        self._insertar = {}
+        self.oyentes = list(oyentes)
+
+    @staticmethod
+    def _registrar(tabla, simbolos, fn):
+        if simbolos is None or isinstance(simbolos, str):
+            simbolos = (simbolos,)
+        for s in simbolos:
+            tabla.setdefault(s, []).append(fn)
+
+    def _decorar(self, tabla, simbolos, fn):
+        #Registra fn, o devuelve un decorador si no se pasó ninguna función
+        if fn is None:
+            def decorador(f):
+                Acciones._registrar(tabla, simbolos, f)
+                return f
+            return decorador
+        Acciones._registrar(tabla, simbolos, fn)
+        return fn
+
+    def al_expandir(self, simbolos, fn=None):
+        for s in ((simbolos,) if simbolos is None or isinstance(simbolos, str) else simbolos):
+            if s != Acciones.TODOS and not Lexico.is_nonterminal(s):
+                raise ValueError(f"'{s}' no es un no terminal de la gramática")
+        return self._decorar(self._expandir, simbolos, fn)
+
+    def al_coincidir(self, simbolos, fn=None):
+        return self._decorar(self._coincidir, simbolos, fn)
+
+    def al_insertar(self, simbolos, fn=None):
+        return self._decorar(self._insertar, simbolos, fn)
+
+    def terminales(self):
+        #Terminales con alguna acción de coincidencia, o None si hacen falta todos
+        #(una acción con TODOS o un oyente encadenado que no filtra)
+        if Acciones.TODOS in self._coincidir:
+            return None
+        nombres = set(self._coincidir)
+        for o in self.oyentes:
+            extra = o.terminales() if hasattr(o, "terminales") else None
+            if extra is None:
+                return None
+            nombres.update(extra)
+        return nombres
+
+    #Eventos del parser: cada uno busca solo las acciones de su símbolo
+    def expandir(self, sym, prod):
+        for fn in self._expandir.get(sym, ()):
+            fn(sym, prod)
+        for fn in self._expandir.get(Acciones.TODOS, ()):
+            fn(sym, prod)
+        for o in self.oyentes:
+            o.expandir(sym, prod)
+
+    def coincidir(self, token):
+        for fn in self._coincidir.get(token["type"], ()):
+            fn(token)
+        for fn in self._coincidir.get(Acciones.TODOS, ()):
+            fn(token)
+        for o in self.oyentes:
+            o.coincidir(token)
+
+    def insertar(self, sym):
+        for fn in self._insertar.get(sym, ()):
+            fn(sym)
+        for fn in self._insertar.get(Acciones.TODOS, ()):
+            fn(sym)
+        for o in self.oyentes:
+            o.insertar(sym)
+
+    def ejecutar(self, tokens, gram=None, arbol=False, record="none", recuperacion="token"):
+        #Parsea tokens disparando las acciones; por defecto sin árbol de derivación
+        gram = gram or Gramatica.compilar()
+        return Lexico.parse(tokens, gram.first, gram.follow, gram.compilada, record=record, oyente=self, arbol=arbol,
+                            recuperacion=recuperacion)
@@ -0,0 +1,71 @@
+from array import array
+
+
+class AlmacenTokens:
+    #Secuencia de tokens guardada en columnas paralelas en lugar de un dict por token:
+    #tipo (id entero), línea, columna y el rango [inicio, fin) del lexema en el texto.
+    #Los lexemas se obtienen cortando el texto solo cuando se piden.
+    def __init__(self, text, nombres):
+        self.text = text
+        self.nombres = nombres
+        self.types = array("i")
+        self.lines = array("i")
+        self.cols = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+
+    @staticmethod
+    def desde_columnas(text, nombres, types, lines, cols, starts, ends):
+        #Crea un almacén a partir de columnas ya construidas (sin copiarlas)
+        t = AlmacenTokens(text, nombres)
+        t.types, t.lines, t.cols, t.starts, t.ends = types, lines, cols, starts, ends
+        return t
+
+    def agregar(self, tipo, line, col, start, end):
+        #Agrega un token a partir del id de su tipo y su rango en el texto
+        self.types.append(tipo)
+        self.lines.append(line)
+        self.cols.append(col)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        #Devuelve el token como dict, igual que el formato original del lexer
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self.types)))]
+        if i < 0:
+            i += len(self.types)
+        if i < 0 or i >= len(self.types):
+            raise IndexError("token fuera de rango")
+        return {"type": self.nombres[self.types[i]], "lexeme": self.text[self.starts[i]:self.ends[i]],
+                "line": self.lines[i], "col": self.cols[i]}
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self[i]
+
+    def tipo(self, i):
+        return self.nombres[self.types[i]]
+
+    def lexema(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def tipos(self):
+        #Nombres de tipo de todos los tokens, sin construir los dicts
+        nombres = self.nombres
+        return [nombres[t] for t in self.types]
+
+    def lexemas(self):
+        #Lexemas de todos los tokens, cortados del texto en una sola pasada
+        return list(map(self.text.__getitem__, map(slice, self.starts, self.ends)))
+
+    def orden_tipos(self):
+        #Para cada token, la posición de su tipo en el orden alfabético de los nombres:
+        #ordenar por esta columna es ordenar por nombre de tipo sin comparar cadenas
+        rango = [0] * len(self.nombres)
+        for r, t in enumerate(sorted(range(len(self.nombres)), key=self.nombres.__getitem__)):
+            rango[t] = r
+        return array("i", map(rango.__getitem__, self.types))
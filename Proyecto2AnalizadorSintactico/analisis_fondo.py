@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from lexico import Lexico
+from gramatica import Gramatica
+from acciones import Acciones
+from tabla_simbolos import TablaSimbolos
+
+
+class Cancelado(Exception):
+    #Se lanza dentro del hilo de análisis cuando se pidió cancelarlo
+    pass
+
+
+class AnalisisFondo:
+    #Análisis completo (lexer, gramática, parser con tabla de símbolos y errores.txt) en un
+    #hilo aparte, para que el mainloop de Tk nunca se bloquee. No toca ningún widget: todo
+    #llega a la interfaz como mensajes en self.cola, que se vacía con pendientes() desde after():
+    #  ("progreso", {"etapa", "hecho", "total", "tokens"}), ("resultado", dict),
+    #  ("cancelado",) o ("error", excepción)
+    #Es un hilo y no un proceso porque el resultado (tokens y pasos de la animación) sería caro
+    #de serializar; el GIL se alterna con el mainloop cada pocos milisegundos. El parser no crea
+    #el árbol de derivación: millones de nodos harían que cada pasada del recolector de ciclos
+    #detuviera también al mainloop. Los pasos (arreglos de enteros) lo rehacen en el hilo de Tk
+    #solo hasta el paso que se muestra (Historial.arbol_en, Historial.arbol_final).
+    #La cancelación se revisa en cada aviso de progreso del lexer y del parser (en el parser,
+    #en las fronteras entre miembros o sentencias, sin oír cada token coincidido).
+    #Con incremental (un AnalisisIncremental nuevo, sin compartir) se hace su análisis completo
+    #inicial y el resultado lo incluye en "incremental", listo para las ediciones siguientes.
+    #Segundos mínimos entre dos mensajes de progreso de la misma etapa
+    INTERVALO = 0.05
+    #Tokens del parser entre dos revisiones de cancelación
+    CADA_TOKENS = 2048
+
+    def __init__(self, code, lexico=None, errores_path="errores.txt", incremental=None):
+        self.code = code
+        self.lexico = lexico or Lexico()
+        self.errores_path = errores_path
+        self.incremental = incremental
+        self.cola = queue.Queue()
+        self._cancelar = threading.Event()
+        self._ultimo = 0.0
+        self.hilo = threading.Thread(target=self._trabajar, name="AnalisisFondo", daemon=True)
+
+    def iniciar(self):
+        self.hilo.start()
+        return self
+
+    def cancelar(self):
+        #El hilo se detiene en el próximo aviso de progreso; sus mensajes ya no importan
+        self._cancelar.set()
+
+    @property
+    def cancelado(self):
+        return self._cancelar.is_set()
+
+    def pendientes(self):
+        #Mensajes disponibles, sin esperar (se llama desde el hilo de Tk)
+        mensajes = []
+        while True:
+            try:
+                mensajes.append(self.cola.get_nowait())
+            except queue.Empty:
+                return mensajes
+
+    def _progreso(self, etapa, hecho, total, tokens=None, forzar=False):
+        if self._cancelar.is_set():
+            raise Cancelado()
+        ahora = time.perf_counter()
+        if forzar or ahora - self._ultimo >= AnalisisFondo.INTERVALO:
+            self._ultimo = ahora
+            self.cola.put(("progreso", {"etapa": etapa, "hecho": hecho, "total": total, "tokens": tokens}))
+
+    def _trabajar(self):
+        try:
+            if self.incremental is not None:
+                res = ("resultado", self._analizar_incremental())
+            else:
+                res = ("resultado", self._analizar())
+        except Cancelado:
+            res = ("cancelado",)
+        except Exception as ex:
+            res = ("error", ex)
+        self.cola.put(res)
+
+    def _analizar_incremental(self):
+        res = self.incremental.analizar(self.code, progreso=self._progreso)
+        res["incremental"] = self.incremental
+        return res
+
+    def _analizar(self):
+        code = self.code
+        total = len(code)
+        lex = self.lexico.lexer(code, progreso=lambda n, pos: self._progreso("lexer", pos, total, n))
+        tokens = lex["tokens"]
+        self._progreso("gramatica", 0, 0, len(tokens), forzar=True)
+        gram = Gramatica.compilar()
+
+        #Parser con la tabla de símbolos (solo oye los terminales que usa, así no se arma un
+        #dict por token); el progreso y la cancelación van en las fronteras entre miembros y
+        #entre sentencias
+        n_tokens = len(tokens)
+        siguiente = [AnalisisFondo.CADA_TOKENS]
+
+        def frontera(ip, nodos, n_errores, n_usadas):
+            if ip >= siguiente[0]:
+                siguiente[0] = ip + AnalisisFondo.CADA_TOKENS
+                self._progreso("parser", ip, n_tokens, n_tokens)
+            return False
+
+        tabla_simbolos = TablaSimbolos()
+        self._progreso("parser", 0, n_tokens, n_tokens, forzar=True)
+        parse_res = Lexico.parse(tokens, gram.first, gram.follow, gram.compilada, arbol=False,
+                                 en_frontera=frontera, oyente=tabla_simbolos.registrar(Acciones()))
+        self._progreso("errores", 0, 0, n_tokens, forzar=True)
+
+        #Exporta errores a archivo de texto
+        aviso = None
+        errores_lines = [f"[LEX] L{e['line']} C{e['col']}: {e['msg']}" for e in lex["errors"]]
+        errores_lines += [f"[SINTAX] L{e['line']} C{e['col']}: {e['msg']}" for e in parse_res["errors"]]
+        if errores_lines and self.errores_path:
+            try:
+                with open(self.errores_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(errores_lines))
+            except Exception as ex:
+                aviso = f"Error al escribir {self.errores_path}: {ex}"
+        return {"lex": lex, "parse": parse_res, "gram": gram, "tabla_simbolos": tabla_simbolos,
+                "resumen": tabla_simbolos.resumen(tokens), "aviso": aviso}
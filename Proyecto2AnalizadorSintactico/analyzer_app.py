@@ -1,15 +1,27 @@
 import customtkinter as ctk
 import tkinter as tk
+from collections import Counter
 from tkinter import ttk
 from lector import Lector
 from lexico import Lexico
 from tabla import Tabla
 from arbol import Arbol
+from incremental import AnalisisIncremental
+from imagen_arbol import ImagenArbol
+from lista_virtual import ListaVirtual
+from analisis_fondo import AnalisisFondo
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("dark-blue")
 
+DOT_FILETYPES = [("Graphviz DOT", "*.dot"), ("All files", "*.*")]
+
 class AnalyzerApp(ctk.CTk):
+    #Milisegundos entre dos revisiones de la cola del análisis en segundo plano
+    POLL_MS = 50
+    #Tokens que una edición en vivo puede re-lexar o re-parsear en el hilo de Tk sin resincronizar
+    LIMITE_VIVO = 2000
+
     def __init__(self):
         super().__init__()
         self.title("Analizador Funciones Java - LL(1)")
@@ -43,14 +55,39 @@ class AnalyzerApp(ctk.CTk):
         ctk.CTkButton(btns, text="📝 Ejemplo", command=self.load_example, width=100).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="▶ Analizar", fg_color="#1f6aa5", command=self.run, width=100).pack(side="left", padx=4)
         
-        #Panel central: resultados del análisis
-        ctk.CTkLabel(self.center, text="Tokens", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w")
-        self.tokens_box = ctk.CTkTextbox(self.center, height=140, font=("Consolas", 10))
-        self.tokens_box.pack(fill="x", pady=(4,10), padx=5)
+        #Progreso del análisis en segundo plano (volver a Analizar cancela el que está en curso)
+        self.progreso_bar = ctk.CTkProgressBar(self.left)
+        self.progreso_bar.set(0)
+        self.progreso_bar.pack(fill="x", padx=5, pady=(0,4))
+        self.estado_label = ctk.CTkLabel(self.left, text="", anchor="w")
+        self.estado_label.pack(fill="x", padx=5)
+        
+        #Modo en vivo: re-analiza solo la región editada mientras se escribe
+        self.live_var = tk.BooleanVar(value=False)
+        ctk.CTkSwitch(self.left, text="En vivo", variable=self.live_var, command=self.toggle_live).pack(anchor="w", padx=5)
+        self.text_input.bind("<KeyRelease>", self.on_edit)
+        
+        #Panel central: resultados del análisis (listas virtualizadas, ver lista_virtual.py)
+        tokens_header = ctk.CTkFrame(self.center, fg_color="transparent")
+        tokens_header.pack(fill="x")
+        ctk.CTkLabel(tokens_header, text="Tokens", font=ctk.CTkFont(size=14, weight="bold")).pack(side="left")
+        self.tipo_var = tk.StringVar(value="Todos")
+        tipos = ["Todos"] + [t for t in Lexico.TERMINALS if t != "$"]
+        ctk.CTkOptionMenu(tokens_header, values=tipos, variable=self.tipo_var, command=self.filtrar_tokens,
+                          width=110).pack(side="right", padx=5)
+        ctk.CTkLabel(tokens_header, text="Tipo:").pack(side="right")
+        tokens_frame = ctk.CTkFrame(self.center)
+        tokens_frame.pack(fill="x", pady=(4,2), padx=5)
+        self.tokens_list = ListaVirtual(tokens_frame, [("Lexema", 160), ("Tipo", 90), ("Línea", 60), ("Col", 60)],
+                                        filas=6, style="Lista.Treeview")
+        self.resumen_label = ctk.CTkLabel(self.center, text="", anchor="w", font=("Consolas", 10))
+        self.resumen_label.pack(fill="x", padx=5, pady=(0,6))
         
         ctk.CTkLabel(self.center, text="Errores", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w")
-        self.errors_box = ctk.CTkTextbox(self.center, height=110, font=("Consolas", 10))
-        self.errors_box.pack(fill="x", pady=(4,10), padx=5)
+        errors_frame = ctk.CTkFrame(self.center)
+        errors_frame.pack(fill="x", pady=(4,10), padx=5)
+        self.errors_list = ListaVirtual(errors_frame, [("Origen", 70), ("Línea", 60), ("Col", 60), ("Mensaje", 400)],
+                                        filas=4, style="Lista.Treeview")
         
         #Tabla LL(1) con scrollbars
         ctk.CTkLabel(self.center, text="Tabla LL(1)", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w")
@@ -84,6 +121,7 @@ class AnalyzerApp(ctk.CTk):
         style.configure("Treeview", background="#0b1220", fieldbackground="#0b1220", foreground="#e5e7eb", rowheight=26, bordercolor="#1f2937", borderwidth=0)
         style.configure("Treeview.Heading", background="#111827", foreground="#f3f4f6", relief="flat")
         style.map("Treeview.Heading", background=[("active", "#1f2937")])
+        style.configure("Lista.Treeview", rowheight=20, font=("Consolas", 10))
         
         #Árbol de Derivación =====
         tab2 = self.tabs.tab("Árbol de Derivación")
@@ -100,12 +138,15 @@ class AnalyzerApp(ctk.CTk):
         ctk.CTkButton(ctrls, text="⏭", command=self.next_step, width=60).pack(side="left", padx=3)
         ctk.CTkButton(ctrls, text="▶", command=self.play, width=60).pack(side="left", padx=3)
         ctk.CTkButton(ctrls, text="⏸", command=self.pause, width=60).pack(side="left", padx=3)
+        self.compact_var = tk.BooleanVar(value=False)
+        ctk.CTkSwitch(ctrls, text="Compacto", variable=self.compact_var, command=self.toggle_compact).pack(side="left", padx=8)
         
         #Botones de exportación
         ex = ctk.CTkFrame(tab2)
         ex.pack(pady=6, fill="x", padx=5)
         ctk.CTkButton(ex, text="💾 Exportar .DOT", command=self.export_dots).pack(fill="x", pady=2)
         ctk.CTkButton(ex, text="🖼️ Exportar PNG", command=self.export_png).pack(fill="x", pady=2)
+        ctk.CTkButton(ex, text="🖼️ Exportar SVG", command=self.export_svg).pack(fill="x", pady=2)
         ctk.CTkButton(ex, text="💾 Exportar AST .DOT", command=self.export_ast).pack(fill="x", pady=2)
         ctk.CTkButton(ex, text="📤 Exportar tabla_transicion.txt", command=self.export_table).pack(fill="x", pady=2)
         
@@ -115,6 +156,16 @@ class AnalyzerApp(ctk.CTk):
         self.animating = False
         self.last_analysis = {}
         self._last_table_dict = None
+        self.incremental = AnalisisIncremental(self.lexico)
+        self._live_job = None
+        #Análisis completo en curso y primer análisis del modo en vivo en curso (analisis_fondo.py)
+        self.trabajo = None
+        self.trabajo_vivo = None
+        self._poll_job = None
+        #Fuentes de las listas: almacén de tokens, errores (léxicos, sintácticos) y avisos de la app
+        self._tokens = None
+        self._errores = ([], [])
+        self._avisos = []
 
     def load_file(self):
         contenido = Lector.cargar_archivo()
@@ -128,36 +179,83 @@ class AnalyzerApp(ctk.CTk):
         self.text_input.insert(tk.END, ex)
 
     def run(self):
-        #Ejecuta el análisis léxico y sintáctico completo
+        #Lanza el análisis completo en un hilo (analisis_fondo.py); si ya había uno en curso
+        #se cancela y se empieza de nuevo con el texto actual
+        if self.trabajo is not None:
+            self.trabajo.cancelar()
         code = self.text_input.get("1.0", tk.END)
-        lex = self.lexico.lexer(code)
-        
-        #Muestra tokens encontrados
-        self.tokens_box.delete("1.0", tk.END)
-        self.errors_box.delete("1.0", tk.END)
-        for t in lex["tokens"]:
-            self.tokens_box.insert(tk.END, f'{t["lexeme"]} : {t["type"]} (L{t["line"]})\n')
-        
-        #Muestra errores léxicos
-        for e in lex["errors"]:
-            self.errors_box.insert(tk.END, f'Error: {e["msg"]} L{e["line"]} C{e["col"]}\n')
-        
-        #Calcula FIRST, FOLLOW y construye la tabla LL(1)
-        FIRST = Lexico.compute_first()
-        FOLLOW = Lexico.compute_follow(FIRST)
-        table, conflicts = Tabla.build_table(FIRST, FOLLOW)
-        
-        #Ejecuta el parser
-        parse_res = Lexico.parse(lex["tokens"], FIRST, FOLLOW, table)
+        self.trabajo = AnalisisFondo(code, self.lexico).iniciar()
+        self.esperar_trabajo()
+
+    def esperar_trabajo(self):
+        self.estado_label.configure(text="Analizando...")
+        self.progreso_bar.set(0)
+        if self._poll_job is None:
+            self._poll_job = self.after(AnalyzerApp.POLL_MS, self.poll_trabajo)
+
+    def poll_trabajo(self):
+        #Revisa las colas de los análisis en curso desde el mainloop; los mensajes de uno
+        #cancelado se ignoran porque ya no está en su lugar
+        self._poll_job = None
+        if self.trabajo is not None and self.revisar_trabajo(self.trabajo):
+            self.trabajo = None
+        if self.trabajo_vivo is not None and self.revisar_trabajo(self.trabajo_vivo):
+            self.trabajo_vivo = None
+        if self.trabajo is not None or self.trabajo_vivo is not None:
+            self._poll_job = self.after(AnalyzerApp.POLL_MS, self.poll_trabajo)
+
+    def revisar_trabajo(self, trabajo):
+        #Procesa los mensajes de un análisis; devuelve True si ya terminó
+        progreso = None
+        for msg in trabajo.pendientes():
+            if msg[0] == "progreso":
+                progreso = msg[1]
+            elif msg[0] == "resultado":
+                self.estado_label.configure(text="")
+                self.progreso_bar.set(1)
+                if "incremental" in msg[1]:
+                    self.incremental = msg[1]["incremental"]
+                    self.mostrar_vivo(msg[1])
+                else:
+                    self.mostrar_analisis(msg[1])
+                return True
+            elif msg[0] == "error":
+                self.estado_label.configure(text="")
+                self.avisar(f"Error en el análisis: {msg[1]}")
+                return True
+        if progreso is not None:
+            self.mostrar_progreso(progreso)
+        return False
+
+    def mostrar_progreso(self, p):
+        #Tokens leídos por el lexer o tokens coincididos por el parser
+        if p["etapa"] == "lexer":
+            texto = f"Léxico: {p['tokens']:,} tokens ({p['hecho'] * 100 // max(1, p['total'])}%)"
+            fraccion = 0.5 * p["hecho"] / max(1, p["total"])
+        elif p["etapa"] == "parser":
+            texto = f"Parser: {p['hecho']:,} / {p['total']:,} tokens"
+            fraccion = 0.5 + 0.5 * p["hecho"] / max(1, p["total"])
+        else:
+            texto = "Gramática..." if p["etapa"] == "gramatica" else "Guardando errores..."
+            fraccion = 0.5 if p["etapa"] == "gramatica" else 1.0
+        self.estado_label.configure(text=texto)
+        self.progreso_bar.set(fraccion)
+
+    def mostrar_analisis(self, res):
+        #Muestra en la interfaz el resultado de AnalisisFondo (en el hilo de Tk)
+        lex, parse_res, gram = res["lex"], res["parse"], res["gram"]
+        table, conflicts = gram.table, gram.conflicts
+        self.tabla_simbolos = res["tabla_simbolos"]
         
-        #Muestra errores sintácticos
-        for e in parse_res["errors"]:
-            self.errors_box.insert(tk.END, f'Parser: {e["msg"]} L{e["line"]}\n')
+        #Muestra tokens y errores (las listas solo piden las filas visibles)
+        self.mostrar_tokens(lex["tokens"])
+        self.mostrar_errores(lex["errors"], parse_res["errors"])
         
         #Guarda resultados para visualización
         self.last_analysis = parse_res
         self.steps = parse_res["steps"]
         self.current = 0
+        self.canvas.vista.reiniciar()
         used = parse_res.get("used_cells", [])
         self._last_table_dict = table
         
@@ -166,33 +264,110 @@ class AnalyzerApp(ctk.CTk):
         
         #Reporta conflictos de la gramática
         if conflicts:
-            self.errors_box.insert(tk.END, "Conflictos LL(1):\n")
+            self.avisar("Conflictos LL(1):")
             for c in conflicts:
-                self.errors_box.insert(tk.END, f'No determinismo: {c}\n')
+                self.avisar(f'No determinismo: {c}')
+        if res["aviso"]:
+            self.avisar(res["aviso"])
         
         self.draw_current()
         
-        #Genera resumen estadístico
-        summary = self.summarize_counts(lex["tokens"])
-        self.tokens_box.insert(tk.END, "\n--- RESUMEN ---\n")
-        self.tokens_box.insert(tk.END, f"Variables declaradas: {summary['vars']}\n")
-        self.tokens_box.insert(tk.END, f"Métodos declarados: {summary['methods']}\n")
-        self.tokens_box.insert(tk.END, f"Operadores: {summary['ops']}\n")
-        self.tokens_box.insert(tk.END, f"Símbolos: {summary['symbols']}\n")
-        self.tokens_box.insert(tk.END, f"Líneas procesadas: {lex['lines']}\n")
+        #Resumen estadístico
+        summary = res["resumen"]
+        self.resumen_label.configure(text=f"Variables: {summary['vars']}  Métodos: {summary['methods']}  "
+                                          f"Operadores: {summary['ops']}  Símbolos: {summary['symbols']}  "
+                                          f"Líneas: {lex['lines']}")
+
+    def toggle_live(self):
+        if self.live_var.get():
+            self.run_live()
+
+    def on_edit(self, event=None):
+        #Espera una pausa al escribir antes de re-analizar
+        if not self.live_var.get():
+            return
+        if self._live_job is not None:
+            self.after_cancel(self._live_job)
+        self._live_job = self.after(250, self.run_live)
+
+    def run_live(self):
+        #Análisis incremental: actualiza tokens, errores y celdas usadas (sin pasos de animación).
+        #En el hilo de Tk solo se aplican las ediciones que se resuelven dentro de LIMITE_VIVO
+        #tokens; el primer análisis y cualquier edición mayor (p. ej. abrir un comentario) son un
+        #análisis completo en un hilo, como run(). Si se edita mientras tanto se cancela y se
+        #empieza de nuevo con el texto actual
+        self._live_job = None
+        code = self.text_input.get("1.0", tk.END)
+        if self.trabajo_vivo is None:
+            res = self.incremental.actualizar(code, limite=AnalyzerApp.LIMITE_VIVO)
+            if res is not None:
+                self.mostrar_vivo(res)
+                return
+        else:
+            self.trabajo_vivo.cancelar()
+        self.trabajo_vivo = AnalisisFondo(code, self.lexico, errores_path=None,
+                                          incremental=AnalisisIncremental(self.lexico)).iniciar()
+        self.esperar_trabajo()
+
+    def mostrar_vivo(self, res):
+        #Muestra el resultado de AnalisisIncremental (primer análisis o edición)
+        lex, parse_res = res["lex"], res["parse"]
+        
+        #Conserva la posición de las listas mientras se escribe
+        self.mostrar_tokens(lex["tokens"], conservar=True)
+        self.mostrar_errores(lex["errors"], parse_res["errors"], conservar=True)
+        self.resumen_label.configure(text=f"Líneas: {lex['lines']}")
         
-        #Exporta errores a archivo de texto
-        errores_lines = []
-        for e in lex["errors"]:
-            errores_lines.append(f"[LEX] L{e['line']} C{e['col']}: {e['msg']}")
-        for e in parse_res["errors"]:
-            errores_lines.append(f"[SINTAX] L{e['line']} C{e['col']}: {e['msg']}")
-        if errores_lines:
-            try:
-                with open("errores.txt", "w", encoding="utf-8") as f:
-                    f.write("\n".join(errores_lines))
-            except Exception as ex:
-                self.errors_box.insert(tk.END, f"Error al escribir errores.txt: {ex}\n")
+        gram = self.incremental.gram
+        self._last_table_dict = gram.table
+        self.render_ll1_table(gram.table, used_cells=parse_res["used_cells"])
+
+    def mostrar_tokens(self, tokens, conservar=False):
+        #Carga el almacén de tokens en la lista sin crear un dict por token; el filtro y el
+        #orden elegidos se mantienen
+        self._tokens = tokens
+        def fila(i):
+            return (tokens.lexema(i), tokens.tipo(i), tokens.lines[i], tokens.cols[i])
+        claves = (tokens.lexemas, tokens.orden_tipos, lambda: tokens.lines, lambda: tokens.cols)
+        self.tokens_list.cargar(len(tokens), fila, conservar=True, claves=claves)
+        if not conservar:
+            self.tokens_list.ir_a(0)
+
+    def filtrar_tokens(self, tipo):
+        #Filtro por tipo de token; lee self._tokens para seguir valiendo tras re-analizar
+        if tipo == "Todos":
+            self.tokens_list.filtrar(None)
+            return
+        tid = Lexico.TERMINAL_IDS[tipo]
+        self.tokens_list.filtrar(lambda i: self._tokens.types[i] == tid)
+
+    def mostrar_errores(self, lex_errors, parse_errors, conservar=False):
+        #Errores léxicos seguidos de los sintácticos; los avisos anteriores se descartan
+        self._errores = (lex_errors, parse_errors)
+        self._avisos = []
+        self.errors_list.cargar(len(lex_errors) + len(parse_errors), self._fila_error, conservar=conservar)
+
+    def _fila_error(self, i):
+        lex_errors, parse_errors = self._errores
+        if i < len(lex_errors):
+            e = lex_errors[i]
+            return ("Léxico", e["line"], e["col"], e["msg"])
+        i -= len(lex_errors)
+        if i < len(parse_errors):
+            e = parse_errors[i]
+            return ("Parser", e["line"], e["col"], e["msg"])
+        return ("App", None, None, self._avisos[i - len(parse_errors)])
+
+    def avisar(self, msg):
+        #Agrega un mensaje de la aplicación al final de la lista de errores y lo muestra
+        self._avisos.append(msg)
+        total = len(self._errores[0]) + len(self._errores[1]) + len(self._avisos)
+        self.errors_list.cargar(total, self._fila_error, conservar=True)
+        self.errors_list.ir_a(total)
+
+    def toggle_compact(self):
+        self.canvas.vista.compacto = self.compact_var.get()
+        self.draw_current()
 
     def draw_current(self):
         #Dibuja el paso actual de la derivación
@@ -229,37 +404,67 @@ class AnalyzerApp(ctk.CTk):
         self.draw_current()
 
     def export_dots(self):
-        if not self.last_analysis.get("tree"):
+        tree = self.arbol_final()
+        if not tree:
             return
-        dot = Arbol.tree_to_dot(self.last_analysis["tree"])
-        Lector.guardar_archivo(dot, ".dot")
+        Lector.guardar_con(lambda f: Arbol.write_dot(tree, f), ".dot", DOT_FILETYPES, binario=False)
+
+    def arbol_final(self):
+        #Árbol terminado del último análisis (el de AnalisisFondo se rehace desde los pasos)
+        tree = self.last_analysis.get("tree")
+        if tree is None and self.steps:
+            tree = self.steps.arbol_final()
+        return tree
+
+    def current_tree(self):
+        #Árbol del paso que se está mostrando
+        if self.steps:
+            return self.steps[self.current]["tree"]
+        return self.arbol_final()
 
     def export_png(self):
-        img = Arbol.render_to_image(self.canvas)
-        if img is None:
-            self.errors_box.insert(tk.END, "Export PNG: No fue posible generar la imagen.\n")
+        #Se dibuja fuera de pantalla y por franjas, directo al archivo
+        tree = self.current_tree()
+        if not tree:
+            return
+        try:
+            import PIL
+        except ImportError:
+            self.avisar("Export PNG: No fue posible generar la imagen (falta Pillow).")
             return
-        ok = Lector.guardar_imagen_pillow(img, ".png")
+        compacto = self.canvas.vista.compacto
+        ok = Lector.guardar_con(lambda f: ImagenArbol.escribir_png(tree, f, compacto), ".png",
+                                [("PNG image", "*.png"), ("All files", "*.*")])
         if not ok:
-            self.errors_box.insert(tk.END, "Export PNG: cancelado o error al guardar.\n")
+            self.avisar("Export PNG: cancelado o error al guardar.")
+
+    def export_svg(self):
+        tree = self.current_tree()
+        if not tree:
+            return
+        compacto = self.canvas.vista.compacto
+        ok = Lector.guardar_con(lambda f: ImagenArbol.escribir_svg(tree, f, compacto), ".svg",
+                                [("SVG image", "*.svg"), ("All files", "*.*")], binario=False)
+        if not ok:
+            self.avisar("Export SVG: cancelado o error al guardar.")
 
     def export_ast(self):
-        if not self.last_analysis.get("tree"):
+        tree = self.arbol_final()
+        if not tree:
             return
-        dot = Arbol.export_ast_dot(self.last_analysis["tree"])
-        ok = Lector.guardar_archivo(dot, ".dot")
+        ok = Lector.guardar_con(lambda f: Arbol.write_ast_dot(tree, f), ".dot", DOT_FILETYPES, binario=False)
         if not ok:
-            self.errors_box.insert(tk.END, "Export AST: cancelado o error.\n")
+            self.avisar("Export AST: cancelado o error.")
 
     def export_table(self):
         #Exporta la tabla de parsing a archivo de texto
         if not self._last_table_dict:
-            self.errors_box.insert(tk.END, "No hay tabla generada aún.\n")
+            self.avisar("No hay tabla generada aún.")
             return
         csv_text = Tabla.to_csv_string(self._last_table_dict)
         ok = Lector.guardar_archivo(csv_text, ".txt")
         if not ok:
-            self.errors_box.insert(tk.END, "Export tabla: cancelado o error.\n")
+            self.avisar("Export tabla: cancelado o error.")
 
     def clear_table_widget(self):
         #Limpia el widget Treeview antes de renderizar nueva tabla
@@ -271,9 +476,9 @@ class AnalyzerApp(ctk.CTk):
             self.table_view.delete(item)
 
     def render_ll1_table(self, table_dict, used_cells=None):
-        #Renderiza la tabla LL(1) en el Treeview marcando celdas usadas
+        #Renderiza la tabla LL(1) en el Treeview marcando celdas usadas y cuántas veces se usaron
         headers, rows = Tabla.as_matrix(table_dict)
-        used = set(used_cells or [])
+        used = Counter(used_cells or [])
         
         self.clear_table_widget()
         self.table_view["columns"] = headers
@@ -284,35 +489,18 @@ class AnalyzerApp(ctk.CTk):
             self.table_view.heading(h, text=h)
             self.table_view.column(h, width=w, anchor="center", stretch=True)
         
-        #Inserta filas y marca celdas usadas con "▶"
+        #Inserta filas y marca celdas usadas con "▶" (y "×n" si se usaron más de una vez)
         terms = headers[1:]
         for idx, r in enumerate(rows):
             nt = r[0]
             new_row = [nt]
             for j, cell in enumerate(r[1:], start=1):
                 t = terms[j-1]
-                if cell and (nt, t) in used:
+                n = used.get((nt, t), 0) if cell else 0
+                if n > 1:
+                    new_row.append(f"▶ {cell} ×{n}")
+                elif n:
                     new_row.append("▶ " + cell)
                 else:
                     new_row.append(cell)
-            self.table_view.insert("", "end", values=new_row)
-
-    def summarize_counts(self, tokens):
-        #Cuenta variables, métodos, operadores y símbolos del código
-        ops = {"+","-","*","/","<",">","=="}
-        syms = {"{","}","(",")",",",";"}
-        n_ops = sum(1 for t in tokens if t["type"] in ops)
-        n_syms = sum(1 for t in tokens if t["type"] in syms)
-        
-        #Detecta declaraciones por el patrón: tipo + id + ";" o "("
-        var_decl = 0
-        meth_decl = 0
-        for i in range(len(tokens)-2):
-            a,b,c = tokens[i], tokens[i+1], tokens[i+2]
-            if a["type"] in {"int","void"} and b["type"]=="id":
-                if c["type"] == ";":
-                    var_decl += 1
-                elif c["type"] == "(":
-                    meth_decl += 1
-        
-        return {"vars": var_decl, "methods": meth_decl, "ops": n_ops, "symbols": n_syms}
\ No newline at end of file
+            self.table_view.insert("", "end", values=new_row)
\ No newline at end of file
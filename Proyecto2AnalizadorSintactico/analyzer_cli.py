@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import sys
+from lexico import Lexico
+from tabla import Tabla
+from arbol import Arbol
+from gramatica import Gramatica
+#lote (pool de procesos), imagen_arbol (PNG/SVG) y perfil se importan solo en los comandos
+#y exportaciones que los usan, para no pagar su importación en cada análisis
+
+#Exportaciones disponibles por archivo analizado
+EXPORTS = ("tokens", "errores", "tabla", "dot", "ast", "png", "svg")
+#Exportaciones que se escriben directo al archivo (o a stdout) sin armar el contenido en memoria
+EN_FLUJO = ("dot", "ast", "png", "svg")
+
+
+class AnalyzerCLI:
+    @staticmethod
+    def entero_positivo(texto):
+        #Tipo de argparse para cantidades que deben ser al menos 1
+        try:
+            n = int(texto)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"se esperaba un entero: {texto}")
+        if n < 1:
+            raise argparse.ArgumentTypeError(f"debe ser al menos 1: {texto}")
+        return n
+
+    @staticmethod
+    def analizar(code, lexico=None, cache_path=None, recuperacion="token"):
+        #Ejecuta el pipeline completo sin interfaz gráfica
+        lexico = lexico or Lexico()
+        gram = Gramatica.compilar(cache_path)
+        lex = lexico.lexer(code)
+        parse_res = Lexico.parse(lex["tokens"], gram.first, gram.follow, gram.compilada, record="none",
+                                 recuperacion=recuperacion)
+        return {"lex": lex, "parse": parse_res, "table": gram.table, "conflicts": gram.conflicts}
+
+    @staticmethod
+    def analizar_flujo(path, lexico=None, cache_path=None, recuperacion="token"):
+        #Analiza leyendo el archivo por bloques: el texto nunca se carga completo en memoria
+        lexico = lexico or Lexico()
+        gram = Gramatica.compilar(cache_path)
+        with open(path, "rb") as f:
+            flujo = lexico.lexer_stream(f)
+            parse_res = Lexico.parse(flujo, gram.first, gram.follow, gram.compilada, record="none",
+                                     recuperacion=recuperacion)
+        lex = {"tokens": [], "errors": flujo.errors, "lines": flujo.lines}
+        return {"lex": lex, "parse": parse_res, "table": gram.table, "conflicts": gram.conflicts}
+
+    @staticmethod
+    def formato_tokens(tokens):
+        #Mismo formato que el panel de tokens de la interfaz
+        return "".join(f'{t["lexeme"]} : {t["type"]} (L{t["line"]})\n' for t in tokens)
+
+    @staticmethod
+    def formato_errores(lex_errors, parse_errors):
+        #Mismo formato que errores.txt
+        lines = [f"[LEX] L{e['line']} C{e['col']}: {e['msg']}" for e in lex_errors]
+        lines += [f"[SINTAX] L{e['line']} C{e['col']}: {e['msg']}" for e in parse_errors]
+        return "\n".join(lines)
+
+    @staticmethod
+    def exportar(res, exports):
+        #Genera el contenido de cada exportación solicitada
+        out = {}
+        if "tokens" in exports:
+            out["tokens"] = AnalyzerCLI.formato_tokens(res["lex"]["tokens"])
+        if "errores" in exports:
+            out["errores"] = AnalyzerCLI.formato_errores(res["lex"]["errors"], res["parse"]["errors"])
+        if "tabla" in exports:
+            out["tabla"] = Tabla.to_csv_string(res["table"])
+        return out
+
+    @staticmethod
+    def exportar_flujo(res, exports, path, salida=None, compacto=False, clusters=None, max_depth=None):
+        #Escribe el árbol (DOT, AST, PNG o SVG) directo en la carpeta de salida o en stdout
+        tree = res["parse"]["tree"]
+        if "png" in exports or "svg" in exports:
+            from imagen_arbol import ImagenArbol
+        escritores = {
+            "dot": lambda f: Arbol.write_dot(tree, f, clusters=clusters, max_depth=max_depth),
+            "ast": lambda f: Arbol.write_ast_dot(tree, f, clusters=clusters, max_depth=max_depth),
+            "png": lambda f: ImagenArbol.escribir_png(tree, f, compacto),
+            "svg": lambda f: ImagenArbol.escribir_svg(tree, f, compacto),
+        }
+        for export in exports:
+            if salida:
+                destino = os.path.join(salida, AnalyzerCLI.nombre_salida(path, export))
+                if export == "png":
+                    with open(destino, "wb") as f:
+                        escritores[export](f)
+                else:
+                    with open(destino, "w", encoding="utf-8") as f:
+                        escritores[export](f)
+            else:
+                print(f"== {path} [{export}] ==")
+                escritores[export](sys.stdout)
+                print()
+
+    @staticmethod
+    def nombre_salida(path, export):
+        #Nombre del archivo de salida para cada exportación
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if export == "tabla":
+            return "tabla_transicion.txt"
+        ext = {"tokens": ".tokens.txt", "errores": ".errores.txt", "dot": ".dot", "ast": ".ast.dot",
+               "png": ".png", "svg": ".svg"}[export]
+        return stem + ext
+
+    @staticmethod
+    def main(argv=None):
+        parser = argparse.ArgumentParser(prog="analyzer_cli", description="Analizador LL(1) sin interfaz gráfica")
+        sub = parser.add_subparsers(dest="comando", required=True)
+        p = sub.add_parser("analizar", help="Analiza uno o más archivos")
+        p.add_argument("archivos", nargs="+")
+        p.add_argument("-o", "--salida", help="Carpeta donde escribir las exportaciones (por defecto, stdout)")
+        p.add_argument("-e", "--exportar", default="tokens,errores",
+                       help="Lista separada por comas: " + ",".join(EXPORTS))
+        p.add_argument("--cache", help="Archivo de caché para FIRST/FOLLOW/tabla compilados")
+        p.add_argument("--flujo", action="store_true",
+                       help="Lee cada archivo por bloques sin cargarlo completo (no admite exportar tokens)")
+        p.add_argument("--compacto", action="store_true", help="Distribución compacta del árbol en png/svg")
+        p.add_argument("--clusters", default="",
+                       help="Símbolos separados por comas cuyos subárboles se agrupan en clusters en dot/ast")
+        p.add_argument("--profundidad", type=int, default=None, help="Trunca dot/ast por debajo de esta profundidad")
+        AnalyzerCLI.opciones_analisis(p)
+        p = sub.add_parser("lote", help="Analiza muchos archivos en paralelo y emite JSON Lines")
+        p.add_argument("objetivos", nargs="+", help="Carpetas, globs o archivos")
+        p.add_argument("--patron", default="*.txt", help="Patrón de archivos dentro de las carpetas")
+        p.add_argument("-j", "--workers", type=AnalyzerCLI.entero_positivo, default=None,
+                       help="Procesos a usar (por defecto, uno por CPU)")
+        p.add_argument("--desordenado", action="store_true", help="Emite cada resultado apenas termina")
+        p.add_argument("-o", "--salida", help="Archivo .jsonl de salida (por defecto, stdout)")
+        p.add_argument("--cache", help="Archivo de caché para FIRST/FOLLOW/tabla compilados")
+        AnalyzerCLI.opciones_analisis(p)
+        p = sub.add_parser("perfil", help="Mide lexer y parser sobre un corpus (producciones, no terminales, pila)")
+        p.add_argument("objetivos", nargs="+", help="Carpetas, globs o archivos")
+        p.add_argument("--patron", default="*.txt", help="Patrón de archivos dentro de las carpetas")
+        p.add_argument("--json", help="Archivo JSON del perfil (por defecto, stdout)")
+        p.add_argument("--colapsado", help="Archivo de pilas en formato collapsed para flame graphs")
+        p.add_argument("--cache", help="Archivo de caché para FIRST/FOLLOW/tabla compilados")
+        args = parser.parse_args(argv)
+        if args.comando == "lote":
+            return AnalyzerCLI.lote(args)
+        if args.comando == "perfil":
+            return AnalyzerCLI.perfil(args)
+
+        exports = [e.strip() for e in args.exportar.split(",") if e.strip()]
+        for e in exports:
+            if e not in EXPORTS:
+                parser.error(f"Exportación desconocida: {e}")
+        if args.flujo and "tokens" in exports:
+            parser.error("--flujo no admite exportar tokens")
+        if "png" in exports and not args.salida:
+            parser.error("png requiere --salida")
+
+        lexico = Lexico(args.motor, args.max_errores or None)
+        total_errors = 0
+        if args.salida:
+            os.makedirs(args.salida, exist_ok=True)
+        for path in args.archivos:
+            if args.flujo:
+                res = AnalyzerCLI.analizar_flujo(path, lexico, args.cache, args.recuperacion)
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    code = f.read()
+                res = AnalyzerCLI.analizar(code, lexico, args.cache, args.recuperacion)
+            n_err = len(res["lex"]["errors"]) + len(res["parse"]["errors"])
+            total_errors += n_err
+            out = AnalyzerCLI.exportar(res, exports)
+            en_flujo = [e for e in exports if e in EN_FLUJO]
+            if args.salida:
+                for export, contenido in out.items():
+                    with open(os.path.join(args.salida, AnalyzerCLI.nombre_salida(path, export)), "w", encoding="utf-8") as f:
+                        f.write(contenido)
+            else:
+                for export, contenido in out.items():
+                    print(f"== {path} [{export}] ==")
+                    print(contenido.rstrip("\n"))
+            if en_flujo:
+                clusters = [c.strip() for c in args.clusters.split(",") if c.strip()]
+                AnalyzerCLI.exportar_flujo(res, en_flujo, path, args.salida, args.compacto, clusters, args.profundidad)
+            print(f"{path}: {res['lex']['lines']} líneas, {n_err} errores", file=sys.stderr)
+        return 1 if total_errors else 0
+
+    @staticmethod
+    def opciones_analisis(p):
+        #Opciones que cambian el resultado del análisis; analizar y lote las aceptan por igual
+        p.add_argument("--motor", choices=Lexico.MOTORES, default="regex", help="Motor del lexer")
+        p.add_argument("--max-errores", type=int, default=Lexico.MAX_ERRORES,
+                       help="Errores léxicos tras los que se deja de analizar el archivo (0 = sin tope)")
+        p.add_argument("--recuperacion", choices=("token", "panico"), default="token",
+                       help="Recuperación de errores del parser: token por token o modo pánico (un error por región)")
+
+    @staticmethod
+    def lote(args):
+        #Una línea JSON por archivo, escrita en cuanto el resultado está listo
+        from lote import Lote
+        paths = Lote.archivos(args.objetivos, args.patron)
+        out = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+        con_errores = 0
+        try:
+            for res in Lote.ejecutar(paths, args.workers, not args.desordenado, args.cache,
+                                     args.motor, args.max_errores or None, args.recuperacion):
+                if not res["ok"]:
+                    con_errores += 1
+                out.write(json.dumps(res, ensure_ascii=False) + "\n")
+                out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"{len(paths)} archivos, {con_errores} con errores", file=sys.stderr)
+        return 1 if con_errores else 0
+
+    @staticmethod
+    def perfil(args):
+        #Acumula el perfil de todos los archivos y lo escribe como JSON y pilas colapsadas
+        from lote import Lote
+        from perfil import Perfil
+        paths = Lote.archivos(args.objetivos, args.patron)
+        lexico = Lexico()
+        gram = Gramatica.compilar(args.cache)
+        perfil = Perfil()
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                perfil.medir(f.read(), lexico, gram)
+        d = perfil.a_dict()
+        data = json.dumps(d, ensure_ascii=False, indent=2)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                f.write(data + "\n")
+        else:
+            print(data)
+        if args.colapsado:
+            with open(args.colapsado, "w", encoding="utf-8") as f:
+                f.write(perfil.colapsado())
+        print(f"{len(paths)} archivos, {d['tokens']} tokens, lexer {d['lexer']['tokens_por_segundo']} tokens/s, "
+              f"parser {d['parser']['tokens_por_segundo']} tokens/s", file=sys.stderr)
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(AnalyzerCLI.main())
@@ -1,88 +1,246 @@
-import tkinter as tk
 from lexico import Lexico
-from io import BytesIO
-try:
-    from PIL import Image, ImageGrab
-    PIL_OK = True
-except Exception:
-    PIL_OK = False
 
 
 class Arbol:
+    #Terminales que se conservan al simplificar el árbol de derivación a AST
+    TERMINALES_AST = frozenset({"id", "number", "+", "-", "*", "/", "==", "<", ">", "=", "return", "class", "int", "void", "(", ")", "{", "}", ",", ";"})
+
     @staticmethod
-    def width_of(node):
-        #Calcula el ancho total del árbol sumando el ancho de todos los hijos
-        if not node.get("children"):
-            return 1
-        return sum(Arbol.width_of(c) for c in node.get("children", []))
+    def width_of(node, anchos=None):
+        #Calcula el ancho total del árbol (cantidad de hojas) de abajo hacia arriba.
+        #anchos: caché opcional id(nodo) -> (nodo, ancho) que se reutiliza entre llamadas
+        if anchos is None:
+            anchos = {}
+        ent = anchos.get(id(node))
+        if ent is None or ent[0] is not node:
+            orden, primer, _ = Arbol._por_niveles(node)
+            Arbol._anchos(orden, primer, anchos)
+        return anchos[id(node)][1]
 
     @staticmethod
-    def layout_tree(root, x0, x1, y0=20, y_step=60):
-        #Calcula las posiciones (x, y) de cada nodo para dibujar el árbol
-        nodespos = {}
-        def assign(n, left, right, depth):
-            w = Arbol.width_of(n)
-            if not n.get("children"):
-                #Hoja: centrar en el espacio asignado
-                x = (left + right) / 2
-                nodespos[id(n)] = (n, x, y0 + depth * y_step)
+    def _por_niveles(root):
+        #Recorre el árbol por niveles: los hijos de orden[i] son orden[primer[i]:primer[i+1]]
+        #y los nodos de profundidad d son orden[niveles[d]:niveles[d+1]]
+        orden = [root]
+        primer = []
+        niveles = [0]
+        i = 0
+        while i < len(orden):
+            fin = len(orden)
+            niveles.append(fin)
+            while i < fin:
+                n = orden[i]
+                hijos = n.get("children")
+                primer.append(len(orden))
+                if hijos:
+                    orden.extend(hijos)
+                i += 1
+        primer.append(len(orden))
+        return orden, primer, niveles
+
+    @staticmethod
+    def _anchos(orden, primer, cache=None):
+        #Anchos de todos los nodos en una pasada de abajo hacia arriba; con caché se toman
+        #de ella los subárboles ya medidos y se guardan los nuevos
+        ancho = [1] * len(orden)
+        for i in range(len(orden) - 1, -1, -1):
+            p, q = primer[i], primer[i + 1]
+            if cache is not None:
+                n = orden[i]
+                ent = cache.get(id(n))
+                if ent is not None and ent[0] is n:
+                    ancho[i] = ent[1]
+                    continue
+                if p < q:
+                    ancho[i] = sum(ancho[p:q])
+                cache[id(n)] = (n, ancho[i])
+            elif p < q:
+                ancho[i] = sum(ancho[p:q])
+        return ancho
+
+    @staticmethod
+    def layout_tree(root, x0, x1, y0=20, y_step=60, compacto=False, anchos=None):
+        #Calcula las posiciones (x, y) de cada nodo para dibujar el árbol en tiempo lineal.
+        #compacto: acomoda los subárboles según sus contornos (Reingold-Tilford) en lugar de
+        #reservar una columna por hoja.
+        #anchos: caché de anchos por nodo para reutilizar entre pasos que comparten subárboles
+        orden, primer, niveles, xs = Arbol.layout_arreglos(root, compacto, anchos)
+        return Arbol._posiciones(orden, xs, niveles, y0, y_step)
+
+    @staticmethod
+    def layout_arreglos(root, compacto=False, anchos=None):
+        #Igual que layout_tree pero devuelve los arreglos por niveles (orden, primer, niveles, xs)
+        #con x en unidades de layout; en cada nivel los nodos quedan ordenados por x
+        if compacto:
+            return Arbol._layout_compacto(root)
+        orden, primer, niveles = Arbol._por_niveles(root)
+        ancho = Arbol._anchos(orden, primer, anchos)
+        n_nodos = len(orden)
+        #De arriba hacia abajo: cada hijo recibe el borde izquierdo de su espacio
+        izq = [0] * n_nodos
+        for i in range(n_nodos):
+            cur = izq[i]
+            for j in range(primer[i], primer[i + 1]):
+                izq[j] = cur
+                cur += ancho[j]
+        #De abajo hacia arriba: hojas centradas, internos entre su primer y último hijo
+        xs = [0] * n_nodos
+        for i in range(n_nodos - 1, -1, -1):
+            p, q = primer[i], primer[i + 1]
+            if p < q:
+                xs[i] = (xs[p] + xs[q - 1]) / 2
             else:
-                #Nodo interno: posicionar hijos primero
-                cur = left
-                for c in n.get("children", []):
-                    cw = Arbol.width_of(c)
-                    cleft = cur
-                    cright = cur + cw
-                    assign(c, cleft, cright, depth + 1)
-                    cur += cw
-                #Posicionar este nodo entre el primer y último hijo
-                first = n["children"][0]
-                last = n["children"][-1]
-                x_first = nodespos[id(first)][1]
-                x_last = nodespos[id(last)][1]
-                nodespos[id(n)] = (n, (x_first + x_last) / 2, y0 + depth * y_step)
-        total = Arbol.width_of(root)
-        assign(root, 0, total, 0)
+                xs[i] = (izq[i] + izq[i] + 1) / 2
+        return orden, primer, niveles, xs
+
+    @staticmethod
+    def _posiciones(orden, xs, niveles, y0, y_step):
+        #Arma el dict id(nodo) -> (nodo, x, y) a partir de los arreglos por nivel
+        nodespos = {}
+        for depth in range(len(niveles) - 1):
+            y = y0 + depth * y_step
+            for i in range(niveles[depth], niveles[depth + 1]):
+                n = orden[i]
+                nodespos[id(n)] = (n, xs[i], y)
         return nodespos
 
     @staticmethod
-    def tree_to_dot(tree, name="arbol"):
+    def _layout_compacto(root):
+        #Cada subárbol guarda sus contornos izquierdo y derecho como listas invertidas
+        #(índice -1 = nivel de la raíz) con un desplazamiento perezoso: valor real = v + off.
+        #Al unir hermanos solo se recorren los niveles comunes y la lista corta se vuelca
+        #sobre la larga, así el costo total es lineal.
+        orden, primer, niveles = Arbol._por_niveles(root)
+        n_nodos = len(orden)
+        contornos = [None] * n_nodos
+        rel = [0] * n_nodos
+        for i in range(n_nodos - 1, -1, -1):
+            p, q = primer[i], primer[i + 1]
+            if p == q:
+                contornos[i] = ([0], 0, [0], 0)
+                continue
+            izq, off_i, der, off_d = contornos[p]
+            contornos[p] = None
+            pos = 0
+            for c in range(p + 1, q):
+                c_izq, c_off_i, c_der, c_off_d = contornos[c]
+                contornos[c] = None
+                comunes = min(len(der), len(c_izq))
+                s = 0
+                for j in range(1, comunes + 1):
+                    d = der[-j] + off_d - c_izq[-j] - c_off_i + 1
+                    if d > s:
+                        s = d
+                rel[c] = pos = s
+                c_off_i += s
+                c_off_d += s
+                #Contorno derecho: en los niveles comunes manda el hermano nuevo
+                if len(c_der) >= len(der):
+                    der, off_d = c_der, c_off_d
+                else:
+                    base = len(der) - len(c_der)
+                    ajuste = c_off_d - off_d
+                    for j, v in enumerate(c_der):
+                        der[base + j] = v + ajuste
+                #Contorno izquierdo: en los niveles comunes se conserva el acumulado
+                if len(c_izq) > len(izq):
+                    base = len(c_izq) - len(izq)
+                    ajuste = off_i - c_off_i
+                    for j, v in enumerate(izq):
+                        c_izq[base + j] = v + ajuste
+                    izq, off_i = c_izq, c_off_i
+            #El padre se centra entre el primer y el último hijo
+            px = pos / 2
+            for c in range(p, q):
+                rel[c] -= px
+            off_i -= px
+            off_d -= px
+            izq.append(-off_i)
+            der.append(-off_d)
+            contornos[i] = (izq, off_i, der, off_d)
+        #De arriba hacia abajo: posición absoluta = posición del padre + desplazamiento relativo
+        xs = rel
+        for i in range(n_nodos):
+            x = xs[i]
+            for c in range(primer[i], primer[i + 1]):
+                xs[c] += x
+        return orden, primer, niveles, xs
+
+    @staticmethod
+    def tree_to_dot(tree, name="arbol", clusters=None, max_depth=None):
         #Genera código DOT de Graphviz para visualizar el árbol
+        return "\n".join(Arbol.iter_dot(tree, name, clusters, max_depth))
+
+    @staticmethod
+    def write_dot(tree, fh, name="arbol", clusters=None, max_depth=None):
+        #Escribe el DOT directo en un archivo abierto, línea por línea, sin armar el documento
+        primera = True
+        for line in Arbol.iter_dot(tree, name, clusters, max_depth):
+            fh.write(line if primera else "\n" + line)
+            primera = False
+
+    @staticmethod
+    def iter_dot(tree, name="arbol", clusters=None, max_depth=None):
+        #Genera las líneas del DOT recorriendo el árbol con una pila (sin recursión).
+        #clusters: símbolos cuyos subárboles se agrupan en un subgraph cluster
+        #max_depth: los nodos más profundos se reemplazan por un nodo "…"
         if not tree or not tree.get("sym"):
-            return (
-                f"digraph {name} {{\n"
-                f"  node [shape=box];\n"
-                f"  empty [label=\"Árbol vacío\"];\n"
-                f"}}"
-            )
-        lines = [
-            f"digraph {name} {{",
-            '  node [shape=box, style=rounded, fontname="Consolas"];'
-        ]
-        node_counter = [0]
-        def visit(n, parent_id=None):
-            node_counter[0] += 1
-            nid = f"n{node_counter[0]}"
+            yield f"digraph {name} {{"
+            yield "  node [shape=box];"
+            yield "  empty [label=\"Árbol vacío\"];"
+            yield "}"
+            return
+        yield f"digraph {name} {{"
+        yield '  node [shape=box, style=rounded, fontname="Consolas"];'
+        clusters = frozenset(clusters or ())
+        node_counter = 0
+        n_clusters = 0
+        #Entradas: (nodo, id del padre, profundidad, sangría) o (None, None, None, sangría) para cerrar un cluster
+        pila = [(tree, None, 0, "  ")]
+        while pila:
+            n, parent_id, depth, sangria = pila.pop()
+            if n is None:
+                yield sangria + "}"
+                continue
+            node_counter += 1
+            nid = f"n{node_counter}"
+            if max_depth is not None and depth > max_depth:
+                yield f'{sangria}{nid} [label="…", shape=plaintext];'
+                yield f'{sangria}{parent_id} -> {nid} [style=dashed];'
+                continue
             lab = n.get("sym", "?").replace('"', '\\"')
+            if lab in clusters:
+                #La arista desde el padre queda fuera para no meter al padre en el cluster
+                if parent_id:
+                    yield f'{sangria}{parent_id} -> {nid};'
+                    parent_id = None
+                n_clusters += 1
+                yield f"{sangria}subgraph cluster_{n_clusters} {{"
+                pila.append((None, None, None, sangria))
+                sangria += "  "
+                yield f'{sangria}label="{lab}";'
             #Colorea nodos según su tipo
             if lab == "ε":
-                lines.append(f'  {nid} [label="{lab}", fillcolor="#f0f0f0", style=filled];')
-            elif lab in Lexico.NONTERMINALS:
-                lines.append(f'  {nid} [label="{lab}", fillcolor="#e3f2fd", style=filled];')
+                yield f'{sangria}{nid} [label="{lab}", fillcolor="#f0f0f0", style=filled];'
+            elif lab in Lexico.NONTERMINAL_SET:
+                yield f'{sangria}{nid} [label="{lab}", fillcolor="#e3f2fd", style=filled];'
             else:
-                lines.append(f'  {nid} [label="{lab}", fillcolor="#fff3e0", style=filled];')
+                yield f'{sangria}{nid} [label="{lab}", fillcolor="#fff3e0", style=filled];'
             if parent_id:
-                lines.append(f'  {parent_id} -> {nid};')
-            for c in n.get("children", []):
-                visit(c, nid)
-            return nid
-        visit(tree)
-        lines.append("}")
-        return "\n".join(lines)
+                yield f'{sangria}{parent_id} -> {nid};'
+            hijos = n.get("children", [])
+            if max_depth is not None and depth == max_depth and hijos:
+                #Un solo marcador por nodo truncado
+                hijos = hijos[:1]
+            pila.extend((c, nid, depth + 1, sangria) for c in reversed(hijos))
+        yield "}"
 
     @staticmethod
     def crear_canvas_scroll(parent):
         #Crea un canvas con scroll y zoom para visualizar el árbol
+        #tkinter se importa aquí para que el módulo se pueda usar sin pantalla
+        import tkinter as tk
+        from vista_arbol import VistaArbol
         frame = tk.Frame(parent)
         frame.pack(fill="both", expand=True)
         x_scroll = tk.Scrollbar(frame, orient="horizontal")
@@ -93,15 +251,23 @@ class Arbol:
         x_scroll.pack(side="bottom", fill="x")
         y_scroll.pack(side="right", fill="y")
         canvas.pack(side="left", fill="both", expand=True)
-        canvas.scale_factor = 1.0
+        
+        #Vista virtualizada: cada cambio de scroll o de tamaño redibuja solo la parte visible
+        canvas.vista = VistaArbol(canvas)
+        def x_view(*args):
+            x_scroll.set(*args)
+            canvas.vista.programar()
+        def y_view(*args):
+            y_scroll.set(*args)
+            canvas.vista.programar()
+        canvas.configure(xscrollcommand=x_view, yscrollcommand=y_view)
+        canvas.bind("<Configure>", lambda e: canvas.vista.programar())
         
         #Zoom con Ctrl + Scroll
         def zoom(event):
             if event.state & 0x0004:
                 factor = 1.1 if event.delta > 0 else 0.9
-                canvas.scale_factor *= factor
-                canvas.scale("all", canvas.canvasx(event.x), canvas.canvasy(event.y), factor, factor)
-                canvas.configure(scrollregion=canvas.bbox("all"))
+                canvas.vista.zoom(factor, event.x, event.y)
         
         #Pan con clic medio o derecho
         def start_pan(event):
@@ -130,119 +296,92 @@ class Arbol:
         return canvas
 
     @staticmethod
-    def draw_snapshot(canvas, step, current, total_steps):
-        #Dibuja un paso específico del árbol de derivación
-        canvas.delete("all")
-        if not step or not step.get("tree"):
-            canvas.create_text(200, 150, text="Ejecuta 'Analizar' primero", fill="#888", font=("Arial", 13))
-            return
-        tree = step["tree"]
-        canvas.update_idletasks()
-        
-        #Calcula posiciones y normaliza a píxeles
-        nodespos = Arbol.layout_tree(tree, 0, 1, y0=30, y_step=70)
+    def posiciones_en_pixeles(nodespos, margin_x=60, margin_y=40, px_per_unit=100):
+        #Normaliza el resultado de layout_tree a píxeles y lo indexa por el id de cada nodo
+        #(id del dict del nodo; se usa id() si el nodo no tiene uno)
         if not nodespos:
-            return
-        xs = [p[1] for p in nodespos.values()]
-        minx, maxx = min(xs), max(xs)
-        margin_x = 60
-        margin_y = 40
-        y_step_extra = 0
-        px_per_unit = 100
+            return {}
+        minx = min(p[1] for p in nodespos.values())
         norm = {}
-        for k, (n, x, y) in nodespos.items():
-            nx = margin_x + (x - minx) * px_per_unit
-            ny = margin_y + y + y_step_extra
-            norm[k] = (n, nx, ny)
-        
-        #Dibuja las líneas entre padres e hijos
-        for _, (n, x, y) in norm.items():
-            for c in n.get("children", []):
-                for _, (cn, cx, cy) in norm.items():
-                    if cn.get("id") == c.get("id"):
-                        canvas.create_line(x, y + 16, cx, cy - 16, width=2, fill="#5599ff", smooth=True)
-                        break
-        
-        #Dibuja los nodos como óvalos con texto
-        for _, (n, x, y) in norm.items():
-            lab = n.get("sym", "?")
-            w = max(40, len(lab) * 10)
-            h = 28
-            fill = "#1e3a5f" if lab not in Lexico.NONTERMINALS else "#e3f2fd"
-            outline = "#3b82f6" if lab not in Lexico.NONTERMINALS else "#1e40af"
-            text_color = "#fff3e0" if lab not in Lexico.NONTERMINALS else "#000"
-            canvas.create_oval(x - w / 2, y - h / 2, x + w / 2, y + h / 2, fill=fill, outline=outline, width=2)
-            canvas.create_text(x, y, text=lab, font=("Consolas", 11, "bold"), fill=text_color)
-        
-        #Muestra información del paso actual
-        ch = max(canvas.winfo_height(), 400)
-        action = step.get("action", "")
-        cap = f"Paso {current + 1}/{total_steps} | {action}"
-        canvas.create_text(10, ch - 15, text=cap, anchor="w", fill="#94a3b8", font=("Arial", 10))
-        bbox = canvas.bbox("all")
-        if bbox:
-            pad = 60
-            canvas.configure(scrollregion=(bbox[0]-pad, bbox[1]-pad, bbox[2]+pad, bbox[3]+pad))
+        for n, x, y in nodespos.values():
+            norm[n.get("id", id(n))] = (n, margin_x + (x - minx) * px_per_unit, margin_y + y)
+        return norm
+
+    @staticmethod
+    def estilo_nodo(lab):
+        #Devuelve (ancho, alto, relleno, borde, color de texto) del óvalo de un símbolo
+        w = max(40, len(lab) * 10)
+        if lab in Lexico.NONTERMINAL_SET:
+            return w, 28, "#e3f2fd", "#1e40af", "#000"
+        return w, 28, "#1e3a5f", "#3b82f6", "#fff3e0"
+
+    @staticmethod
+    def draw_snapshot(canvas, step, current, total_steps):
+        #Dibuja un paso específico del árbol de derivación. El dibujo lo hace la vista
+        #virtualizada del canvas, que solo crea items para la parte visible y entre pasos
+        #agrega, mueve o borra lo que cambió
+        vista = getattr(canvas, "vista", None)
+        if vista is None:
+            from vista_arbol import VistaArbol
+            vista = canvas.vista = VistaArbol(canvas)
+        canvas.update_idletasks()
+        vista.mostrar(step, current, total_steps)
 
     @staticmethod
     def render_to_image(canvas):
-        #Exporta el canvas actual como imagen PIL
-        if not PIL_OK:
-            return None
-        bbox = canvas.bbox("all")
-        if not bbox:
-            return None
-        x0, y0, x1, y1 = bbox
-        width = int(x1 - x0)
-        height = int(y1 - y0)
-        if width <= 0 or height <= 0:
+        #Exporta el árbol que muestra el canvas como imagen PIL. Se dibuja fuera de pantalla
+        #a partir del layout (sin postscript ni captura), así incluye el árbol completo
+        from imagen_arbol import ImagenArbol
+        vista = getattr(canvas, "vista", None)
+        if vista is None or vista.arbol is None:
             return None
-        try:
-            #Intenta con postscript primero
-            ps = canvas.postscript(colormode='color', x=x0, y=y0, width=width, height=height, pagewidth=width)
-            bio = BytesIO(ps.encode("utf-8"))
-            img = Image.open(bio)
-            return img.convert("RGBA")
-        except Exception:
-            try:
-                #Fallback: captura de pantalla
-                rx = canvas.winfo_rootx()
-                ry = canvas.winfo_rooty()
-                rw = rx + canvas.winfo_width()
-                rh = ry + canvas.winfo_height()
-                img = ImageGrab.grab(bbox=(rx, ry, rw, rh))
-                return img.convert("RGBA")
-            except Exception:
-                return None
+        return ImagenArbol.a_imagen(vista.arbol, compacto=vista.compacto)
 
     @staticmethod
     def derivation_to_ast(node):
-        #Convierte el árbol de derivación completo a un AST simplificado
+        #Convierte el árbol de derivación completo a un AST simplificado.
+        #Recorrido postorden con una pila: cada marco acumula los AST de sus hijos
         if not node:
             return None
-        sym = node.get("sym", "")
-        childs = node.get("children", [])
-        #Filtra nodos epsilon
-        filt = [c for c in childs if c.get("sym") != "ε"]
-        new_children = [Arbol.derivation_to_ast(c) for c in filt]
-        new_children = [c for c in new_children if c]
-        
-        #Solo mantiene terminales y símbolos de interés
-        terminal_interes = {"id", "number", "+", "-", "*", "/", "==", "<", ">", "=", "return", "class", "int", "void", "(", ")", "{", "}", ",", ";"}
-        if sym in terminal_interes:
-            return {"id": node.get("id"), "sym": sym, "children": new_children}
-        
-        #Simplifica nodos con un solo hijo
-        if len(new_children) == 1:
-            return new_children[0]
-        if new_children:
-            return {"id": node.get("id"), "sym": sym, "children": new_children}
-        return None
+        terminal_interes = Arbol.TERMINALES_AST
+        resultado = []
+        pila = [(node, resultado, None)]
+        while pila:
+            n, salida, new_children = pila.pop()
+            if new_children is None:
+                #Primera visita: se procesan los hijos (sin epsilon) antes que el nodo
+                hijos = []
+                pila.append((n, salida, hijos))
+                filt = [c for c in n.get("children", []) if c.get("sym") != "ε"]
+                pila.extend((c, hijos, None) for c in reversed(filt) if c)
+                continue
+            sym = n.get("sym", "")
+            if sym in terminal_interes:
+                salida.append({"id": n.get("id"), "sym": sym, "children": new_children})
+            elif len(new_children) == 1:
+                #Simplifica nodos con un solo hijo
+                salida.append(new_children[0])
+            elif new_children:
+                salida.append({"id": n.get("id"), "sym": sym, "children": new_children})
+        return resultado[0] if resultado else None
 
     @staticmethod
-    def export_ast_dot(derivation_root):
+    def export_ast_dot(derivation_root, clusters=None, max_depth=None):
         #Genera código DOT del AST simplificado
+        return "\n".join(Arbol.iter_ast_dot(derivation_root, clusters, max_depth))
+
+    @staticmethod
+    def write_ast_dot(derivation_root, fh, clusters=None, max_depth=None):
+        #Escribe el DOT del AST simplificado directo en un archivo abierto
+        primera = True
+        for line in Arbol.iter_ast_dot(derivation_root, clusters, max_depth):
+            fh.write(line if primera else "\n" + line)
+            primera = False
+
+    @staticmethod
+    def iter_ast_dot(derivation_root, clusters=None, max_depth=None):
         ast = Arbol.derivation_to_ast(derivation_root)
         if not ast:
-            return "digraph ast { node [shape=box]; empty [label=\"AST vacío\"]; }"
-        return Arbol.tree_to_dot(ast, name="ast")
\ No newline at end of file
+            yield "digraph ast { node [shape=box]; empty [label=\"AST vacío\"]; }"
+            return
+        yield from Arbol.iter_dot(ast, "ast", clusters, max_depth)
\ No newline at end of file
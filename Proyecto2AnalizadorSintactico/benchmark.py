@@ -0,0 +1,402 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from lexico import Lexico
+from tabla import Tabla
+from gramatica import Gramatica
+from arbol import Arbol
+from nodos_ast import ConstructorAST
+
+
+class Benchmark:
+    #Casos de la suite por etapas: (nombre, miembros, sentencias por método, profundidad de expresiones, errores)
+    SUITE = (
+        ("base", 100, 8, 3, 0.0),
+        ("miembros", 500, 8, 3, 0.0),
+        ("sentencias", 40, 50, 3, 0.0),
+        ("profundidad", 20, 8, 40, 0.0),
+        ("errores", 100, 8, 3, 0.05),
+    )
+    ETAPAS = ("lexer", "first", "follow", "tabla", "parse", "ast", "layout", "dot")
+    #Una etapa es regresión si es más lenta que la línea base en más de esta fracción y de este mínimo,
+    #comparando tiempos relativos a la calibración (ver medir_relativo)
+    TOLERANCIA = 0.25
+    MINIMO_SEGUNDOS = 0.02
+    REPETICIONES = 7
+
+    @staticmethod
+    def programa_replicado(veces, ruta="programa.txt"):
+        #Replica el cuerpo de la clase de ejemplo para obtener un programa grande y válido
+        with open(ruta, "r", encoding="utf-8") as f:
+            text = f.read()
+        ini = text.index("{", text.index("class"))
+        fin = text.rindex("}")
+        return text[:ini+1] + text[ini+1:fin] * veces + text[fin:]
+
+    @staticmethod
+    def generar(miembros=200, sentencias=8, profundidad=3, errores=0.0, semilla=1):
+        #Programa sintético reproducible: uno de cada cuatro miembros es un campo y el resto
+        #métodos con `sentencias` sentencias; las expresiones anidan `profundidad` paréntesis.
+        #Con errores > 0 cada sentencia se daña con esa probabilidad (falta ';' o ')' o un carácter ilegal)
+        rnd = random.Random(semilla)
+        ops = ("+", "-", "*", "/", "<", ">", "==")
+
+        def atomo(nombres):
+            return str(rnd.randint(0, 999)) if rnd.random() < 0.4 else rnd.choice(nombres)
+
+        def expr(nombres):
+            e = atomo(nombres)
+            for _ in range(profundidad):
+                e = f"({atomo(nombres)} {rnd.choice(ops)} {e})"
+            return e
+
+        def danar(linea):
+            if rnd.random() >= errores:
+                return linea
+            k = rnd.randrange(3)
+            if k == 0:
+                return linea.replace(";", "", 1)
+            if k == 1 and ")" in linea:
+                i = linea.rindex(")")
+                return linea[:i] + linea[i+1:]
+            return linea[:len(linea) // 2] + "@" + linea[len(linea) // 2:]
+
+        metodos = [f"m{i}" for i in range(miembros) if i % 4]
+        lineas = ["class Sintetica {"]
+        for i in range(miembros):
+            if i % 4 == 0:
+                lineas.append(f"    int f{i};")
+                continue
+            lineas.append(f"    int m{i}(int a, int b) {{")
+            nombres = ["a", "b"]
+            for k in range(sentencias):
+                tipo = k % 3
+                if tipo == 0:
+                    v = f"v{k}"
+                    lineas.append(danar(f"        int {v};"))
+                    nombres.append(v)
+                elif tipo == 1:
+                    lineas.append(danar(f"        {rnd.choice(nombres)} = {expr(nombres)};"))
+                else:
+                    lineas.append(danar(f"        {rnd.choice(metodos)}({expr(nombres)}, {atomo(nombres)});"))
+            lineas.append(f"        return {expr(nombres)};")
+            lineas.append("    }")
+        lineas.append("}")
+        return "\n".join(lineas) + "\n"
+
+    @staticmethod
+    def pico(fn):
+        #Memoria máxima (bytes) asignada durante fn, medida con tracemalloc en una ejecución aparte
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return pico - base
+
+    @staticmethod
+    def etapas(code, repeticiones=REPETICIONES):
+        #Mediana del tiempo y memoria máxima de cada etapa del pipeline sobre code
+        lexico = Lexico()
+        gram = Gramatica.compilar()
+        estado = {}
+
+        def lexer():
+            estado["tokens"] = lexico.lexer(code)["tokens"]
+
+        def first():
+            estado["first"] = Lexico.compute_first()
+
+        def follow():
+            estado["follow"] = Lexico.compute_follow(estado["first"])
+
+        def tabla():
+            Tabla.build_table(estado["first"], estado["follow"])
+
+        def parse():
+            estado["tree"] = Lexico.parse(estado["tokens"], gram.first, gram.follow, gram.compilada, record="none")["tree"]
+
+        def ast():
+            ConstructorAST.analizar(estado["tokens"], gram)
+
+        def layout():
+            Arbol.layout_tree(estado["tree"], 0, 1000)
+
+        def dot():
+            with open(os.devnull, "w", encoding="utf-8") as f:
+                Arbol.write_dot(estado["tree"], f)
+
+        funciones = {"lexer": lexer, "first": first, "follow": follow, "tabla": tabla,
+                     "parse": parse, "ast": ast, "layout": layout, "dot": dot}
+        res = {}
+        for etapa in Benchmark.ETAPAS:
+            fn = funciones[etapa]
+            dt, relativo = Benchmark.medir_relativo(fn, repeticiones)
+            res[etapa] = {"segundos": round(dt, 6), "relativo": round(relativo, 4),
+                          "pico_mb": round(Benchmark.pico(fn) / 1e6, 3)}
+        res["tokens"] = len(estado["tokens"])
+        return res
+
+    @staticmethod
+    def suite(casos=None, repeticiones=REPETICIONES, semilla=1):
+        #Ejecuta la suite y devuelve {"entorno", "casos": {nombre: {"tokens", etapa: {...}}}}
+        resultado = {"entorno": {"python": platform.python_version(), "plataforma": platform.platform()}, "casos": {}}
+        for nombre, miembros, sentencias, profundidad, errores in casos or Benchmark.SUITE:
+            code = Benchmark.generar(miembros, sentencias, profundidad, errores, semilla)
+            r = Benchmark.etapas(code, repeticiones)
+            resultado["casos"][nombre] = r
+            print(f"{nombre}: {miembros} miembros, {sentencias} sentencias, profundidad {profundidad}, "
+                  f"errores {errores:.2f} -> {r['tokens']} tokens")
+            for etapa in Benchmark.ETAPAS:
+                print(f"  {etapa:<8}{r[etapa]['segundos']:>10.4f} s{r[etapa]['pico_mb']:>10.2f} MB")
+        return resultado
+
+    @staticmethod
+    def comparar(actual, base, tolerancia=TOLERANCIA, minimo=MINIMO_SEGUNDOS):
+        #Lista de regresiones (caso, etapa, medida, antes, ahora) frente a la línea base.
+        #Si ambas traen tiempo relativo, antes es el de la base llevado a la velocidad que tenía
+        #la máquina al medir la etapa actual
+        regresiones = []
+        for nombre, r in actual["casos"].items():
+            b = base.get("casos", {}).get(nombre)
+            if not b:
+                continue
+            for etapa in Benchmark.ETAPAS:
+                if etapa not in b:
+                    continue
+                antes, ahora = b[etapa]["segundos"], r[etapa]["segundos"]
+                if b[etapa].get("relativo") and r[etapa].get("relativo"):
+                    antes = round(b[etapa]["relativo"] * ahora / r[etapa]["relativo"], 6)
+                if ahora > antes * (1 + tolerancia) and ahora - antes > minimo:
+                    regresiones.append((nombre, etapa, "segundos", antes, ahora))
+                antes, ahora = b[etapa]["pico_mb"], r[etapa]["pico_mb"]
+                if ahora > antes * (1 + tolerancia) and ahora - antes > 0.1:
+                    regresiones.append((nombre, etapa, "pico_mb", antes, ahora))
+        return regresiones
+
+    @staticmethod
+    def medir(fn, repeticiones=3, calentar=True):
+        #Devuelve la mediana de varias ejecuciones y el último resultado. Con calentar se descarta
+        #una primera ejecución (cachés, imports y asignaciones iniciales); el recolector de ciclos
+        #queda apagado durante las mediciones para que sus pasadas no caigan al azar en una etapa
+        #u otra. La mediana y no el mínimo: en máquinas compartidas hay ráfagas cortas mucho más
+        #rápidas que lo normal y el mínimo depende de si alguna repetición cayó en una
+        tiempos = []
+        res = fn() if calentar else None
+        activo = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                res = fn()
+                tiempos.append(time.perf_counter() - t0)
+        finally:
+            if activo:
+                gc.enable()
+        return statistics.median(tiempos), res
+
+    @staticmethod
+    def medir_relativo(fn, repeticiones=3):
+        #Como medir, pero cada repetición va entre dos corridas de un trabajo fijo de calibración
+        #y se divide por su promedio. En máquinas compartidas la velocidad cambia hasta al doble de
+        #un segundo a otro; el cociente sigue casi igual. Devuelve (mediana en segundos, mediana relativa)
+        tiempos = []
+        relativos = []
+        fn()
+        activo = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            antes = Benchmark._calibracion()
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                fn()
+                dt = time.perf_counter() - t0
+                despues = Benchmark._calibracion()
+                tiempos.append(dt)
+                relativos.append(dt / ((antes + despues) / 2))
+                antes = despues
+        finally:
+            if activo:
+                gc.enable()
+        return statistics.median(tiempos), statistics.median(relativos)
+
+    @staticmethod
+    def _calibracion():
+        #Segundos de un trabajo fijo de Python puro (dicts y cadenas, como el pipeline), ~10 ms
+        t0 = time.perf_counter()
+        d = {}
+        for i in range(20_000):
+            k = str(i % 5000)
+            d[k] = d.get(k, 0) + len(k)
+        sorted(d.items())
+        return time.perf_counter() - t0
+
+    @staticmethod
+    def registro(veces=1000, every=100, repeticiones=3):
+        #Compara el throughput de Lexico.parse en cada nivel de registro
+        code = Benchmark.programa_replicado(veces)
+        tokens = Lexico().lexer(code)["tokens"]
+        FIRST = Lexico.compute_first()
+        FOLLOW = Lexico.compute_follow(FIRST)
+        table, _ = Tabla.build_table(FIRST, FOLLOW)
+        print(f"programa.txt x{veces}: {len(tokens)} tokens")
+        print(f"{'nivel':<12}{'segundos':>10}{'tokens/s':>14}{'pasos':>10}")
+        for nivel in ("none", "final", "every", "full"):
+            dt, res = Benchmark.medir(lambda: Lexico.parse(tokens, FIRST, FOLLOW, table, record=nivel, every=every), repeticiones)
+            etiqueta = f"every={every}" if nivel == "every" else nivel
+            print(f"{etiqueta:<12}{dt:>10.3f}{len(tokens) / dt:>14,.0f}{len(res['steps']):>10}")
+
+    @staticmethod
+    def memoria_lexer(veces=1000):
+        #Memoria retenida por los tokens: AlmacenTokens frente a una lista de dicts
+        code = Benchmark.programa_replicado(veces)
+        lexico = Lexico()
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        tokens = lexico.lexer(code)["tokens"]
+        almacen, _ = tracemalloc.get_traced_memory()
+        dicts = list(tokens)
+        lista, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"programa.txt x{veces}: {len(tokens)} tokens")
+        print(f"AlmacenTokens: {(almacen - base) / 1e6:8.2f} MB")
+        print(f"lista de dicts: {(lista - almacen) / 1e6:7.2f} MB")
+        print(f"reducción: {(lista - almacen) / max(1, almacen - base):.1f}x")
+        del dicts
+
+    @staticmethod
+    def motores(veces=2000, repeticiones=3):
+        #Compara los motores del lexer (patrón maestro y DFA) en entradas grandes; deben dar lo mismo
+        casos = [
+            (f"programa.txt x{veces}", Benchmark.programa_replicado(veces)),
+            ("sintético con errores", Benchmark.generar(veces // 2, 8, 3, 0.05)),
+            ("comentarios", ("// comentario de línea bastante largo\nint x;\n/* bloque\n de\n comentario */\n") * (veces * 5)),
+        ]
+        print(f"{'caso':<26}{'tokens':>10}{'regex s':>10}{'dfa s':>10}{'dfa/regex':>11}")
+        ok = True
+        for nombre, code in casos:
+            tiempos = {}
+            resultados = {}
+            for motor in Lexico.MOTORES:
+                lexico = Lexico(motor)
+                tiempos[motor], resultados[motor] = Benchmark.medir(lambda: lexico.lexer(code), repeticiones)
+            a, b = resultados["regex"], resultados["dfa"]
+            iguales = list(a["tokens"]) == list(b["tokens"]) and a["errors"] == b["errors"] and a["lines"] == b["lines"]
+            ok = ok and iguales
+            print(f"{nombre:<26}{len(a['tokens']):>10}{tiempos['regex']:>10.3f}{tiempos['dfa']:>10.3f}"
+                  f"{tiempos['dfa'] / tiempos['regex']:>10.2f}x" + ("" if iguales else "  DIFERENTES"))
+        return ok
+
+    @staticmethod
+    def basura(mb=4, repeticiones=3, semilla=1):
+        #Lexer sobre bytes aleatorios decodificados como UTF-8 (archivo binario abierto por error):
+        #rachas de caracteres ilegales en un solo error y tope de errores
+        rnd = random.Random(semilla)
+        code = bytes(rnd.getrandbits(8) for _ in range(mb << 20)).decode("utf-8", errors="replace")
+        print(f"{len(code):,} caracteres aleatorios")
+        print(f"{'motor':<8}{'tope':>8}{'segundos':>10}{'errores':>10}{'tokens':>10}")
+        for motor in Lexico.MOTORES:
+            for tope in (None, Lexico.MAX_ERRORES):
+                lexico = Lexico(motor, tope)
+                dt, res = Benchmark.medir(lambda: lexico.lexer(code), repeticiones)
+                print(f"{motor:<8}{str(tope):>8}{dt:>10.3f}{len(res['errors']):>10}{len(res['tokens']):>10}")
+
+    @staticmethod
+    def columnas(mb=5, lineas=500_000, techo=60.0):
+        #Regresión del cálculo de columnas: una línea enorme y un archivo con muchas líneas.
+        #Con un cálculo cuadrático la línea de 5 MB tardaría horas; se exige terminar bajo el techo.
+        linea = "x = y + 10; "
+        casos = [
+            (f"una línea de {mb} MB", linea * (mb * 1_000_000 // len(linea))),
+            (f"{lineas} líneas", "int x;\n" * lineas),
+        ]
+        lexico = Lexico()
+        ok = True
+        for nombre, code in casos:
+            dt, res = Benchmark.medir(lambda: lexico.lexer(code), 1, calentar=False)
+            estado = "ok" if dt <= techo else "EXCEDE"
+            ok = ok and dt <= techo
+            print(f"{nombre:<24}{len(res['tokens']):>10} tokens {dt:>8.2f} s (techo {techo:.0f} s) {estado}")
+        return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador LL(1)")
+    sub = parser.add_subparsers(dest="caso", required=True)
+    p = sub.add_parser("registro", help="Throughput de parse por nivel de registro")
+    p.add_argument("--veces", type=int, default=1000)
+    p.add_argument("--every", type=int, default=100)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p = sub.add_parser("memoria", help="Memoria de los tokens del lexer")
+    p.add_argument("--veces", type=int, default=1000)
+    p = sub.add_parser("columnas", help="Regresión del lexer en líneas muy largas y archivos con muchas líneas")
+    p.add_argument("--mb", type=int, default=5)
+    p.add_argument("--lineas", type=int, default=500_000)
+    p.add_argument("--techo", type=float, default=60.0, help="Tiempo máximo por caso en segundos")
+    p = sub.add_parser("motores", help="Lexer con patrón maestro frente al motor DFA")
+    p.add_argument("--veces", type=int, default=2000)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p = sub.add_parser("basura", help="Lexer sobre un archivo binario: rachas de caracteres ilegales y tope de errores")
+    p.add_argument("--mb", type=int, default=4)
+    p.add_argument("--repeticiones", type=int, default=3)
+    p = sub.add_parser("etapas", help="Tiempo y memoria por etapa sobre programas sintéticos, con línea base")
+    p.add_argument("--repeticiones", type=int, default=Benchmark.REPETICIONES)
+    p.add_argument("--semilla", type=int, default=1)
+    p.add_argument("--config", action="append", metavar="NOMBRE:MIEMBROS:SENTENCIAS:PROFUNDIDAD:ERRORES",
+                   help="Caso propio en lugar de la suite (se puede repetir)")
+    p.add_argument("--guardar", help="Escribe los resultados como línea base en este JSON")
+    p.add_argument("--comparar", help="Compara contra la línea base de este JSON; sale con 1 si hay regresiones")
+    p.add_argument("--tolerancia", type=float, default=Benchmark.TOLERANCIA)
+    args = parser.parse_args(argv)
+    if args.caso == "etapas":
+        casos = None
+        if args.config:
+            casos = []
+            for c in args.config:
+                partes = c.split(":")
+                if len(partes) != 5:
+                    parser.error(f"Caso inválido: {c}")
+                casos.append((partes[0], int(partes[1]), int(partes[2]), int(partes[3]), float(partes[4])))
+        resultado = Benchmark.suite(casos, args.repeticiones, args.semilla)
+        if args.guardar:
+            with open(args.guardar, "w", encoding="utf-8") as f:
+                json.dump(resultado, f, ensure_ascii=False, indent=2)
+        if args.comparar:
+            with open(args.comparar, "r", encoding="utf-8") as f:
+                base = json.load(f)
+            regresiones = Benchmark.comparar(resultado, base, args.tolerancia)
+            for nombre, etapa, medida, antes, ahora in regresiones:
+                print(f"REGRESIÓN {nombre}/{etapa} {medida}: {antes} -> {ahora}")
+            if regresiones:
+                return 1
+            print("sin regresiones")
+        return 0
+    if args.caso == "registro":
+        Benchmark.registro(args.veces, args.every, args.repeticiones)
+    elif args.caso == "memoria":
+        Benchmark.memoria_lexer(args.veces)
+    elif args.caso == "motores":
+        if not Benchmark.motores(args.veces, args.repeticiones):
+            return 1
+    elif args.caso == "basura":
+        Benchmark.basura(args.mb, args.repeticiones)
+    elif args.caso == "columnas":
+        if not Benchmark.columnas(args.mb, args.lineas, args.techo):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
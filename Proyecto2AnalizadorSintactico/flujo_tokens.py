@@ -0,0 +1,174 @@
+import codecs
+
+
+class FlujoTokens:
+    #Lexer incremental: lee la fuente por bloques y produce tokens a medida que se piden.
+    #Cada token es una tupla (type, lexeme, line, col). Los errores y el número de líneas
+    #quedan en .errors y .lines; .lines es definitivo cuando el flujo se termina de recorrer.
+    def __init__(self, lexico, fuente, chunk_size=1 << 16):
+        self.lexico = lexico
+        self.fuente = fuente
+        self.chunk_size = max(16, int(chunk_size))
+        self.errors = []
+        self.lines = 1
+        self._usado = False
+
+    def _bloques(self, marca=None):
+        #Devuelve la fuente como bloques (texto, marca), decodificando bytes de forma incremental.
+        #La marca permite volver a leer desde el comienzo de ese bloque (_bloques(marca));
+        #es None si la fuente no se puede releer (p. ej. una tubería)
+        fuente = self.fuente
+        n = self.chunk_size
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        if hasattr(fuente, "read"):
+            releer = hasattr(fuente, "seek") and hasattr(fuente, "tell") \
+                and (not hasattr(fuente, "seekable") or fuente.seekable())
+            if marca is not None:
+                fuente.seek(marca)
+            while True:
+                #En bytes el bloque empieza antes de la lectura si quedó un carácter a medias
+                marca = fuente.tell() - len(decoder.getstate()[0]) if releer else None
+                data = fuente.read(n)
+                if not data:
+                    break
+                yield (decoder.decode(data) if isinstance(data, (bytes, bytearray)) else data), marca
+        else:
+            es_texto = isinstance(fuente, str)
+            vista = fuente if es_texto else memoryview(fuente)
+            for i in range(marca or 0, len(vista), n):
+                data = vista[i:i+n]
+                if es_texto:
+                    yield data, i
+                else:
+                    marca = i - len(decoder.getstate()[0])
+                    yield decoder.decode(data), marca
+        resto = decoder.decode(b"", final=True)
+        if resto:
+            yield resto, None
+
+    def __iter__(self):
+        if self._usado:
+            raise RuntimeError("Un FlujoTokens solo se puede recorrer una vez")
+        self._usado = True
+        return self._generar()
+
+    def _generar(self):
+        nombres = self.lexico.TERMINALS
+        estado = [1, 0]
+        lote = _Lote()
+        buf = ""
+        pos = 0
+        #Posición absoluta de buf[0]; estado[1] es relativo a buf
+        base = 0
+        #(posición absoluta, marca) del comienzo de los bloques que siguen en buf
+        marcas = []
+        #Mientras hay un /* sin cerrar: [línea y comienzo de línea (absoluto) del /*, su posición
+        #absoluta, línea y comienzo de línea al final de lo descartado, (posición, marca) del bloque
+        #donde empieza]. Del comentario solo se guarda el último carácter, por si es el * de un */
+        #partido entre bloques. Si no aparece */, el lexer toma /* como / y * y sigue con tokens
+        #comunes hasta el final: se relee la fuente desde el /* (resto=True). Si la fuente no se
+        #puede releer, el comentario se acumula en buf hasta encontrar el cierre
+        abierto = None
+        resto = False
+        saltar = 0
+        bloques = self._bloques()
+        final = False
+        while not final:
+            bloque = next(bloques, None)
+            if bloque is None:
+                final = True
+            else:
+                data, marca = bloque
+                if saltar:
+                    corte = min(saltar, len(data))
+                    data = data[corte:]
+                    saltar -= corte
+                actual = (base + len(buf), marca)
+                if abierto is None:
+                    marcas.append(actual)
+                buf += data
+            if abierto is not None and abierto[5] is None:
+                #Fuente que no se puede releer: se acumula hasta el cierre
+                if not final and buf.find("*/", abierto[2]) == -1:
+                    abierto[2] = max(pos + 2, len(buf) - 1)
+                    continue
+                abierto = None
+            elif abierto is not None:
+                fin = buf.find("*/")
+                if fin == -1 and not final:
+                    corte = max(0, len(buf) - 1)
+                    FlujoTokens._saltar(abierto, buf, base, corte)
+                    base += corte
+                    buf = buf[corte:]
+                    continue
+                if fin == -1:
+                    #Sin cierre: se relee desde el /* y todo lo que sigue son tokens comunes
+                    linea, inicio_linea, inicio = abierto[:3]
+                    desde, marca = abierto[5]
+                    bloques = self._bloques(marca)
+                    saltar = inicio - desde
+                    buf, base, pos = "", inicio, 0
+                    estado = [linea, inicio_linea - inicio]
+                    marcas = []
+                    abierto = None
+                    resto = True
+                    final = False
+                    continue
+                #Cerrado: se sigue desde el */ (conservando la / para evaluar \b)
+                FlujoTokens._saltar(abierto, buf, base, fin + 2)
+                estado = [abierto[3], abierto[4] - (base + fin + 1)]
+                base += fin + 1
+                buf = buf[fin + 1:]
+                pos = 1
+                marcas = [actual]
+                abierto = None
+            while True:
+                pos = self.lexico._escanear(buf, pos, final, estado, lote, self.errors)
+                if resto and not final and buf.startswith("/*", pos):
+                    #Ya se sabe que este /* no se cierra: la / es un token más
+                    pos = self.lexico._escanear(buf, pos, True, estado, lote, self.errors, hasta=pos + 1)
+                    if not buf.startswith("*", pos):
+                        break
+                    continue
+                break
+            for tipo, line, col, start, end in lote.tokens:
+                yield (nombres[tipo], buf[start:end], line, col)
+            lote.tokens.clear()
+            if not final and not resto and buf.startswith("/*", pos):
+                desde = [m for m in marcas if m[0] <= base + pos][-1]
+                if desde[1] is None:
+                    abierto = [None, None, max(pos + 2, len(buf) - 1), None, None, None]
+                    continue
+                inicio_linea = base + estado[1]
+                abierto = [estado[0], inicio_linea, base + pos, estado[0], inicio_linea, desde]
+                base += pos + 2
+                buf = buf[pos + 2:]
+                pos = 0
+                continue
+            #Descarta lo ya reconocido, conservando un carácter para evaluar \b
+            corte = pos - 1
+            if corte > 0:
+                buf = buf[corte:]
+                base += corte
+                pos -= corte
+                estado[1] -= corte
+                while len(marcas) > 1 and marcas[1][0] <= base:
+                    marcas.pop(0)
+        self.lines = estado[0]
+
+    @staticmethod
+    def _saltar(abierto, buf, base, hasta):
+        #Cuenta los saltos de línea de buf[:hasta] dentro de un comentario que se descarta
+        saltos = buf.count("\n", 0, hasta)
+        if saltos:
+            abierto[3] += saltos
+            abierto[4] = base + buf.rfind("\n", 0, hasta) + 1
+
+
+class _Lote:
+    #Recibe los tokens de un bloque con la misma interfaz que AlmacenTokens
+    def __init__(self):
+        self.tokens = []
+
+    def agregar(self, tipo, line, col, start, end):
+        self.tokens.append((tipo, line, col, start, end))
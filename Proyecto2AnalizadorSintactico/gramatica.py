@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from lexico import Lexico
+from tabla import Tabla
+
+
+class Gramatica:
+    #Versión del formato del caché; cambiarla invalida los archivos existentes
+    VERSION = 1
+    #Artefactos compilados en este proceso
+    _compilada = None
+
+    def __init__(self, first, follow, table, conflicts, huella):
+        self.first = first
+        self.follow = follow
+        self.table = table
+        self.conflicts = conflicts
+        self.huella = huella
+        #Versión codificada con enteros que usa el ciclo del parser
+        self.compilada = Lexico.compile_table(table)
+
+    @staticmethod
+    def huella_gramatica():
+        #Hash estable de la gramática; identifica los artefactos en el caché
+        data = json.dumps({"version": Gramatica.VERSION, "grammar": Lexico.GRAMMAR}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def compilar(cache_path=None):
+        #Devuelve FIRST, FOLLOW, tabla y conflictos calculados una sola vez por proceso
+        huella = Gramatica.huella_gramatica()
+        g = Gramatica._compilada
+        if g is not None and g.huella == huella:
+            return g
+        g = Gramatica.leer_cache(cache_path, huella) if cache_path else None
+        if g is None:
+            FIRST = Lexico.compute_first()
+            FOLLOW = Lexico.compute_follow(FIRST)
+            table, conflicts = Tabla.build_table(FIRST, FOLLOW)
+            g = Gramatica(FIRST, FOLLOW, table, conflicts, huella)
+            if cache_path:
+                Gramatica.escribir_cache(g, cache_path)
+        Gramatica._compilada = g
+        return g
+
+    @staticmethod
+    def leer_cache(path, huella):
+        #Lee los artefactos del disco; devuelve None si faltan, están dañados o son de otra gramática
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("huella") != huella:
+            return None
+        try:
+            first = {A: set(v) for A, v in data["first"].items()}
+            follow = {A: set(v) for A, v in data["follow"].items()}
+            table = data["table"]
+            conflicts = [tuple(c) for c in data["conflicts"]]
+        except (KeyError, TypeError, AttributeError):
+            return None
+        return Gramatica(first, follow, table, conflicts, huella)
+
+    @staticmethod
+    def escribir_cache(g, path):
+        #Escribe el caché de forma atómica; un fallo de escritura no es fatal
+        data = {
+            "huella": g.huella,
+            "first": {A: sorted(v) for A, v in g.first.items()},
+            "follow": {A: sorted(v) for A, v in g.follow.items()},
+            "table": g.table,
+            "conflicts": [list(c) for c in g.conflicts],
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            return True
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    def limpiar():
+        #Olvida los artefactos del proceso (útil si se modifica Lexico.GRAMMAR en caliente)
+        Gramatica._compilada = None
@@ -0,0 +1,204 @@
+from array import array
+
+
+class Historial:
+    #Niveles de registro aceptados por Lexico.parse
+    NIVELES = ("none", "final", "every", "full")
+    #Acciones de los pasos; cada paso guarda el índice de la suya
+    ACCIONES = ("start", "expand", "match", "insert", "skip", "sync", "accept", "final")
+    _CODIGOS = {a: i for i, a in enumerate(ACCIONES)}
+
+    #Historial compacto de la derivación: guarda un registro de eventos en lugar
+    #de una copia del árbol por paso y reconstruye cualquier paso bajo demanda.
+    #Los pasos van en arreglos de enteros (acción, dato y evento): un info entero (posición
+    #del token o índice de la producción) se convierte en dict con describir(acción, dato)
+    #al pedir el paso; solo los info que no son enteros (los de errores) se guardan tal cual.
+    #Con tabla (la TablaCompilada de un parse sin árbol) root es solo la raíz: el árbol se rehace
+    #repitiendo los pasos sobre una pila de nodos, y solo hasta el paso que se pide
+    def __init__(self, root, every=1, describir=None, tabla=None):
+        self.root = root
+        self.every = max(1, int(every))
+        self.describir = describir
+        self._tabla = tabla
+        #Pila de nodos como la de Lexico.parse: debajo de la raíz va el lugar del $
+        self._pila = [None, root] if tabla is not None else None
+        self._hechos = 0
+        self._acciones = array("b")
+        self._datos = array("q")
+        self._eventos_paso = array("q")
+        self._info = {}
+        self._expandido = {}
+        self._eventos = 0
+        self._pendiente = None
+        self._ultimo = (None, None)
+        #Subárboles que ya no cambian: evento de su última expansión y copia compartida
+        self._fin = None
+        self._completos = {}
+
+    @staticmethod
+    def final(root, action="final"):
+        #Historial de un solo paso con el árbol terminado, sin registro de eventos
+        h = Historial(root)
+        h._expandido = None
+        h._agregar(action, None, 0)
+        return h
+
+    def registrar(self, action, info=None, nodo=None):
+        #Agrega un paso; si el paso expande un nodo se anota en qué evento ocurrió
+        self._eventos += 1
+        if nodo is not None:
+            self._expandido[id(nodo)] = self._eventos
+        #En modo muestreado solo se conserva uno de cada N pasos (y siempre la aceptación)
+        if (self._eventos - 1) % self.every == 0 or action == "accept":
+            self._agregar(action, info, self._eventos)
+            self._pendiente = None
+        else:
+            self._pendiente = (action, info, self._eventos)
+
+    def _agregar(self, action, info, evento):
+        if info is None:
+            dato = -1
+        elif type(info) is int:
+            dato = info
+        else:
+            dato = -1
+            self._info[len(self._acciones)] = info
+        self._acciones.append(Historial._CODIGOS[action])
+        self._datos.append(dato)
+        self._eventos_paso.append(evento)
+
+    def cerrar(self):
+        #Garantiza que el último evento quede disponible como paso final
+        if self._pendiente is not None:
+            self._agregar(*self._pendiente)
+            self._pendiente = None
+
+    def __len__(self):
+        return len(self._acciones)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self._acciones)
+        if i < 0 or i >= len(self._acciones):
+            raise IndexError("paso fuera de rango")
+        action = Historial.ACCIONES[self._acciones[i]]
+        info = self._info.get(i)
+        if info is None and self._datos[i] >= 0:
+            info = self.describir(action, self._datos[i])
+        return {"action": action, "info": info, "tree": self.arbol_en(self._eventos_paso[i])}
+
+    def __iter__(self):
+        for i in range(len(self._acciones)):
+            yield self[i]
+
+    def arbol_final(self):
+        #Árbol terminado (rehecho por completo si el parse no lo creó)
+        if self._pila is not None:
+            self._avanzar(len(self._acciones))
+        return self.root
+
+    def arbol_en(self, evento):
+        #Reconstruye el árbol tal como estaba después del evento indicado
+        if self._expandido is None:
+            return self.root
+        if self._ultimo[0] == evento:
+            return self._ultimo[1]
+        if self._pila is not None and evento > self._hechos:
+            self._avanzar(evento)
+        expandido = self._expandido
+        if self._fin is None:
+            self._fin = self._ultimos_eventos()
+        fin = self._fin
+        copia = self._copiar_nodo(self.root, evento, es_raiz=True)
+        pila = [(self.root, copia)]
+        while pila:
+            n, c = pila.pop()
+            if not c.get("expanded"):
+                continue
+            hijos = []
+            for h in n.get("children", []):
+                if fin[id(h)] <= evento:
+                    #El subárbol ya está terminado: se comparte la misma copia entre pasos
+                    hijos.append(self._completo(h))
+                    continue
+                hc = self._copiar_nodo(h, evento)
+                hijos.append(hc)
+                if expandido.get(id(h), evento + 1) <= evento:
+                    pila.append((h, hc))
+            c["children"] = hijos
+        self._ultimo = (evento, copia)
+        return copia
+
+    def _avanzar(self, evento):
+        #Rehace el árbol hasta el evento pedido, o hasta el doble de lo ya rehecho para que recorrer
+        #los pasos de a uno no recalcule todo cada vez (solo pasos de un parse con record="full")
+        hasta = min(len(self._acciones), max(evento, 2 * self._hechos))
+        plantillas, invertidas = self._tabla.plantillas, self._tabla.invertidas
+        c = Historial._CODIGOS
+        expandir, coincidir, insertar, sincronizar = c["expand"], c["match"], c["insert"], c["sync"]
+        pila, expandido, acciones, datos = self._pila, self._expandido, self._acciones, self._datos
+        for i in range(self._hechos, hasta):
+            a = acciones[i]
+            if a == expandir:
+                #Mismos nodos que crea Lexico.parse: su id lleva el número de pasos previos
+                k = datos[i]
+                node = pila.pop()
+                node["expanded"] = True
+                sid = str(i)
+                children = [{"id":pre + sid,"sym":sym,"children":()} for pre, sym in plantillas[k]]
+                node["children"] = children
+                expandido[id(node)] = i + 1
+                if invertidas[k]:
+                    pila.extend(reversed(children))
+            elif a == coincidir or a == insertar:
+                pila.pop()
+            elif a == sincronizar and "popped" in self._info[i]:
+                del pila[len(pila) - len(self._info[i]["popped"]):]
+        self._hechos = hasta
+        self._fin = None
+
+    def _ultimos_eventos(self):
+        #Para cada nodo, el último evento que modifica su subárbol (postorden iterativo); los nodos
+        #que siguen en la pila de un árbol rehecho a medias todavía pueden cambiar
+        expandido = self._expandido
+        pendientes = {id(n) for n in self._pila} if self._pila is not None else ()
+        fin = {}
+        pila = [(self.root, False)]
+        while pila:
+            n, listo = pila.pop()
+            hijos = n.get("children", [])
+            if listo or not hijos:
+                fin[id(n)] = max([expandido.get(id(n), 0)] + [fin[id(h)] for h in hijos])
+                if id(n) in pendientes:
+                    fin[id(n)] = float("inf")
+            else:
+                pila.append((n, True))
+                pila.extend((h, False) for h in hijos)
+        return fin
+
+    def _completo(self, n):
+        #Copia del subárbol en su estado final, creada una sola vez
+        c = self._completos.get(id(n))
+        if c is not None:
+            return c
+        expandido = self._expandido
+        c = {"id": n.get("id"), "sym": n.get("sym"), "children": []}
+        pila = [(n, c)]
+        while pila:
+            m, mc = pila.pop()
+            if id(m) in expandido:
+                mc["expanded"] = True
+            hijos = [{"id": h.get("id"), "sym": h.get("sym"), "children": []} for h in m.get("children", [])]
+            mc["children"] = hijos
+            pila.extend(zip(m.get("children", []), hijos))
+        self._completos[id(n)] = c
+        return c
+
+    def _copiar_nodo(self, n, evento, es_raiz=False):
+        #Copia superficial del nodo con el estado de expansión correspondiente al evento
+        c = {"id": n.get("id"), "sym": n.get("sym"), "children": []}
+        if self._expandido.get(id(n), evento + 1) <= evento:
+            c["expanded"] = True
+        elif es_raiz:
+            c["expanded"] = False
+        return c
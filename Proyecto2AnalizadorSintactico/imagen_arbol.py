@@ -0,0 +1,170 @@
+import struct
+import zlib
+from xml.sax.saxutils import escape
+from arbol import Arbol
+
+
+class ImagenArbol:
+    #Dibuja el árbol ya distribuido (Arbol.layout_arreglos) sin Tk ni pantalla:
+    #  - SVG: los elementos se escriben en el archivo a medida que se generan.
+    #  - PNG: la imagen se dibuja con Pillow por franjas horizontales y cada franja se
+    #    comprime y escribe antes de dibujar la siguiente, así la memoria depende del ancho
+    #    de la imagen y no de su área.
+    #Mismas medidas y colores que el canvas de la interfaz
+    MARGEN_X = 60
+    MARGEN_Y = 40
+    PX_POR_UNIDAD = 100
+    Y0 = 30
+    Y_STEP = 70
+    FONDO = "#0f172a"
+    ARISTA = "#5599ff"
+    #Memoria máxima aproximada de una franja del PNG (bytes RGB)
+    MEMORIA_FRANJA = 32 * 1024 * 1024
+
+    @staticmethod
+    def geometria(tree, compacto=False, escala=1.0):
+        #Posiciones en píxeles por nivel: {"orden","primer","niveles","x","y","ancho","alto"}
+        orden, primer, niveles, xs = Arbol.layout_arreglos(tree, compacto)
+        minx, maxx = min(xs), max(xs)
+        px = ImagenArbol.PX_POR_UNIDAD * escala
+        mx = ImagenArbol.MARGEN_X * escala
+        x = [mx + (v - minx) * px for v in xs]
+        y = [(ImagenArbol.MARGEN_Y + ImagenArbol.Y0 + d * ImagenArbol.Y_STEP) * escala for d in range(len(niveles) - 1)]
+        return {
+            "orden": orden, "primer": primer, "niveles": niveles, "x": x, "y": y, "escala": escala,
+            "ancho": int(mx + (maxx - minx) * px + mx) + 1,
+            "alto": int(y[-1] + ImagenArbol.MARGEN_Y * escala) + 1,
+        }
+
+    @staticmethod
+    def _elementos(geo, y_min=None, y_max=None):
+        #Genera ("arista", x0, y0, x1, y1) y ("nodo", sym, x, y, w, h) cuyo rango vertical
+        #toca [y_min, y_max); las aristas de cada nivel salen antes que sus nodos
+        orden, primer, niveles, xs, ys = geo["orden"], geo["primer"], geo["niveles"], geo["x"], geo["y"]
+        e = geo["escala"]
+        #Medio alto de un nodo más el grosor del trazo
+        medio = 14 * e + 2 * e + 1
+        pad = 2 * e + 1
+        for d in range(len(ys)):
+            y = ys[d]
+            if d + 1 < len(ys):
+                ya, yb = y + 16 * e, ys[d + 1] - 16 * e
+                if (y_min is None or yb + pad >= y_min) and (y_max is None or ya - pad < y_max):
+                    for i in range(niveles[d], niveles[d + 1]):
+                        for j in range(primer[i], primer[i + 1]):
+                            yield ("arista", xs[i], ya, xs[j], yb)
+            if (y_min is None or y + medio >= y_min) and (y_max is None or y - medio < y_max):
+                for i in range(niveles[d], niveles[d + 1]):
+                    lab = orden[i].get("sym", "?")
+                    w, h = Arbol.estilo_nodo(lab)[:2]
+                    yield ("nodo", lab, xs[i], y, w * e, h * e)
+
+    @staticmethod
+    def escribir_svg(tree, fh, compacto=False, escala=1.0):
+        #Escribe el árbol como SVG en un archivo de texto abierto
+        geo = ImagenArbol.geometria(tree, compacto, escala)
+        e = escala
+        fh.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{geo["ancho"]}" height="{geo["alto"]}" '
+                 f'viewBox="0 0 {geo["ancho"]} {geo["alto"]}">\n')
+        fh.write(f'<rect width="100%" height="100%" fill="{ImagenArbol.FONDO}"/>\n')
+        fh.write(f'<g font-family="Consolas, monospace" font-weight="bold" font-size="{11 * e:.1f}" '
+                 f'text-anchor="middle" dominant-baseline="central">\n')
+        for el in ImagenArbol._elementos(geo):
+            if el[0] == "arista":
+                _, x0, y0, x1, y1 = el
+                fh.write(f'<line x1="{x0:.1f}" y1="{y0:.1f}" x2="{x1:.1f}" y2="{y1:.1f}" '
+                         f'stroke="{ImagenArbol.ARISTA}" stroke-width="{2 * e:.1f}"/>\n')
+            else:
+                _, lab, x, y, w, h = el
+                _, _, fill, outline, text_color = Arbol.estilo_nodo(lab)
+                fh.write(f'<ellipse cx="{x:.1f}" cy="{y:.1f}" rx="{w / 2:.1f}" ry="{h / 2:.1f}" '
+                         f'fill="{fill}" stroke="{outline}" stroke-width="{2 * e:.1f}"/>'
+                         f'<text x="{x:.1f}" y="{y:.1f}" fill="{text_color}">{escape(lab)}</text>\n')
+        fh.write("</g>\n</svg>\n")
+
+    @staticmethod
+    def _fuente(escala):
+        from PIL import ImageFont
+        tam = max(6, round(11 * escala))
+        for nombre in ("consolab.ttf", "DejaVuSansMono-Bold.ttf", "DejaVuSans-Bold.ttf"):
+            try:
+                return ImageFont.truetype(nombre, tam)
+            except OSError:
+                pass
+        try:
+            return ImageFont.load_default(tam)
+        except TypeError:
+            return ImageFont.load_default()
+
+    @staticmethod
+    def _dibujar(draw, geo, fuente, y_min, y_max, dy=0):
+        #Dibuja en draw los elementos de la franja [y_min, y_max) desplazados dy píxeles.
+        #Las coordenadas se redondean antes de desplazar para que cada franja produzca los
+        #mismos píxeles que la imagen completa
+        e = geo["escala"]
+        lw = max(1, round(2 * e))
+        for el in ImagenArbol._elementos(geo, y_min, y_max):
+            if el[0] == "arista":
+                _, x0, y0, x1, y1 = el
+                draw.line((round(x0), round(y0) - dy, round(x1), round(y1) - dy), fill=ImagenArbol.ARISTA, width=lw)
+            else:
+                _, lab, x, y, w, h = el
+                _, _, fill, outline, text_color = Arbol.estilo_nodo(lab)
+                draw.ellipse((round(x - w / 2), round(y - h / 2) - dy, round(x + w / 2), round(y + h / 2) - dy),
+                             fill=fill, outline=outline, width=lw)
+                l, t, r, b = draw.textbbox((0, 0), lab, font=fuente)
+                draw.text((round(x - (l + r) / 2), round(y - (t + b) / 2) - dy), lab, font=fuente, fill=text_color)
+
+    @staticmethod
+    def a_imagen(tree, compacto=False, escala=1.0):
+        #Imagen Pillow completa del árbol (para árboles que entran en memoria);
+        #devuelve None si Pillow no está instalado
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError:
+            return None
+        geo = ImagenArbol.geometria(tree, compacto, escala)
+        img = Image.new("RGB", (geo["ancho"], geo["alto"]), ImagenArbol.FONDO)
+        ImagenArbol._dibujar(ImageDraw.Draw(img), geo, ImagenArbol._fuente(escala), 0, geo["alto"])
+        return img
+
+    @staticmethod
+    def escribir_png(tree, fh, compacto=False, escala=1.0, franja=None):
+        #Escribe el árbol como PNG en un archivo binario abierto, dibujando y comprimiendo
+        #una franja de filas por vez. franja: alto de cada franja en píxeles (por defecto
+        #el mayor que entra en MEMORIA_FRANJA)
+        from PIL import Image, ImageDraw
+        geo = ImagenArbol.geometria(tree, compacto, escala)
+        ancho, alto = geo["ancho"], geo["alto"]
+        if franja is None:
+            franja = ImagenArbol.MEMORIA_FRANJA // (ancho * 3)
+        franja = max(1, min(int(franja), alto))
+        fuente = ImagenArbol._fuente(escala)
+
+        def chunk(tipo, datos):
+            fh.write(struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos)))
+
+        fh.write(b"\x89PNG\r\n\x1a\n")
+        chunk(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 8, 2, 0, 0, 0))
+        comp = zlib.compressobj(6)
+        fila = ancho * 3
+        #Cada franja se dibuja con un margen arriba y abajo: Pillow recorta mal el texto que
+        #empieza fuera de la imagen, así ningún nodo que toca la franja queda cortado
+        extra = int(20 * escala) + 2
+        for y0 in range(0, alto, franja):
+            h = min(franja, alto - y0)
+            arriba = min(extra, y0)
+            img = Image.new("RGB", (ancho, arriba + h + extra), ImagenArbol.FONDO)
+            ImagenArbol._dibujar(ImageDraw.Draw(img), geo, fuente, y0 - arriba, y0 + h + extra, dy=y0 - arriba)
+            datos = img.tobytes()[arriba * fila:(arriba + h) * fila]
+            del img
+            #Cada fila lleva el byte de filtro 0 (sin filtro)
+            crudo = bytearray()
+            for r in range(h):
+                crudo += b"\x00"
+                crudo += datos[r * fila:(r + 1) * fila]
+            comprimido = comp.compress(bytes(crudo))
+            if comprimido:
+                chunk(b"IDAT", comprimido)
+        chunk(b"IDAT", comp.flush())
+        chunk(b"IEND", b"")
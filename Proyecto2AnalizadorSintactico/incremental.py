@@ -0,0 +1,347 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from lexico import Lexico
+from gramatica import Gramatica
+from almacen_tokens import AlmacenTokens
+
+
+class AnalisisIncremental:
+    #Análisis que se actualiza con cada edición del editor:
+    #  - lexer: se re-lexa desde el token anterior a la edición hasta que los tokens nuevos
+    #    vuelven a coincidir (desplazados) con los anteriores; el resto se reutiliza.
+    #  - parser: se reanuda desde la última frontera anterior a la edición, entre miembros de la
+    #    clase (pila [$, }, MemberList]) o entre sentencias de un método ([$, }, MemberList, }, StmtList]),
+    #    o desde el principio si no hay ninguna; se detiene en la primera frontera posterior que
+    #    coincide (mismo token y misma pila) con una del análisis anterior: desde ahí el resultado es idéntico.
+    #Con limite (en tokens), actualizar/editar devuelven None y dejan el estado como estaba si la
+    #edición no se resuelve con un empalme barato: haría falta un análisis completo, o el re-lexado
+    #o el parse reanudado pasan de limite tokens sin resincronizar (p. ej. al abrir un comentario)
+    #Ventana de caracteres que se re-lexa antes de volver a buscar la resincronización
+    VENTANA = 256
+    #Pila del parser en cada tipo de frontera, según cuántos nodos guarda (ver Lexico.parse)
+    PILAS = {1: ["$", "}", "MemberList"], 3: ["$", "}", "MemberList", "}", "StmtList"]}
+
+    def __init__(self, lexico=None, cache_path=None):
+        self.lexico = lexico or Lexico()
+        self.gram = Gramatica.compilar(cache_path)
+        self.text = ""
+        self.tokens = None
+        self.lex_errors = []
+        self.lines = 1
+        self.parse_res = None
+        #Fronteras del último análisis en columnas paralelas: token, nodos de la pila, errores y
+        #celdas usadas hasta ahí (así desplazarlas tras una edición no crea una tupla por frontera)
+        self._fr_ips = array("q")
+        self._fr_nodos = []
+        self._fr_errores = array("q")
+        self._fr_usadas = array("q")
+        self._step_id = 0
+
+    def analizar(self, text, progreso=None):
+        #Análisis completo; deja listo el estado para las ediciones siguientes.
+        #progreso(etapa, hecho, total, tokens) se llama mientras lexa ("lexer", caracteres) y en
+        #cada frontera entre miembros ("parser", tokens); puede lanzar una excepción para cancelar
+        self.text = text
+        avance = None
+        if progreso is not None:
+            total = len(text)
+            avance = lambda n, pos: progreso("lexer", pos, total, n)
+        lex = self.lexico.lexer(text, progreso=avance)
+        self.tokens, self.lex_errors, self.lines = lex["tokens"], lex["errors"], lex["lines"]
+        self._parsear_todo(progreso)
+        return self.resultado()
+
+    def actualizar(self, text, limite=None):
+        #Calcula la región editada comparando con el texto anterior y la aplica
+        if self.tokens is None:
+            return self.analizar(text) if limite is None else None
+        viejo = self.text
+        ini = AnalisisIncremental._prefijo_comun(viejo, text)
+        maximo = min(len(viejo), len(text)) - ini
+        suf = AnalisisIncremental._sufijo_comun(viejo, text, maximo)
+        return self.editar(ini, len(viejo) - suf, text[ini:len(text) - suf], limite)
+
+    def resultado(self):
+        #Mismo formato que devuelven Lexico.lexer y Lexico.parse
+        p = self.parse_res
+        return {
+            "lex": {"tokens": self.tokens, "errors": self.lex_errors, "lines": self.lines},
+            "parse": {"errors": p["errors"], "steps": [], "tree": p["tree"], "used_cells": p["used_cells"]},
+        }
+
+    def editar(self, a, b, nuevo, limite=None):
+        #Reemplaza text[a:b] por nuevo y actualiza tokens, errores y árbol
+        viejo_text = self.text
+        text = viejo_text[:a] + nuevo + viejo_text[b:]
+        L = len(nuevo)
+        delta = L - (b - a)
+        fin_edit = a + L
+        if self.tokens is None:
+            return self.analizar(text) if limite is None else None
+        #Un */ nuevo podría cerrar un /* sin cerrar anterior a la edición: se re-analiza todo
+        if text.find("*/", max(0, a - 1), fin_edit + 1) != -1 and viejo_text.find("*/", max(0, a - 1)) == -1 \
+                and viejo_text.rfind("/*", 0, a + 1) != -1:
+            return self.analizar(text) if limite is None else None
+
+        old = self.tokens
+        n_old = len(old)
+        #Primer token que puede cambiar: se re-lexa desde el token que termina antes de la edición
+        j = bisect_left(old.ends, a)
+        if j == 0:
+            i0, p0, estado = 0, 0, [1, 0]
+        else:
+            i0 = j - 1
+            p0 = old.starts[i0]
+            estado = [old.lines[i0], p0 - old.cols[i0] + 1]
+        pos_p0 = (estado[0], p0 - estado[1] + 1)
+
+        #Re-lexado por ventanas hasta encontrar un token alineado con uno anterior (con limite,
+        #también el texto insertado va por ventanas, para cortar apenas se pase)
+        sink = AlmacenTokens(text, old.nombres)
+        errs = []
+        pos = p0
+        lim = p0 if limite is not None else max(fin_edit, p0)
+        r_old = None
+        t = 0
+        revisados = 0
+        while r_old is None:
+            lim += AnalisisIncremental.VENTANA
+            pos = self.lexico._escanear(text, pos, True, estado, sink, errs, hasta=lim)
+            for t in range(revisados, len(sink)):
+                q = sink.starts[t]
+                if q > fin_edit or (L == 0 and q == fin_edit):
+                    k = bisect_left(old.starts, q - delta)
+                    if k < n_old and old.starts[k] == q - delta:
+                        r_old = k
+                        break
+            revisados = len(sink)
+            if r_old is None and pos >= len(text):
+                break
+            if r_old is None and limite is not None and len(sink) > limite:
+                return None
+
+        if r_old is None:
+            r_old, t = n_old, len(sink)
+            dline = dcol = 0
+            linea_r = col_r = None
+        else:
+            linea_r, col_r = old.lines[r_old], old.cols[r_old]
+            dline = sink.lines[t] - linea_r
+            dcol = sink.cols[t] - col_r
+            corte = (sink.lines[t], sink.cols[t])
+            errs = [e for e in errs if (e["line"], e["col"]) < corte]
+
+        def mover(e):
+            #Traslada la posición de un error ubicado después de la resincronización
+            if not dline and not (dcol and e["line"] == linea_r and e["col"] >= col_r):
+                return e
+            misma = e["line"] == linea_r and e["col"] >= col_r
+            movido = {**e, "line": e["line"] + dline, "col": e["col"] + dcol if misma else e["col"]}
+            if "end_col" in e:
+                #Rachas de caracteres ilegales: terminan en la misma línea en que empiezan
+                movido["end_line"] = movido["line"]
+                movido["end_col"] = e["end_col"] + dcol if misma else e["end_col"]
+            return movido
+
+        #Nuevas columnas: prefijo intacto + tokens re-lexados + cola desplazada
+        misma_linea = bisect_right(old.lines, linea_r, lo=r_old) - r_old if r_old < n_old else 0
+        cols_cola = old.cols[r_old:]
+        if dcol and misma_linea:
+            cols_cola = array("i", map(dcol.__add__, cols_cola[:misma_linea])) + cols_cola[misma_linea:]
+        tokens = AlmacenTokens.desde_columnas(
+            text, old.nombres,
+            old.types[:i0] + sink.types[:t] + old.types[r_old:],
+            old.lines[:i0] + sink.lines[:t] + (array("i", map(dline.__add__, old.lines[r_old:])) if dline else old.lines[r_old:]),
+            old.cols[:i0] + sink.cols[:t] + cols_cola,
+            old.starts[:i0] + sink.starts[:t] + (array("q", map(delta.__add__, old.starts[r_old:])) if delta else old.starts[r_old:]),
+            old.ends[:i0] + sink.ends[:t] + (array("q", map(delta.__add__, old.ends[r_old:])) if delta else old.ends[r_old:]),
+        )
+        r_new = i0 + t
+        alineado = r_old < n_old
+
+        lex_errors = [e for e in self.lex_errors if (e["line"], e["col"]) < pos_p0] + errs
+        if alineado:
+            lex_errors += [mover(e) for e in self.lex_errors if (e["line"], e["col"]) >= (linea_r, col_r)]
+        #Con el tope de errores superado el lexer se detiene: eso solo lo reproduce un análisis completo
+        tope = self.lexico.max_errores
+        if tope is not None and (len(lex_errors) > tope or len(self.lex_errors) > tope):
+            return self.analizar(text) if limite is None else None
+
+        anterior = (self.text, self.tokens, self.lex_errors, self.lines)
+        self.text = text
+        self.tokens = tokens
+        self.lex_errors = lex_errors
+        self.lines = self.lines + nuevo.count("\n") - viejo_text.count("\n", a, b)
+        if not self._reparsear(i0, r_new, r_new - r_old, alineado, mover, limite):
+            self.text, self.tokens, self.lex_errors, self.lines = anterior
+            return None
+        return self.resultado()
+
+    def _parsear_todo(self, progreso=None):
+        #Parse completo registrando las fronteras entre miembros y entre sentencias
+        ips, nodos, errores, usadas = array("q"), [], array("q"), array("q")
+        n_tokens = len(self.tokens)
+
+        def en_frontera(ip, ns, n_errors, n_used):
+            ips.append(ip)
+            nodos.append(ns)
+            errores.append(n_errors)
+            usadas.append(n_used)
+            if progreso is not None:
+                progreso("parser", ip, n_tokens, n_tokens)
+            return False
+
+        g = self.gram
+        res = Lexico.parse(self.tokens, g.first, g.follow, g.compilada, record="none", en_frontera=en_frontera)
+        self._fr_ips, self._fr_nodos, self._fr_errores, self._fr_usadas = ips, nodos, errores, usadas
+        self._step_id = res["resume"]["step_id"]
+        self.parse_res = res
+
+    def _reparsear(self, i0, r_new, delta_tokens, alineado, mover, limite=None):
+        #Reanuda el parser desde la última frontera cuyos tokens no cambiaron (o desde el principio).
+        #Devuelve False, con el árbol anterior intacto, si pasa de limite tokens sin resincronizar
+        fr_ips, fr_nodos, fr_errores, fr_usadas = self._fr_ips, self._fr_nodos, self._fr_errores, self._fr_usadas
+        kb = bisect_left(fr_ips, i0) - 1
+        old = self.parse_res
+        #Hijos originales de los nodos del árbol anterior que el parse reanudado reescribe
+        previo = {}
+        if kb < 0:
+            ip_k, nerr_k, nused_k, reanudados = 0, 0, 0, []
+            root = {"id":"Prog_0","sym":"Prog","children":[],"expanded":False}
+            pila, nodos_k = ["$", "Prog"], [None, root]
+        else:
+            ip_k, reanudados, nerr_k, nused_k = fr_ips[kb], fr_nodos[kb], fr_errores[kb], fr_usadas[kb]
+            root = old["tree"]
+            cierre = root["children"][0]["children"][4]
+            pila, nodos_k = AnalisisIncremental.PILAS[len(reanudados)], [None, cierre] + reanudados
+            #MemberList y StmtList: con recuperación de errores varias fronteras pueden compartirlos
+            for n in reanudados[::2]:
+                previo[id(n)] = (n["children"], n.get("expanded"))
+                n["children"] = []
+                n.pop("expanded", None)
+        n_new = len(self.tokens)
+        ips, nodos, errores, usadas = array("q"), [], array("q"), array("q")
+        sync = [None]
+        excedido = [False]
+
+        def en_frontera(ip, ns, n_errors, n_used):
+            ips.append(ip)
+            nodos.append(ns)
+            errores.append(nerr_k + n_errors)
+            usadas.append(nused_k + n_used)
+            if alineado and r_new <= ip < n_new:
+                #Frontera anterior en el mismo token y con la misma pila
+                idx = bisect_left(fr_ips, ip - delta_tokens, kb + 1)
+                while idx < len(fr_ips) and fr_ips[idx] == ip - delta_tokens:
+                    if len(fr_nodos[idx]) == len(ns):
+                        sync[0] = idx
+                        return True
+                    idx += 1
+            if limite is not None and ip - ip_k > limite:
+                excedido[0] = True
+                return True
+            return False
+
+        g = self.gram
+        res = Lexico.parse(self.tokens, g.first, g.follow, g.compilada, record="none",
+                           reanudar={"root": root, "stack": pila, "nodes": nodos_k, "ip": ip_k,
+                                     "step_id": self._step_id},
+                           en_frontera=en_frontera)
+        if excedido[0]:
+            for n in reanudados[::2]:
+                n["children"], expandido = previo[id(n)]
+                n.pop("expanded", None)
+                if expandido:
+                    n["expanded"] = True
+            return False
+        errors = old["errors"][:nerr_k] + res["errors"]
+        used = old["used_cells"][:nused_k] + res["used_cells"]
+        k = max(kb, 0)
+        ips, nodos, errores, usadas = fr_ips[:k] + ips, fr_nodos[:k] + nodos, fr_errores[:k] + errores, fr_usadas[:k] + usadas
+        j = sync[0]
+        if j is not None:
+            #Desde la frontera sincronizada se reutiliza el resto del árbol y de los resultados
+            nodos_j, nodos_q = fr_nodos[j], nodos[-1]
+
+            def adoptar(nuevo, viejo):
+                #El nodo nuevo recibe los hijos que tenía el anterior (antes de reanudar)
+                nuevo["children"], expandido = previo.get(id(viejo)) or (viejo["children"], viejo.get("expanded"))
+                if expandido:
+                    nuevo["expanded"] = True
+
+            m_j, m_q = nodos_j[0], nodos_q[0]
+            resto = fr_nodos[j + 1:]
+            if m_j is m_q:
+                adoptar(m_q, m_j)
+            elif kb < 0 or m_j is not nodos_k[2]:
+                #Sincronizó en un miembro que el parse reanudado volvió a crear: su MemberList (y el }
+                #de su bloque) anteriores vuelven al árbol en lugar de los nuevos, así las fronteras
+                #siguientes siguen apuntando a nodos del árbol
+                padre, h = root["children"][0], 3
+                while padre["children"][h] is not m_q:
+                    padre, h = padre["children"][h], 1
+                padre["children"][h] = m_j
+                if len(nodos_q) == 3:
+                    bloque = padre["children"][0]["children"][2]["children"][3]
+                    bloque["children"][2] = nodos_j[1]
+                i = len(nodos) - 1
+                while i >= 0 and nodos[i][0] is m_q:
+                    ns = [m_j] + nodos[i][1:]
+                    if len(ns) == 3 and len(nodos_q) == 3:
+                        ns[1] = nodos_j[1]
+                    nodos[i] = ns
+                    i -= 1
+            else:
+                #El MemberList anterior es el reanudado y el parse ya lo expandió (p. ej. se cerró el
+                #método antes): los nodos nuevos reciben sus hijos y lo reemplazan en las fronteras
+                #siguientes de ese miembro
+                adoptar(m_q, m_j)
+                i = 0
+                while i < len(resto) and resto[i][0] is m_j:
+                    resto[i] = [m_q] if len(resto[i]) == 1 else nodos_q[:2] + resto[i][2:]
+                    i += 1
+            if len(nodos_q) == 3:
+                #El StmtList nuevo recibe los hijos del anterior (y lo reemplaza en las fronteras
+                #siguientes que lo repiten tras saltar tokens con errores)
+                sl_j, sl_q = nodos_j[2], nodos_q[2]
+                adoptar(sl_q, sl_j)
+                i = 0
+                while i < len(resto) and len(resto[i]) == 3 and resto[i][2] is sl_j:
+                    resto[i] = resto[i][:2] + [sl_q]
+                    i += 1
+            errors += [mover(e) for e in old["errors"][fr_errores[j]:]]
+            used += old["used_cells"][fr_usadas[j]:]
+            d_err, d_used = errores[-1] - fr_errores[j], usadas[-1] - fr_usadas[j]
+            nodos += resto
+            ips += array("q", map(delta_tokens.__add__, fr_ips[j + 1:])) if delta_tokens else fr_ips[j + 1:]
+            errores += array("q", map(d_err.__add__, fr_errores[j + 1:])) if d_err else fr_errores[j + 1:]
+            usadas += array("q", map(d_used.__add__, fr_usadas[j + 1:])) if d_used else fr_usadas[j + 1:]
+        self._fr_ips, self._fr_nodos, self._fr_errores, self._fr_usadas = ips, nodos, errores, usadas
+        self._step_id = res["resume"]["step_id"]
+        self.parse_res = {"errors": errors, "steps": [], "tree": root, "used_cells": used}
+        return True
+
+    @staticmethod
+    def _prefijo_comun(a, b):
+        #Longitud del prefijo común comparando bloques (las comparaciones corren en C)
+        n = min(len(a), len(b))
+        i = 0
+        paso = 4096
+        while i < n and a[i:i+paso] == b[i:i+paso]:
+            i += paso
+        fin = min(i + paso, n)
+        while i < fin and a[i] == b[i]:
+            i += 1
+        return min(i, n)
+
+    @staticmethod
+    def _sufijo_comun(a, b, maximo):
+        #Longitud del sufijo común, sin superar maximo caracteres
+        la, lb = len(a), len(b)
+        i = 0
+        paso = 4096
+        while i + paso <= maximo and a[la-i-paso:la-i] == b[lb-i-paso:lb-i]:
+            i += paso
+        while i < maximo and a[la-i-1] == b[lb-i-1]:
+            i += 1
+        return i
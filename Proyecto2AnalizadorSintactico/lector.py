@@ -35,6 +35,23 @@ class Lector:
         except Exception:
             return False
 
+    @staticmethod
+    def guardar_con(escribir, extension, filetypes, binario=True):
+        #Pide la ruta y deja que escribir(f) vuelque el contenido directamente al archivo
+        path = filedialog.asksaveasfilename(defaultextension=extension, filetypes=filetypes)
+        if not path:
+            return False
+        try:
+            if binario:
+                with open(path, "wb") as f:
+                    escribir(f)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    escribir(f)
+            return True
+        except Exception:
+            return False
+
     @staticmethod
     def obtener_ejemplo():
         #Retorna un código de ejemplo por defecto para pruebas
@@ -1,5 +1,9 @@
 import re
-import json
+from historial import Historial
+from tabla_compilada import TablaCompilada
+from almacen_tokens import AlmacenTokens
+from flujo_tokens import FlujoTokens
+from lexico_dfa import MotorDFA
 
 class Lexico:
     EPS = "ε"
@@ -33,9 +37,25 @@ class Lexico:
         "Type": [["int"], ["void"]]
     }
     NONTERMINALS = list(GRAMMAR.keys())
+    NONTERMINAL_SET = frozenset(NONTERMINALS)
     KEYWORDS = {"class","int","void","return"}
 
-    def __init__(self):
+    #Motores del lexer: "regex" (patrón maestro) o "dfa" (autómata por tablas, lexico_dfa.MotorDFA)
+    MOTORES = ("regex", "dfa")
+    #Tope de errores léxicos: al superarlo el lexer se detiene (None = sin tope)
+    MAX_ERRORES = 1000
+    #Caracteres que se muestran de una racha de caracteres ilegales
+    MUESTRA_ILEGAL = 20
+    #Caracteres que solo pueden ser MISMATCH (ni \w, ni espacio, ni símbolo u operador)
+    ILEGALES = re.compile(r"[^\w \t\r\n{}(),;+\-*/=<>]+")
+    #Tokens que deben coincidir después de un error (modo pánico) antes de volver a reportar otro
+    RECUPERACION_ACIERTOS = 2
+
+    def __init__(self, motor="regex", max_errores=MAX_ERRORES):
+        if motor not in Lexico.MOTORES:
+            raise ValueError(f"Motor de lexer desconocido: {motor}")
+        self.motor = motor
+        self.max_errores = max_errores
         #Define las reglas regex para reconocer tokens en orden de prioridad
         self.token_spec = [
             ("COMMENT_BLOCK", r"/\*[\s\S]*?\*/"),
@@ -51,10 +71,18 @@ class Lexico:
         ]
         #Combina todas las regex en un solo patrón maestro
         self.master_pat = re.compile("|".join("(?P<%s>%s)" % pair for pair in self.token_spec))
+        if motor == "dfa":
+            #El motor DFA reemplaza al núcleo del lexer con el mismo contrato (lexer, flujo e incremental)
+            self._escanear = MotorDFA(self).escanear
 
     @staticmethod
     def is_nonterminal(x):
-        return x in Lexico.NONTERMINALS
+        return x in Lexico.NONTERMINAL_SET
+
+    @staticmethod
+    def compile_table(table):
+        #Codifica la tabla LL(1) con enteros para el ciclo del parser
+        return TablaCompilada(table, Lexico.NONTERMINALS, Lexico.all_terminals(), Lexico.EPS)
 
     @staticmethod
     def all_terminals():
@@ -72,20 +100,66 @@ class Lexico:
         terms.add("$")
         return sorted(list(terms))
 
-    def lexer(self, text):
-        tokens = []
+    def lexer(self, text, progreso=None, bloque=1 << 16):
+        #Los tokens se guardan en columnas paralelas con el id de su tipo
+        #progreso(tokens, caracteres): si se da, se llama tras cada bloque de texto analizado;
+        #puede lanzar una excepción para cancelar (p. ej. analisis_fondo.Cancelado)
+        tokens = AlmacenTokens(text, Lexico.TERMINALS)
         errors = []
-        lineno = 1
-        pos = 0
+        estado = [1, 0]
+        if progreso is None:
+            self._escanear(text, 0, True, estado, tokens, errors)
+        else:
+            pos = 0
+            while pos < len(text):
+                pos = self._escanear(text, pos, True, estado, tokens, errors, hasta=pos + bloque)
+                progreso(len(tokens), pos)
+        return {"tokens":tokens,"errors":errors,"lines": estado[0]}
+
+    def lexer_stream(self, fuente, chunk_size=1 << 16):
+        #Lexer incremental sobre un archivo (texto o binario), un mmap o bytes
+        return FlujoTokens(self, fuente, chunk_size)
+
+    @staticmethod
+    def error_ilegal(text, ini, fin, lineno, col):
+        #Un solo error para la racha text[ini:fin] de caracteres ilegales (nunca cruza líneas)
+        n = fin - ini
+        if n == 1:
+            msg = f"Caracter ilegal '{text[ini]}'"
+        else:
+            muestra = text[ini:ini + min(n, Lexico.MUESTRA_ILEGAL)]
+            msg = f"{n} caracteres ilegales '{muestra}{'...' if n > Lexico.MUESTRA_ILEGAL else ''}'"
+        return {"line":lineno,"col":col,"end_line":lineno,"end_col":col + n - 1,"count":n,"msg":msg}
+
+    @staticmethod
+    def error_tope(lineno, col, tope):
+        return {"line":lineno,"col":col,"msg":f"Demasiados errores léxicos (más de {tope}), análisis detenido"}
+
+    def _escanear(self, text, pos, final, estado, tokens, errors, hasta=None):
+        #Núcleo del lexer: reconoce tokens desde pos y devuelve dónde se detuvo.
+        #estado = [línea actual, posición donde empieza la línea] y se actualiza al salir.
+        #Si final es False el texto es solo un fragmento: se detiene antes de cualquier
+        #token que toque el final del fragmento o de un /* todavía sin cerrar.
+        #Con hasta, no empieza ningún token en esa posición o después (una racha de
+        #caracteres ilegales que empieza antes sí se completa).
+        #Si errors ya superó max_errores, el lexer se detuvo: consume el texto sin analizarlo.
+        ids = Lexico.TERMINAL_IDS
+        tope = self.max_errores
         length = len(text)
+        if tope is not None and len(errors) > tope:
+            return length
+        lineno, line_start = estado
+        limite = length if hasta is None else min(hasta, length)
 
         #Itera sobre el texto buscando coincidencias con el patrón maestro
-        while pos < length:
+        while pos < limite:
             m = self.master_pat.match(text, pos)
             if not m:
                 break
             kind = m.lastgroup
             value = m.group()
+            if not final and (m.end() == length or (kind == "OP1" and value == "/" and text.startswith("*", pos+1))):
+                break
             
             #Ignora comentarios de línea
             if kind == "COMMENT_LINE":
@@ -93,27 +167,34 @@ class Lexico:
                 continue
             #Ignora comentarios de bloque y cuenta nuevas líneas
             elif kind == "COMMENT_BLOCK":
-                lineno += value.count("\n")
+                nl = value.count("\n")
+                if nl:
+                    lineno += nl
+                    line_start = pos + value.rfind("\n") + 1
                 pos = m.end()
                 continue
 
+            #Columna (base 1) respecto al inicio de la línea actual, sin volver a buscar hacia atrás
+            col = pos - line_start + 1
+
             #Crea tokens según el tipo reconocido
             if kind == "NUMBER":
-                tokens.append({"type":"number","lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                tokens.agregar(ids["number"], lineno, col, pos, m.end())
             elif kind == "ID":
                 #Distingue entre keywords e identificadores
                 if value in self.KEYWORDS:
-                    tokens.append({"type":value,"lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                    tokens.agregar(ids[value], lineno, col, pos, m.end())
                 else:
-                    tokens.append({"type":"id","lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                    tokens.agregar(ids["id"], lineno, col, pos, m.end())
             elif kind == "OP2":
-                tokens.append({"type":value,"lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                tokens.agregar(ids[value], lineno, col, pos, m.end())
             elif kind == "OP1":
-                tokens.append({"type":value,"lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                tokens.agregar(ids[value], lineno, col, pos, m.end())
             elif kind == "SYMBOL":
-                tokens.append({"type":value,"lexeme":value,"line":lineno,"col":pos - text.rfind("\n", 0, pos)})
+                tokens.agregar(ids[value], lineno, col, pos, m.end())
             elif kind == "NEWLINE":
                 lineno += 1
+                line_start = m.end()
             elif kind == "SKIP":
                 pass
             elif kind == "MISMATCH":
@@ -121,18 +202,42 @@ class Lexico:
                 if value == "/" and pos+1 < length and text[pos+1] == "*":
                     end = text.find("*/", pos+2)
                     if end == -1:
-                        errors.append({"line":lineno,"col":pos - text.rfind("\n", 0, pos),"msg":"Comentario /* no cerrado"})
+                        errors.append({"line":lineno,"col":col,"msg":"Comentario /* no cerrado"})
                         pos = length
                         break
                     block = text[pos:end+2]
-                    lineno += block.count("\n")
+                    nl = block.count("\n")
+                    if nl:
+                        lineno += nl
+                        line_start = pos + block.rfind("\n") + 1
                     pos = end + 2
                     continue
-                errors.append({"line":lineno,"col":pos - text.rfind("\n", 0, pos),"msg":f"Caracter ilegal '{value}'"})
+                #Junta toda la racha de caracteres ilegales en un solo error
+                fin = m.end()
+                while fin < length:
+                    r = Lexico.ILEGALES.match(text, fin)
+                    if r is None:
+                        r = self.master_pat.match(text, fin)
+                        if r.lastgroup != "MISMATCH":
+                            #En un fragmento, un token que toca el final todavía puede resultar ilegal
+                            if not final and r.end() == length:
+                                fin = length
+                            break
+                    fin = r.end()
+                if not final and fin == length:
+                    break
+                if tope is not None and len(errors) >= tope:
+                    errors.append(Lexico.error_tope(lineno, col, tope))
+                    pos = length
+                    break
+                errors.append(Lexico.error_ilegal(text, pos, fin, lineno, col))
+                pos = fin
+                continue
 
             pos = m.end()
 
-        return {"tokens":tokens,"errors":errors,"lines": text.count("\n")+1}
+        estado[0], estado[1] = lineno, line_start
+        return pos
 
     @staticmethod
     def compute_first():
@@ -210,80 +315,259 @@ class Lexico:
         return FOLLOW
 
     @staticmethod
-    def parse(tokens, FIRST, FOLLOW, table):
+    def parse(tokens, FIRST, FOLLOW, table, record="full", every=1, reanudar=None, en_frontera=None,
+              oyente=None, arbol=True, recuperacion="token"):
         #Parser predictivo usando tabla LL(1)
+        #record: "full" (todos los pasos), "every" (uno de cada `every` pasos),
+        #"final" (solo el árbol terminado) o "none" (sin pasos)
+        #reanudar: estado {"root","stack","nodes","ip","step_id"} desde el cual continuar
+        #en_frontera(ip, nodos, n_errors, n_used): se llama cada vez que la pila queda en
+        #[$, }, MemberList] (entre dos miembros de la clase) o en [$, }, MemberList, }, StmtList]
+        #(entre dos sentencias de un método); nodos son los nodos de la pila por encima de [$, }].
+        #Si devuelve True el parser se detiene
+        #oyente: objeto con expandir(no_terminal, producción), coincidir(token) e insertar(terminal)
+        #que recibe la derivación a medida que ocurre (p. ej. nodos_ast.ConstructorAST); si además
+        #tiene terminales() y devuelve nombres, coincidir solo se llama (y el token solo se arma)
+        #para esos terminales
+        #arbol: si es False no se crea el árbol de derivación ("tree" queda en None) y en_frontera recibe
+        #nodos=None; solo con record="none" o "full" (los pasos rehacen el árbol bajo demanda) y sin reanudar
+        #recuperacion: "token" (sin producción se salta un token por vez) o "panico" (se saltan tokens
+        #hasta uno que el no terminal pueda expandir o hasta su FOLLOW o ';'/'}', donde se descarta;
+        #después de un error no se reportan otros hasta coincidir RECUPERACION_ACIERTOS tokens)
+        if record not in Historial.NIVELES:
+            raise ValueError(f"Nivel de registro desconocido: {record}")
+        if not arbol and (record not in ("none", "full") or reanudar is not None):
+            raise ValueError("Sin árbol de derivación solo se admite record=\"none\" o \"full\", sin reanudar")
+        if recuperacion not in ("token", "panico"):
+            raise ValueError(f"Modo de recuperación desconocido: {recuperacion}")
+        panico = recuperacion == "panico"
+        silencio = 0
+        #Acepta la tabla como dict (se codifica al vuelo) o ya compilada
+        comp = table if isinstance(table, TablaCompilada) else Lexico.compile_table(table)
+        celdas, ancho, invertidas, plantillas = comp.celdas, comp.ancho, comp.invertidas, comp.plantillas
+        producciones, simbolos, eof = comp.producciones, comp.simbolos, comp.eof
+        sinc = comp.sincronizacion(FOLLOW) if panico else None
         errors = []
-        derivation_steps = []
         used_cells = []
-        stack = ["$","Prog"]
-        root = {"id":"Prog_0","sym":"Prog","children":[],"expanded":False}
-        node_stack = [{"sym":"$","node":None},{"sym":"Prog","node":root}]
-        #Agrega token EOF al final
-        stream = tokens.copy()
-        stream.append({"type":"$","lexeme":"$","line": (tokens[-1]["line"] if tokens else 1),"col":1})
-        ip = 0
-        step_id = 0
-
-        def snapshot(action, info=None):
-            #Guarda cada paso del parsing para visualización
-            nonlocal step_id
-            step_id += 1
-            derivation_steps.append({"action":action,"info":info,"tree":json.loads(json.dumps(root))})
+        if reanudar is None:
+            stack = [eof, comp.inicio]
+            root = {"id":"Prog_0","sym":"Prog","children":[],"expanded":False} if arbol else None
+            node_stack = [None, root]
+            ip = 0
+            step_id = 0
+        else:
+            stack = [comp.ids[s] for s in reanudar["stack"]]
+            root = reanudar["root"]
+            node_stack = list(reanudar["nodes"])
+            ip = reanudar["ip"]
+            step_id = reanudar["step_id"]
+
+        def describir(action, dato):
+            #Info de los pasos que Historial guarda como entero: el índice de la producción
+            #expandida o la posición del token coincidido
+            if action == "expand":
+                return {"nonterminal": comp.cabezas[dato], "production": producciones[dato]}
+            return {"token": tokens[dato]}
+
+        if arbol:
+            derivation_steps = Historial(root, every if record == "every" else 1, describir)
+        else:
+            derivation_steps = Historial({"id":"Prog_0","sym":"Prog","children":[],"expanded":False}, 1,
+                                         describir, tabla=comp)
+        registrando = record in ("full", "every")
+        lista_miembros, lista_sentencias, cierre = comp.ids["MemberList"], comp.ids["StmtList"], comp.ids["}"]
+        detenido = False
+        quiere = None
+        if oyente is not None and hasattr(oyente, "terminales"):
+            nombres = oyente.terminales()
+            if nombres is not None:
+                quiere = {comp.term_id[t] for t in nombres if t in comp.term_id}
+
+        if hasattr(tokens, "__getitem__"):
+            #Secuencia indexable: tipos como enteros; un AlmacenTokens se usa sin copiar
+            if isinstance(tokens, AlmacenTokens) and tokens.nombres == comp.terminales:
+                types = tokens.types
+            else:
+                types = [comp.tipo_id(t["type"]) for t in tokens]
+            n_tokens = len(tokens)
+            eof_token = {"type":"$","lexeme":"$","line": (tokens[-1]["line"] if n_tokens else 1),"col":1}
+            a = types[ip] if ip < n_tokens else eof
+
+            def avanzar():
+                #Pasa al siguiente token y devuelve su tipo; después del último está el EOF
+                nonlocal ip
+                ip += 1
+                return types[ip] if ip < n_tokens else eof
+
+            def tok():
+                #Token actual como dict
+                return tokens[ip] if ip < n_tokens else eof_token
+
+            def coincidido():
+                #Info del paso de coincidencia: la posición basta, el token se arma al pedir el paso
+                return ip
+        else:
+            #Flujo de tuplas (type, lexeme, line, col), p. ej. Lexico.lexer_stream: se consume bajo demanda
+            if reanudar is not None:
+                raise ValueError("Solo se puede reanudar sobre una secuencia indexable de tokens")
+            it = iter(tokens)
+            actual = next(it, None)
+            ultima_linea = 1
+
+            def avanzar():
+                nonlocal ip, actual, ultima_linea
+                ip += 1
+                if actual is not None:
+                    ultima_linea = actual[2]
+                actual = next(it, None)
+                return comp.tipo_id(actual[0]) if actual is not None else eof
+
+            def tok():
+                if actual is None:
+                    return {"type":"$","lexeme":"$","line":ultima_linea,"col":1}
+                return {"type":actual[0],"lexeme":actual[1],"line":actual[2],"col":actual[3]}
+
+            def coincidido():
+                return {"token": tok()}
+
+            a = comp.tipo_id(actual[0]) if actual is not None else eof
+
+        if registrando:
+            def snapshot(action, info=None, nodo=None):
+                #Registra cada paso del parsing para visualización (el árbol se reconstruye bajo demanda)
+                nonlocal step_id
+                step_id += 1
+                derivation_steps.registrar(action, info, nodo)
+        else:
+            def snapshot(action, info=None, nodo=None):
+                #Sin registro: solo avanza el contador usado en los ids de los nodos
+                nonlocal step_id
+                step_id += 1
 
         snapshot("start")
         while stack:
             X = stack[-1]
-            a = stream[ip]["type"]
-            cur = stream[ip]
+            #Frontera entre miembros de la clase o entre sentencias (usada por el análisis incremental)
+            if en_frontera is not None and (X == lista_miembros or X == lista_sentencias):
+                n = len(stack)
+                if (n == 3 and X == lista_miembros or n == 5 and X == lista_sentencias and stack[3] == cierre
+                        and stack[2] == lista_miembros) and stack[1] == cierre:
+                    if en_frontera(ip, node_stack[2:] if arbol else None, len(errors), len(used_cells)):
+                        detenido = True
+                        break
             
             #Caso de aceptación
-            if X == "$" and a == "$":
+            if X == eof and a == eof:
                 snapshot("accept"); break
             
             #Si X es terminal, debe coincidir con el token actual
-            if not Lexico.is_nonterminal(X):
+            if X < ancho:
                 if X == a:
-                    snapshot("match", {"token":cur})
+                    snapshot("match", coincidido() if registrando else None)
+                    if silencio:
+                        silencio -= 1
+                    if oyente is not None and (quiere is None or X in quiere):
+                        oyente.coincidir(tok())
                     stack.pop(); node_stack.pop()
-                    ip += 1
+                    a = avanzar()
                     continue
                 else:
-                    errors.append({"line":cur["line"],"col":cur["col"],"msg":f"Token '{cur['lexeme']}' no coincide con '{X}'"})
-                    snapshot("insert", {"expected":X,"found":cur})
+                    cur = tok()
+                    if not silencio:
+                        errors.append({"line":cur["line"],"col":cur["col"],"msg":f"Token '{cur['lexeme']}' no coincide con '{simbolos[X]}'"})
+                    if panico:
+                        silencio = Lexico.RECUPERACION_ACIERTOS
+                    snapshot("insert", {"expected":simbolos[X],"found":cur})
+                    if oyente is not None:
+                        oyente.insertar(simbolos[X])
                     stack.pop(); node_stack.pop()
                     continue
             else:
                 #Busca producción en la tabla para expandir el no terminal
-                prod = table.get(X,{}).get(a,None)
-                if prod:
-                    used_cells.append((X, a))
-                    popped = node_stack.pop()
-                    node = popped["node"]
+                k = celdas[(X - ancho) * ancho + a]
+                if k >= 0:
+                    prod = producciones[k]
+                    used_cells.append((simbolos[X], simbolos[a]))
+                    if oyente is not None:
+                        oyente.expandir(simbolos[X], prod)
+                    rev = invertidas[k]
+                    if not arbol:
+                        #Sin árbol: node_stack solo mantiene la altura de la pila (los valores no se leen)
+                        stack.pop(); node_stack.pop()
+                        snapshot("expand", k)
+                        if rev:
+                            stack.extend(rev)
+                            node_stack.extend(rev)
+                        continue
+                    node = node_stack.pop()
                     stack.pop()
                     node["expanded"] = True
-                    #Crea nodos hijos para cada símbolo de la producción
-                    children = []
-                    for s in prod:
-                        if s == Lexico.EPS:
-                            children.append({"id":f"EPS_{step_id}","sym":"ε","children":[]})
-                        elif Lexico.is_nonterminal(s):
-                            children.append({"id":f"{s}_{step_id}","sym":s,"children":[]})
-                        else:
-                            children.append({"id":f"TK_{s}_{step_id}","sym":s,"children":[]})
+                    #Crea nodos hijos para cada símbolo de la producción; hasta expandirse llevan una
+                    #tupla vacía como hijos, así los dicts de las hojas quedan fuera del recolector de ciclos
+                    sid = str(step_id)
+                    children = [{"id":pre + sid,"sym":sym,"children":()} for pre, sym in plantillas[k]]
                     node["children"] = children
-                    snapshot("expand", {"nonterminal":X,"production":prod})
-                    #Apila los símbolos de la producción en orden inverso
-                    if not (len(prod)==1 and prod[0]==Lexico.EPS):
-                        for i in range(len(prod)-1,-1,-1):
-                            sym = prod[i]
-                            stack.append(sym)
-                            node_stack.append({"sym":sym,"node":children[i]})
+                    snapshot("expand", k, node)
+                    #Apila los símbolos de la producción (ya vienen invertidos)
+                    if rev:
+                        stack.extend(rev)
+                        node_stack.extend(reversed(children))
+                    continue
+                elif panico:
+                    #Modo pánico: un error por región. Se saltan tokens hasta uno con el que X pueda
+                    #expandirse, o hasta uno de sincronización (FOLLOW(X) o ';', '{', '}') que acepte
+                    #algún símbolo de la pila; los símbolos por encima de ese se descartan
+                    cur = tok()
+                    if not silencio:
+                        errors.append({"line":cur["line"],"col":cur["col"],"msg":f"No hay producción para [{simbolos[X]}] con '{cur['lexeme']}'"})
+                    silencio = Lexico.RECUPERACION_ACIERTOS
+                    expandibles, sincronizar = sinc[X]
+                    saltados = 0
+                    while True:
+                        while a != eof and a not in expandibles and a not in sincronizar:
+                            a = avanzar()
+                            saltados += 1
+                        if a in expandibles:
+                            break
+                        d = len(stack) - 1
+                        while d > 0 and not (stack[d] == a if stack[d] < ancho else celdas[(stack[d] - ancho) * ancho + a] >= 0):
+                            d -= 1
+                        if d > 0 or a == eof:
+                            break
+                        #Ningún símbolo de la pila acepta el token: también se salta
+                        a = avanzar()
+                        saltados += 1
+                    if a in expandibles:
+                        snapshot("sync", {"token":cur,"skipped":saltados})
+                        continue
+                    descartados = []
+                    while len(stack) > d + 1:
+                        descartados.append(simbolos[stack.pop()])
+                        node_stack.pop()
+                        if oyente is not None:
+                            oyente.insertar(descartados[-1])
+                    snapshot("sync", {"token":cur,"skipped":saltados,"popped":descartados})
                     continue
                 else:
                     #No hay producción válida, reporta error y salta token
-                    errors.append({"line":cur["line"],"col":cur["col"],"msg":f"No hay producción para [{X}] con '{cur['lexeme']}'"})
+                    cur = tok()
+                    errors.append({"line":cur["line"],"col":cur["col"],"msg":f"No hay producción para [{simbolos[X]}] con '{cur['lexeme']}'"})
                     snapshot("skip", {"token":cur})
-                    ip += 1
-                    if ip >= len(stream): break
+                    if a == eof: break
+                    a = avanzar()
                     continue
-        return {"errors":errors,"steps":derivation_steps,"tree":root, "used_cells": used_cells}
\ No newline at end of file
+        if record == "final":
+            derivation_steps = Historial.final(root)
+        elif record == "none":
+            derivation_steps = []
+        else:
+            derivation_steps.cerrar()
+        res = {"errors":errors,"steps":derivation_steps,"tree":root, "used_cells": used_cells}
+        if en_frontera is not None:
+            res["resume"] = {"ip": ip, "step_id": step_id, "stopped": detenido}
+        return res
+
+
+#Terminales internados: el id de cada tipo de token es su índice en esta lista
+Lexico.TERMINALS = Lexico.all_terminals()
+Lexico.TERMINAL_IDS = {t: i for i, t in enumerate(Lexico.TERMINALS)}
\ No newline at end of file
@@ -0,0 +1,258 @@
+class MotorDFA:
+    #Motor alternativo del lexer, sin expresiones regulares: cada carácter se traduce a una
+    #clase y un autómata finito determinista (tabla de transiciones precalculada) reconoce el
+    #token más largo, volviendo al último estado de aceptación si el autómata se traba.
+    #Reproduce exactamente al patrón maestro de Lexico (mismos tokens y errores), incluidos:
+    #  - la primera alternativa gana: "==" es OP2 y un /* sin cerrar es '/' y '*' (OP1)
+    #  - los \b de NUMBER e ID usan "carácter de palabra" Unicode (isalnum o '_'): si el token
+    #    está pegado a otra letra o dígito (p. ej. "123abc" o "abé") cada carácter es ilegal
+    #  - \d acepta dígitos decimales Unicode, mientras que ID solo acepta ASCII
+    #  - las rachas de caracteres ilegales se reportan en un solo error y se respeta max_errores
+    #Las palabras clave se reconocen con un hash perfecto armado al construir el motor.
+
+    #Patrones que codifica el autómata; si Lexico.token_spec cambia, el motor no es válido
+    TOKEN_SPEC = [
+        ("COMMENT_BLOCK", r"/\*[\s\S]*?\*/"),
+        ("COMMENT_LINE",  r"//[^\n]*"),
+        ("NUMBER",   r"\b\d+\b"),
+        ("ID",       r"\b[A-Za-z_][A-Za-z0-9_]*\b"),
+        ("OP2",      r"=="),
+        ("NEWLINE",  r"\n"),
+        ("SKIP",     r"[ \t\r]+"),
+        ("SYMBOL",   r"[{}(),;]"),
+        ("OP1",      r"[+\-*/=<>]"),
+        ("MISMATCH", r"."),
+    ]
+
+    #Clases de caracteres
+    LETRA, DIGITO, UDIGITO, UPALABRA, ESPACIO, NUEVA_LINEA, BARRA, ESTRELLA, IGUAL, OPERADOR, SIMBOLO, OTRO = range(12)
+    N_CLASES = 12
+    #Estados (el 0 es el inicial; -1 significa sin transición)
+    (INICIO, E_BARRA, E_LINEA, E_BLOQUE, E_BLOQUE_ESTRELLA, E_FIN_BLOQUE, E_NUMERO, E_ID,
+     E_IGUAL, E_IGUAL_IGUAL, E_NUEVA_LINEA, E_ESPACIO, E_SIMBOLO, E_OPERADOR, E_ILEGAL) = range(15)
+    N_ESTADOS = 15
+    #Tipo de token aceptado por cada estado
+    K_BLOQUE, K_LINEA, K_NUMERO, K_ID, K_OP, K_NUEVA_LINEA, K_ESPACIO, K_ILEGAL = range(8)
+
+    def __init__(self, lexico):
+        if lexico.token_spec != MotorDFA.TOKEN_SPEC:
+            raise ValueError("El motor DFA solo reconoce el token_spec original de Lexico")
+        self.lexico = lexico
+        self.ids = type(lexico).TERMINAL_IDS
+        self.error_ilegal, self.error_tope = type(lexico).error_ilegal, type(lexico).error_tope
+        self.clases = MotorDFA._clases_ascii()
+        self.transiciones, self.acepta = MotorDFA._automata()
+        #Estados sin transiciones: al llegar no hace falta leer el carácter siguiente
+        self.terminales = [all(t < 0 for t in self.transiciones[e * MotorDFA.N_CLASES:(e + 1) * MotorDFA.N_CLASES])
+                           for e in range(MotorDFA.N_ESTADOS)]
+        self.claves, self.hash_mult, self.hash_mod = MotorDFA._hash_perfecto(sorted(lexico.KEYWORDS))
+
+    @staticmethod
+    def _clases_ascii():
+        #Clase de cada carácter ASCII; los demás se clasifican con _clase_unicode
+        M = MotorDFA
+        clases = [M.OTRO] * 128
+        for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_":
+            clases[ord(c)] = M.LETRA
+        for c in "0123456789":
+            clases[ord(c)] = M.DIGITO
+        for c in " \t\r":
+            clases[ord(c)] = M.ESPACIO
+        for c in "{}(),;":
+            clases[ord(c)] = M.SIMBOLO
+        for c in "+-<>":
+            clases[ord(c)] = M.OPERADOR
+        clases[ord("\n")] = M.NUEVA_LINEA
+        clases[ord("/")] = M.BARRA
+        clases[ord("*")] = M.ESTRELLA
+        clases[ord("=")] = M.IGUAL
+        return clases
+
+    @staticmethod
+    def _clase_unicode(c):
+        #\d de re es isdecimal y \w es isalnum o '_'
+        if c.isdecimal():
+            return MotorDFA.UDIGITO
+        if c.isalnum():
+            return MotorDFA.UPALABRA
+        return MotorDFA.OTRO
+
+    @staticmethod
+    def _automata():
+        #Tabla de transiciones aplanada (estado * N_CLASES + clase) y tipo aceptado por estado
+        M = MotorDFA
+        t = [-1] * (M.N_ESTADOS * M.N_CLASES)
+
+        def ir(estado, clases, destino):
+            for k in clases:
+                t[estado * M.N_CLASES + k] = destino
+
+        todas = range(M.N_CLASES)
+        ir(M.INICIO, (M.BARRA,), M.E_BARRA)
+        ir(M.INICIO, (M.DIGITO, M.UDIGITO), M.E_NUMERO)
+        ir(M.INICIO, (M.LETRA,), M.E_ID)
+        ir(M.INICIO, (M.IGUAL,), M.E_IGUAL)
+        ir(M.INICIO, (M.NUEVA_LINEA,), M.E_NUEVA_LINEA)
+        ir(M.INICIO, (M.ESPACIO,), M.E_ESPACIO)
+        ir(M.INICIO, (M.SIMBOLO,), M.E_SIMBOLO)
+        ir(M.INICIO, (M.OPERADOR, M.ESTRELLA), M.E_OPERADOR)
+        ir(M.INICIO, (M.UPALABRA, M.OTRO), M.E_ILEGAL)
+        ir(M.E_BARRA, (M.BARRA,), M.E_LINEA)
+        ir(M.E_BARRA, (M.ESTRELLA,), M.E_BLOQUE)
+        ir(M.E_LINEA, [k for k in todas if k != M.NUEVA_LINEA], M.E_LINEA)
+        ir(M.E_BLOQUE, todas, M.E_BLOQUE)
+        ir(M.E_BLOQUE, (M.ESTRELLA,), M.E_BLOQUE_ESTRELLA)
+        ir(M.E_BLOQUE_ESTRELLA, todas, M.E_BLOQUE)
+        ir(M.E_BLOQUE_ESTRELLA, (M.ESTRELLA,), M.E_BLOQUE_ESTRELLA)
+        ir(M.E_BLOQUE_ESTRELLA, (M.BARRA,), M.E_FIN_BLOQUE)
+        ir(M.E_NUMERO, (M.DIGITO, M.UDIGITO), M.E_NUMERO)
+        ir(M.E_ID, (M.LETRA, M.DIGITO), M.E_ID)
+        ir(M.E_IGUAL, (M.IGUAL,), M.E_IGUAL_IGUAL)
+        ir(M.E_ESPACIO, (M.ESPACIO,), M.E_ESPACIO)
+
+        acepta = [-1] * M.N_ESTADOS
+        acepta[M.E_BARRA] = M.K_OP
+        acepta[M.E_LINEA] = M.K_LINEA
+        acepta[M.E_FIN_BLOQUE] = M.K_BLOQUE
+        acepta[M.E_NUMERO] = M.K_NUMERO
+        acepta[M.E_ID] = M.K_ID
+        acepta[M.E_IGUAL] = M.K_OP
+        acepta[M.E_IGUAL_IGUAL] = M.K_OP
+        acepta[M.E_NUEVA_LINEA] = M.K_NUEVA_LINEA
+        acepta[M.E_ESPACIO] = M.K_ESPACIO
+        acepta[M.E_SIMBOLO] = M.K_OP
+        acepta[M.E_OPERADOR] = M.K_OP
+        acepta[M.E_ILEGAL] = M.K_ILEGAL
+        return t, acepta
+
+    @staticmethod
+    def _hash_perfecto(palabras):
+        #Busca h(w) = (ord(w[0]) * mult + ord(w[-1]) + len(w)) % mod sin colisiones entre las palabras clave
+        for mod in range(len(palabras), 8 * len(palabras) + 8):
+            for mult in range(1, 64):
+                tabla = [None] * mod
+                for w in palabras:
+                    h = (ord(w[0]) * mult + ord(w[-1]) + len(w)) % mod
+                    if tabla[h] is not None:
+                        break
+                    tabla[h] = w
+                else:
+                    return tabla, mult, mod
+        raise ValueError("No se encontró un hash perfecto para las palabras clave")
+
+    @staticmethod
+    def _es_palabra(c):
+        #Carácter de palabra de re (\w) en texto Unicode
+        return c.isalnum() or c == "_"
+
+    def escanear(self, text, pos, final, estado, tokens, errors, hasta=None):
+        #Mismo contrato que Lexico._escanear
+        M = MotorDFA
+        ids = self.ids
+        clases, transiciones, acepta, terminales = self.clases, self.transiciones, self.acepta, self.terminales
+        claves, mult, mod = self.claves, self.hash_mult, self.hash_mod
+        clase_unicode, es_palabra = M._clase_unicode, M._es_palabra
+        NC = M.N_CLASES
+        inicio, e_bloque, e_fin_bloque, e_linea = M.INICIO, M.E_BLOQUE, M.E_FIN_BLOQUE, M.E_LINEA
+        id_id, id_numero = ids["id"], ids["number"]
+        k_ilegal = M.K_ILEGAL
+        tope = self.lexico.max_errores
+        length = len(text)
+        if tope is not None and len(errors) > tope:
+            return length
+        lineno, line_start = estado
+        limite = length if hasta is None else min(hasta, length)
+        #Inicio de la racha de caracteres ilegales pendiente de reportar (-1 si no hay)
+        racha = -1
+
+        while pos < length and (pos < limite or racha >= 0):
+            #Recorre el autómata desde pos recordando el último estado de aceptación
+            s = inicio
+            i = pos
+            tipo = -1
+            fin = pos
+            while i < length:
+                c = text[i]
+                o = ord(c)
+                s = transiciones[s * NC + (clases[o] if o < 128 else clase_unicode(c))]
+                if s < 0:
+                    break
+                i += 1
+                if s == e_bloque:
+                    #Cuerpo del comentario: se busca el cierre de una vez
+                    cierre = text.find("*/", i)
+                    if cierre == -1:
+                        break
+                    i = cierre + 2
+                    s = e_fin_bloque
+                elif s == e_linea:
+                    salto = text.find("\n", i)
+                    i = length if salto == -1 else salto
+                k = acepta[s]
+                if k >= 0:
+                    tipo = k
+                    fin = i
+                    if terminales[s]:
+                        break
+            #\b de NUMBER e ID: el token no puede estar pegado a otro carácter de palabra
+            if tipo == M.K_NUMERO or tipo == M.K_ID:
+                if (pos > 0 and es_palabra(text[pos - 1])) or (fin < length and es_palabra(text[fin])):
+                    tipo = k_ilegal
+                    fin = pos + 1
+            if not final and (fin == length or (tipo == M.K_OP and text[pos] == "/" and text.startswith("*", pos + 1))):
+                if racha >= 0:
+                    pos = racha
+                    racha = -1
+                break
+
+            if tipo == k_ilegal:
+                #La racha se reporta cuando aparece un token válido o se acaba el texto
+                if racha < 0:
+                    racha = pos
+                pos = fin
+                continue
+            if racha >= 0:
+                if tope is not None and len(errors) >= tope:
+                    errors.append(self.error_tope(lineno, racha - line_start + 1, tope))
+                    racha = -1
+                    pos = length
+                    break
+                errors.append(self.error_ilegal(text, racha, pos, lineno, racha - line_start + 1))
+                racha = -1
+                if pos >= limite:
+                    break
+
+            if tipo == M.K_ESPACIO or tipo == M.K_LINEA:
+                pos = fin
+                continue
+            if tipo == M.K_NUEVA_LINEA:
+                lineno += 1
+                line_start = fin
+                pos = fin
+                continue
+            if tipo == M.K_BLOQUE:
+                nl = text.count("\n", pos, fin)
+                if nl:
+                    lineno += nl
+                    line_start = text.rfind("\n", pos, fin) + 1
+                pos = fin
+                continue
+
+            col = pos - line_start + 1
+            if tipo == M.K_ID:
+                value = text[pos:fin]
+                h = (ord(value[0]) * mult + ord(value[-1]) + len(value)) % mod
+                tokens.agregar(ids[value] if claves[h] == value else id_id, lineno, col, pos, fin)
+            elif tipo == M.K_NUMERO:
+                tokens.agregar(id_numero, lineno, col, pos, fin)
+            else:
+                tokens.agregar(ids[text[pos:fin]], lineno, col, pos, fin)
+            pos = fin
+
+        if racha >= 0:
+            if tope is not None and len(errors) >= tope:
+                errors.append(self.error_tope(lineno, racha - line_start + 1, tope))
+            else:
+                errors.append(self.error_ilegal(text, racha, pos, lineno, racha - line_start + 1))
+        estado[0], estado[1] = lineno, line_start
+        return pos
@@ -0,0 +1,150 @@
+from tkinter import ttk
+
+
+class ListaVirtual:
+    #Lista virtualizada sobre un ttk.Treeview: el Treeview tiene siempre las mismas `filas`
+    #filas y al desplazarse solo se reescriben sus valores con los de la ventana visible.
+    #Los datos no se copian al widget: se piden con fila(i) -> tupla de valores, así que
+    #cargar o refrescar cuesta lo mismo con 10 o con 1.000.000 de filas.
+    #El orden y el filtro solo cambian la secuencia de índices que se recorre. Para ordenar
+    #fuentes grandes, claves[k]() puede dar la columna k entera como secuencia (p. ej. un array
+    #de AlmacenTokens): así el sort no llama a fila(i) por cada fila.
+
+    def __init__(self, master, columnas, filas=6, style="Treeview"):
+        #columnas: lista de (título, ancho en píxeles)
+        self.filas = filas
+        self.titulos = [t for t, _ in columnas]
+        self.tree = ttk.Treeview(master, columns=list(range(len(columnas))), show="headings",
+                                 height=filas, selectmode="none", style=style)
+        self.yscroll = ttk.Scrollbar(master, orient="vertical", command=self._al_scroll)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.yscroll.grid(row=0, column=1, sticky="ns")
+        master.grid_rowconfigure(0, weight=1)
+        master.grid_columnconfigure(0, weight=1)
+        for k, (titulo, ancho) in enumerate(columnas):
+            self.tree.heading(k, text=titulo, command=lambda k=k: self._al_titulo(k))
+            self.tree.column(k, width=ancho, stretch=(k == len(columnas) - 1), anchor="w")
+        #Filas fijas del Treeview; las que sobran se desenganchan
+        self.items = [self.tree.insert("", "end") for _ in range(filas)]
+        self.enganchadas = filas
+        #Fuente de datos, índices visibles (filtrados y ordenados) y primera fila mostrada
+        self.fila = None
+        self.claves = None
+        self.columnas = {}
+        self.total = 0
+        self.indices = range(0)
+        self.primero = 0
+        self.pred = None
+        self.orden = None
+        for ev in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(ev, self._al_rueda)
+        for tecla, delta in (("<Up>", -1), ("<Down>", 1), ("<Prior>", -filas), ("<Next>", filas)):
+            self.tree.bind(tecla, lambda e, d=delta: self.desplazar(d) or "break")
+        self.tree.bind("<Home>", lambda e: self.ir_a(0) or "break")
+        self.tree.bind("<End>", lambda e: self.ir_a(len(self.indices)) or "break")
+        self.tree.bind("<Button-1>", lambda e: self.tree.focus_set(), add="+")
+        self.refrescar()
+
+    def cargar(self, total, fila, conservar=False, claves=None):
+        #Nueva fuente de datos; sin filtro ni orden es O(1). Con conservar se mantienen el
+        #filtro, el orden y la posición (p. ej. al re-analizar en vivo). claves: por columna,
+        #None o una función que devuelve la columna completa (sin vacíos) para ordenar
+        self.fila = fila
+        self.claves = claves
+        self.columnas = {}
+        self.total = total
+        if not conservar:
+            self.pred = None
+            self.orden = None
+            self.primero = 0
+        self._reindexar()
+
+    def filtrar(self, pred=None):
+        #Muestra solo las filas i con pred(i) verdadero; None quita el filtro
+        self.pred = pred
+        self.primero = 0
+        self._reindexar()
+
+    def ordenar(self, columna=None, descendente=False):
+        #Ordena por una columna (estable); None vuelve al orden de la fuente
+        self.orden = None if columna is None else (columna, descendente)
+        self.primero = 0
+        self._reindexar()
+
+    def _reindexar(self):
+        indices = range(self.total)
+        if self.pred is not None:
+            indices = [i for i in indices if self.pred(i)]
+        if self.orden is not None:
+            k, desc = self.orden
+            if self.claves and self.claves[k] is not None:
+                #El sort indexa la columna directamente, sin llamadas Python por fila; la
+                #columna se pide una vez por fuente
+                columna = self.columnas.get(k)
+                if columna is None:
+                    columna = self.columnas[k] = self.claves[k]()
+                indices = sorted(indices, key=columna.__getitem__, reverse=desc)
+            else:
+                fila = self.fila
+                indices = sorted(indices, key=lambda i: ListaVirtual._clave(fila(i)[k]), reverse=desc)
+        self.indices = indices
+        for k, titulo in enumerate(self.titulos):
+            marca = "" if self.orden is None or self.orden[0] != k else (" ▼" if self.orden[1] else " ▲")
+            self.tree.heading(k, text=titulo + marca)
+        self.refrescar()
+
+    @staticmethod
+    def _clave(v):
+        #Los vacíos van al final y no se comparan con los demás valores
+        return (v is None, "" if v is None else v)
+
+    def refrescar(self):
+        #Reescribe solo las filas visibles: O(filas) sin importar el tamaño de la fuente
+        n = len(self.indices)
+        self.primero = max(0, min(self.primero, n - self.filas))
+        visibles = min(self.filas, n - self.primero)
+        for k in range(visibles):
+            valores = self.fila(self.indices[self.primero + k])
+            self.tree.item(self.items[k], values=["" if v is None else v for v in valores])
+        #Engancha o desengancha solo las filas que cambian de estado
+        for k in range(self.enganchadas, visibles):
+            self.tree.move(self.items[k], "", k)
+        for k in range(visibles, self.enganchadas):
+            self.tree.detach(self.items[k])
+        self.enganchadas = visibles
+        if n:
+            self.yscroll.set(self.primero / n, (self.primero + visibles) / n)
+        else:
+            self.yscroll.set(0.0, 1.0)
+
+    def ir_a(self, primero):
+        self.primero = primero
+        self.refrescar()
+
+    def desplazar(self, delta):
+        self.ir_a(self.primero + delta)
+
+    def _al_scroll(self, accion, cantidad, unidad=None):
+        #Protocolo del comando de ttk.Scrollbar: ("moveto", fracción) o ("scroll", n, "units"/"pages")
+        if accion == "moveto":
+            self.ir_a(int(float(cantidad) * len(self.indices)))
+        elif accion == "scroll":
+            self.desplazar(int(cantidad) * (self.filas if unidad == "pages" else 1))
+
+    def _al_rueda(self, event):
+        if event.num == 4:
+            self.desplazar(-3)
+        elif event.num == 5:
+            self.desplazar(3)
+        else:
+            self.desplazar(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _al_titulo(self, k):
+        #Clic en el encabezado: ascendente, descendente y de vuelta al orden original
+        if self.orden is None or self.orden[0] != k:
+            self.ordenar(k)
+        elif not self.orden[1]:
+            self.ordenar(k, True)
+        else:
+            self.ordenar()
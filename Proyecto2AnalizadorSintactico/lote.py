@@ -0,0 +1,90 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from lexico import Lexico
+from gramatica import Gramatica
+from tabla_simbolos import TablaSimbolos
+
+
+class Lote:
+    #Estado de cada proceso: el lexer y la gramática compilada se crean una sola vez por worker
+    _lexico = None
+    _gram = None
+    _recuperacion = "token"
+
+    @staticmethod
+    def iniciar_worker(cache_path=None, motor="regex", max_errores=Lexico.MAX_ERRORES, recuperacion="token"):
+        #Inicializador del pool: compila la gramática una vez en cada proceso y fija las opciones
+        #del análisis (las mismas que acepta analyzer_cli analizar)
+        Lote._lexico = Lexico(motor, max_errores)
+        Lote._gram = Gramatica.compilar(cache_path)
+        Lote._recuperacion = recuperacion
+
+    @staticmethod
+    def archivos(objetivos, patron="*.txt"):
+        #Expande carpetas (recursivamente, con el patrón dado), globs y rutas sueltas
+        encontrados = []
+        for obj in objetivos:
+            if os.path.isdir(obj):
+                encontrados.extend(glob.glob(os.path.join(obj, "**", patron), recursive=True))
+            elif glob.has_magic(obj):
+                encontrados.extend(glob.glob(obj, recursive=True))
+            else:
+                encontrados.append(obj)
+        vistos = set()
+        res = []
+        for p in sorted(encontrados):
+            if p not in vistos and not os.path.isdir(p):
+                vistos.add(p)
+                res.append(p)
+        return res
+
+    @staticmethod
+    def analizar_archivo(path):
+        #Analiza un archivo y devuelve un resultado serializable a JSON
+        if Lote._gram is None:
+            Lote.iniciar_worker()
+        t0 = time.perf_counter()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError) as ex:
+            return {"file": path, "ok": False, "error": str(ex)}
+        t1 = time.perf_counter()
+        lex = Lote._lexico.lexer(code)
+        t2 = time.perf_counter()
+        gram = Lote._gram
+        #La tabla de símbolos se arma durante el parse (sin árbol de derivación) y da el resumen
+        tabla, parse_res = TablaSimbolos.construir(lex["tokens"], gram, recuperacion=Lote._recuperacion)
+        t3 = time.perf_counter()
+        #Los errores léxicos pueden traer el rango de una racha de caracteres ilegales (end_line, end_col, count)
+        errors = [{"kind": "LEX", **e} for e in lex["errors"]]
+        errors += [{"kind": "SINTAX", "line": e["line"], "col": e["col"], "msg": e["msg"]} for e in parse_res["errors"]]
+        return {
+            "file": path,
+            "ok": not errors,
+            "lines": lex["lines"],
+            "tokens": len(lex["tokens"]),
+            "errors": errors,
+            "summary": tabla.resumen(lex["tokens"]),
+            "timings": {"read": round(t1 - t0, 6), "lex": round(t2 - t1, 6), "parse": round(t3 - t2, 6)},
+        }
+
+    @staticmethod
+    def ejecutar(paths, workers=None, ordenado=True, cache_path=None, motor="regex",
+                 max_errores=Lexico.MAX_ERRORES, recuperacion="token"):
+        #Genera los resultados a medida que terminan; en modo ordenado respetan el orden de paths
+        opciones = (cache_path, motor, max_errores, recuperacion)
+        if workers == 1:
+            Lote.iniciar_worker(*opciones)
+            for p in paths:
+                yield Lote.analizar_archivo(p)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=Lote.iniciar_worker, initargs=opciones) as ex:
+            if ordenado:
+                yield from ex.map(Lote.analizar_archivo, paths, chunksize=1)
+            else:
+                futuros = [ex.submit(Lote.analizar_archivo, p) for p in paths]
+                for fut in as_completed(futuros):
+                    yield fut.result()
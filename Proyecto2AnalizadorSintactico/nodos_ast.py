@@ -0,0 +1,321 @@
+from lexico import Lexico
+from gramatica import Gramatica
+
+
+class Nodo:
+    #Nodo base del AST tipado: cada subclase declara sus campos en __slots__ (sin __dict__
+    #por nodo). line/col son los del token que da nombre al nodo; None si faltaba por un error
+    __slots__ = ("line", "col")
+
+    def campos(self):
+        #Nombres de los campos propios del nodo, sin line/col
+        return [c for k in reversed(type(self).__mro__) for c in k.__dict__.get("__slots__", ()) if c not in Nodo.__slots__]
+
+    def __eq__(self, otro):
+        return type(self) is type(otro) and all(getattr(self, c) == getattr(otro, c) for c in self.campos())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{c}={getattr(self, c)!r}' for c in self.campos())})"
+
+    def a_dict(self):
+        #Versión en dicts y listas (p. ej. para JSON); recorrido con pila, sin recursión
+        raiz = {}
+        pila = [(self, raiz)]
+        while pila:
+            nodo, salida = pila.pop()
+            salida["node"] = type(nodo).__name__
+            salida["line"], salida["col"] = nodo.line, nodo.col
+            for c in nodo.campos():
+                v = getattr(nodo, c)
+                if isinstance(v, Nodo):
+                    salida[c] = {}
+                    pila.append((v, salida[c]))
+                elif isinstance(v, list):
+                    salida[c] = []
+                    for x in v:
+                        if isinstance(x, Nodo):
+                            salida[c].append({})
+                            pila.append((x, salida[c][-1]))
+                        else:
+                            salida[c].append(x)
+                else:
+                    salida[c] = v
+        return raiz
+
+
+class ClassDecl(Nodo):
+    __slots__ = ("name", "members")
+
+    def __init__(self, name, members, line=None, col=None):
+        self.name, self.members, self.line, self.col = name, members, line, col
+
+
+class Field(Nodo):
+    __slots__ = ("type", "name")
+
+    def __init__(self, type, name, line=None, col=None):
+        self.type, self.name, self.line, self.col = type, name, line, col
+
+
+class Method(Nodo):
+    __slots__ = ("type", "name", "params", "body")
+
+    def __init__(self, type, name, params, body, line=None, col=None):
+        self.type, self.name, self.params, self.body, self.line, self.col = type, name, params, body, line, col
+
+
+class Param(Nodo):
+    __slots__ = ("type", "name")
+
+    def __init__(self, type, name, line=None, col=None):
+        self.type, self.name, self.line, self.col = type, name, line, col
+
+
+class VarDecl(Nodo):
+    __slots__ = ("type", "name")
+
+    def __init__(self, type, name, line=None, col=None):
+        self.type, self.name, self.line, self.col = type, name, line, col
+
+
+class Assign(Nodo):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value, line=None, col=None):
+        self.name, self.value, self.line, self.col = name, value, line, col
+
+
+class Call(Nodo):
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args, line=None, col=None):
+        self.name, self.args, self.line, self.col = name, args, line, col
+
+
+class Return(Nodo):
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=None, col=None):
+        self.value, self.line, self.col = value, line, col
+
+
+class BinOp(Nodo):
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=None, col=None):
+        self.op, self.left, self.right, self.line, self.col = op, left, right, line, col
+
+
+class Num(Nodo):
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=None, col=None):
+        self.value, self.line, self.col = value, line, col
+
+
+class Var(Nodo):
+    __slots__ = ("name",)
+
+    def __init__(self, name, line=None, col=None):
+        self.name, self.line, self.col = name, line, col
+
+
+class ConstructorAST:
+    #Oyente de Lexico.parse que arma el AST tipado mientras se parsea, sin árbol de derivación.
+    #El parser LL(1) no reduce, así que cada expansión abre un marco que espera tantos valores
+    #como símbolos tiene la producción; al completarse se "reduce" con la regla del no terminal
+    #y el valor pasa al marco padre. Todo con una pila explícita: cadenas largas de
+    #MemberList/StmtList/ArgRest/AddP no tocan el límite de recursión.
+    #Las listas (MemberList, ParamRest, ...) se acumulan al revés y se invierten una sola vez
+    #en el nodo que las usa; así cada reducción es O(1).
+
+    def __init__(self):
+        #Marco: [no terminal, producción, valores de los hijos, hijos que faltan]
+        self.marcos = []
+        self.raiz = None
+
+    @staticmethod
+    def analizar(tokens, gram=None):
+        #Parsea tokens y devuelve {"ast", "errors"} sin materializar el árbol de derivación
+        gram = gram or Gramatica.compilar()
+        c = ConstructorAST()
+        res = Lexico.parse(tokens, gram.first, gram.follow, gram.compilada, record="none", arbol=False, oyente=c)
+        return {"ast": c.resultado(), "errors": res["errors"]}
+
+    #Eventos del parser
+    def expandir(self, sym, prod):
+        if prod[0] == Lexico.EPS:
+            self._valor(ConstructorAST.REGLAS[sym](prod, ()))
+        else:
+            self.marcos.append([sym, prod, [], len(prod)])
+
+    def coincidir(self, token):
+        self._valor(token)
+
+    def insertar(self, sym):
+        #Terminal faltante o no terminal descartado (error de sintaxis): ocupa su lugar con None
+        self._valor(None)
+
+    def _valor(self, v):
+        #Entrega un valor al marco de arriba y reduce los marcos que se completan
+        marcos = self.marcos
+        while marcos:
+            m = marcos[-1]
+            m[2].append(v)
+            m[3] -= 1
+            if m[3]:
+                return
+            marcos.pop()
+            v = ConstructorAST.REGLAS[m[0]](m[1], m[2])
+        self.raiz = v
+
+    def resultado(self):
+        #AST final; si el parse terminó antes de tiempo los marcos abiertos se completan con None
+        while self.marcos:
+            self._valor(None)
+        return self.raiz
+
+    #Reglas de reducción: (producción, valores de los hijos) -> valor
+    @staticmethod
+    def _lexema(tok):
+        return tok["lexeme"] if tok else None
+
+    @staticmethod
+    def _pos(tok):
+        return (tok["line"], tok["col"]) if tok else (None, None)
+
+    @staticmethod
+    def _lista(rev):
+        #Las listas llegan invertidas (o None si faltaban por un error)
+        return rev[::-1] if rev else []
+
+    @staticmethod
+    def _r_class(prod, v):
+        return ClassDecl(ConstructorAST._lexema(v[1]), ConstructorAST._lista(v[3]), *ConstructorAST._pos(v[0]))
+
+    @staticmethod
+    def _r_lista(prod, v):
+        #X -> Elem XRest | ε, o XRest -> , Elem XRest | ε: agrega el elemento al final de la lista invertida
+        if not v:
+            return []
+        rest = v[-1] if v[-1] is not None else []
+        if v[-2] is not None:
+            rest.append(v[-2])
+        return rest
+
+    @staticmethod
+    def _r_member(prod, v):
+        tipo, tok, resto = v
+        if resto is None or resto[0] == "campo":
+            return Field(tipo, ConstructorAST._lexema(tok), *ConstructorAST._pos(tok))
+        return Method(tipo, ConstructorAST._lexema(tok), resto[1], resto[2], *ConstructorAST._pos(tok))
+
+    @staticmethod
+    def _r_member_p(prod, v):
+        if prod[0] == ";":
+            return ("campo",)
+        return ("metodo", ConstructorAST._lista(v[1]), v[3] if v[3] is not None else [])
+
+    @staticmethod
+    def _r_param(prod, v):
+        return Param(v[0], ConstructorAST._lexema(v[1]), *ConstructorAST._pos(v[1]))
+
+    @staticmethod
+    def _r_block(prod, v):
+        return ConstructorAST._lista(v[1])
+
+    @staticmethod
+    def _r_stmt(prod, v):
+        if prod[0] == "Return":
+            return v[0]
+        if prod[0] == "Type":
+            return VarDecl(v[0], ConstructorAST._lexema(v[1]), *ConstructorAST._pos(v[1]))
+        tok, resto = v
+        if resto is not None and resto[0] == "llamar":
+            return Call(ConstructorAST._lexema(tok), resto[1], *ConstructorAST._pos(tok))
+        return Assign(ConstructorAST._lexema(tok), resto[1] if resto else None, *ConstructorAST._pos(tok))
+
+    @staticmethod
+    def _r_stmt_p(prod, v):
+        if prod[0] == "=":
+            return ("asignar", v[1])
+        return ("llamar", ConstructorAST._lista(v[1]))
+
+    @staticmethod
+    def _r_return(prod, v):
+        return Return(v[1], *ConstructorAST._pos(v[0]))
+
+    @staticmethod
+    def _r_return_p(prod, v):
+        return v[0] if prod[0] == "Expr" else None
+
+    @staticmethod
+    def _r_primero(prod, v):
+        return v[0]
+
+    @staticmethod
+    def _r_binaria(prod, v):
+        #Rel/Add/Term -> Operando Cola: aplica la cola de (op, operando) asociando a la izquierda
+        izq, cola = v
+        for tok, der in reversed(cola or ()):
+            izq = BinOp(ConstructorAST._lexema(tok), izq, der, *ConstructorAST._pos(tok))
+        return izq
+
+    @staticmethod
+    def _r_cola(prod, v):
+        #RelP/AddP/TermP -> op Operando Cola | ε: cola invertida de (token del operador, operando)
+        if not v:
+            return []
+        cola = v[2] if v[2] is not None else []
+        cola.append((v[0], v[1]))
+        return cola
+
+    @staticmethod
+    def _r_factor(prod, v):
+        if prod[0] == "number":
+            tok = v[0]
+            return Num(int(tok["lexeme"]) if tok else None, *ConstructorAST._pos(tok))
+        if prod[0] == "(":
+            return v[1]
+        tok, args = v
+        if args is None:
+            return Var(ConstructorAST._lexema(tok), *ConstructorAST._pos(tok))
+        return Call(ConstructorAST._lexema(tok), args, *ConstructorAST._pos(tok))
+
+    @staticmethod
+    def _r_factor_p(prod, v):
+        return ConstructorAST._lista(v[1]) if v else None
+
+    @staticmethod
+    def _r_type(prod, v):
+        return ConstructorAST._lexema(v[0])
+
+
+ConstructorAST.REGLAS = {
+    "Prog": ConstructorAST._r_primero,
+    "ClassDecl": ConstructorAST._r_class,
+    "MemberList": ConstructorAST._r_lista,
+    "Member": ConstructorAST._r_member,
+    "MemberP": ConstructorAST._r_member_p,
+    "ParamList": ConstructorAST._r_lista,
+    "ParamRest": ConstructorAST._r_lista,
+    "Param": ConstructorAST._r_param,
+    "Block": ConstructorAST._r_block,
+    "StmtList": ConstructorAST._r_lista,
+    "Stmt": ConstructorAST._r_stmt,
+    "StmtP": ConstructorAST._r_stmt_p,
+    "Return": ConstructorAST._r_return,
+    "ReturnP": ConstructorAST._r_return_p,
+    "ArgList": ConstructorAST._r_lista,
+    "ArgRest": ConstructorAST._r_lista,
+    "Expr": ConstructorAST._r_primero,
+    "Rel": ConstructorAST._r_binaria,
+    "RelP": ConstructorAST._r_cola,
+    "Add": ConstructorAST._r_binaria,
+    "AddP": ConstructorAST._r_cola,
+    "Term": ConstructorAST._r_binaria,
+    "TermP": ConstructorAST._r_cola,
+    "Factor": ConstructorAST._r_factor,
+    "FactorP": ConstructorAST._r_factor_p,
+    "Type": ConstructorAST._r_type,
+}
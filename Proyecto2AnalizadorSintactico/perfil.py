@@ -0,0 +1,175 @@
+import time
+from collections import Counter
+from lexico import Lexico
+from gramatica import Gramatica
+
+
+class Perfil:
+    #Modo de instrumentación del lexer y del parser; acumula mediciones de uno o más archivos:
+    #  - lexer: tiempo total, tokens/s y desglose por grupo de token_spec (cantidad, caracteres, tiempo)
+    #  - parser: tiempo total, tokens/s, usos por producción y por celda de la tabla, expansiones
+    #    y tiempo propio por no terminal, y profundidad máxima de la pila
+    #  - pilas de no terminales con su tiempo propio, exportables en formato "collapsed" de flame graph
+    #El tiempo total se mide en una pasada sin instrumentar; el desglose en una segunda pasada
+    #(incluye el costo de medir, sirve para comparar reglas entre sí).
+    #Las cadenas recursivas por la derecha (MemberList, StmtList, AddP, ...) se pliegan en un
+    #solo marco de la pila para que no generen una ruta distinta por cada elemento.
+
+    def __init__(self):
+        self.archivos = 0
+        self.tokens = 0
+        self.caracteres = 0
+        self.t_lexer = 0.0
+        self.t_parser = 0.0
+        self.profundidad_max = 0
+        #grupo -> [cantidad, caracteres, segundos]
+        self.grupos = {}
+        #(no terminal, producción) -> usos
+        self.producciones = Counter()
+        #(no terminal, terminal) -> usos
+        self.celdas = Counter()
+        #no terminal -> [expansiones, segundos propios]
+        self.no_terminales = {}
+        #ruta (tupla de no terminales) -> segundos propios
+        self.rutas = Counter()
+        self._hijas = {}
+        self._reiniciar_parse()
+
+    def _reiniciar_parse(self):
+        #Estado de un parse: marcos [símbolo, hijos que faltan, ruta], altura de la pila y reloj
+        self._marcos = []
+        self._altura = 2
+        self._t = time.perf_counter()
+
+    def medir(self, text, lexico=None, gram=None):
+        #Analiza text y suma sus mediciones; devuelve el resultado del parse
+        lexico = lexico or Lexico()
+        gram = gram or Gramatica.compilar()
+        t0 = time.perf_counter()
+        lex = lexico.lexer(text)
+        t1 = time.perf_counter()
+        res = Lexico.parse(lex["tokens"], gram.first, gram.follow, gram.compilada, record="none", arbol=False)
+        t2 = time.perf_counter()
+        self.archivos += 1
+        self.tokens += len(lex["tokens"])
+        self.caracteres += len(text)
+        self.t_lexer += t1 - t0
+        self.t_parser += t2 - t1
+        self._medir_lexico(lexico, text)
+        self._reiniciar_parse()
+        Lexico.parse(lex["tokens"], gram.first, gram.follow, gram.compilada, record="none", arbol=False, oyente=self)
+        self._marcos = []
+        self.celdas.update(res["used_cells"])
+        return res
+
+    def _medir_lexico(self, lexico, text):
+        #Recorre el texto con el patrón maestro anotando cantidad, caracteres y tiempo por grupo
+        pat = lexico.master_pat
+        grupos = self.grupos
+        reloj = time.perf_counter
+        pos, n = 0, len(text)
+        t = reloj()
+        while pos < n:
+            m = pat.match(text, pos)
+            if not m:
+                break
+            fin = m.end()
+            ahora = reloj()
+            g = grupos.get(m.lastgroup)
+            if g is None:
+                g = grupos[m.lastgroup] = [0, 0, 0.0]
+            g[0] += 1
+            g[1] += fin - pos
+            g[2] += ahora - t
+            t = ahora
+            pos = fin
+
+    #Eventos del parser (oyente de Lexico.parse)
+    def _ruta(self, sym):
+        #Ruta del nuevo marco: la del padre más sym, salvo recursión por la derecha (X -> ... X)
+        padre = self._marcos[-1][2] if self._marcos else ()
+        if padre and padre[-1] == sym:
+            return padre
+        clave = (padre, sym)
+        ruta = self._hijas.get(clave)
+        if ruta is None:
+            ruta = self._hijas[clave] = padre + (sym,)
+        return ruta
+
+    def _anotar(self, ruta):
+        #Asigna el tiempo desde el evento anterior al último no terminal de ruta
+        dt = time.perf_counter() - self._t
+        self.rutas[ruta] += dt
+        nt = self.no_terminales.get(ruta[-1])
+        if nt is None:
+            nt = self.no_terminales[ruta[-1]] = [0, 0.0]
+        nt[1] += dt
+        return nt
+
+    def expandir(self, sym, prod):
+        ruta = self._ruta(sym)
+        self._anotar(ruta)[0] += 1
+        self.producciones[(sym, tuple(prod))] += 1
+        if prod[0] == Lexico.EPS:
+            self._altura -= 1
+            self._hijo()
+        else:
+            self._altura += len(prod) - 1
+            if self._altura > self.profundidad_max:
+                self.profundidad_max = self._altura
+            self._marcos.append([sym, len(prod), ruta])
+        self._t = time.perf_counter()
+
+    def coincidir(self, token):
+        if self._marcos:
+            self._anotar(self._marcos[-1][2])
+        self._altura -= 1
+        self._hijo()
+        self._t = time.perf_counter()
+
+    def insertar(self, sym):
+        self.coincidir(None)
+
+    def _hijo(self):
+        #Un hijo del marco de arriba terminó; cierra los marcos que se completan
+        marcos = self._marcos
+        while marcos:
+            m = marcos[-1]
+            m[1] -= 1
+            if m[1]:
+                return
+            marcos.pop()
+
+    #Exportación
+    def a_dict(self):
+        #Resumen serializable a JSON, con producciones y celdas ordenadas por usos
+        def por_segundo(t):
+            return round(self.tokens / t, 1) if t > 0 else None
+        return {
+            "archivos": self.archivos,
+            "tokens": self.tokens,
+            "caracteres": self.caracteres,
+            "lexer": {
+                "segundos": round(self.t_lexer, 6),
+                "tokens_por_segundo": por_segundo(self.t_lexer),
+                "grupos": {g: {"cantidad": c, "caracteres": n, "segundos": round(s, 6)}
+                           for g, (c, n, s) in sorted(self.grupos.items(), key=lambda kv: -kv[1][2])},
+            },
+            "parser": {
+                "segundos": round(self.t_parser, 6),
+                "tokens_por_segundo": por_segundo(self.t_parser),
+                "profundidad_max": self.profundidad_max,
+                "no_terminales": {A: {"expansiones": e, "segundos": round(s, 6)}
+                                  for A, (e, s) in sorted(self.no_terminales.items(), key=lambda kv: -kv[1][1])},
+                "producciones": [{"produccion": f"{A} -> {' '.join(p)}", "usos": n}
+                                 for (A, p), n in self.producciones.most_common()],
+                "celdas": [{"no_terminal": A, "terminal": a, "usos": n} for (A, a), n in self.celdas.most_common()],
+            },
+        }
+
+    def colapsado(self):
+        #Líneas "A;B;C microsegundos" (formato de flamegraph.pl / speedscope): pilas del parser
+        #y, bajo "lexer", el tiempo de cada grupo de tokens
+        lineas = [f"{';'.join(ruta)} {round(s * 1e6)}" for ruta, s in self.rutas.items() if round(s * 1e6) > 0]
+        lineas += [f"lexer;{g} {round(s * 1e6)}" for g, (_, _, s) in self.grupos.items() if round(s * 1e6) > 0]
+        return "\n".join(lineas) + "\n"
@@ -0,0 +1,86 @@
+from array import array
+
+
+class TablaCompilada:
+    #Tabla LL(1) codificada con enteros para el ciclo del parser:
+    #  - terminales: ids 0..T-1; el id T representa un token desconocido
+    #  - no terminales: ids T+1..T+N
+    #  - celdas: arreglo denso N x (T+1) con el índice de la producción o -1
+    #  - cada producción guarda sus símbolos ya invertidos, listos para apilar
+    #No se usa NumPy: el parser lee celda por celda desde Python y array es más rápido en ese patrón
+    def __init__(self, table, nonterminals, terminals, eps):
+        self.terminales = list(terminals)
+        self.no_terminales = list(nonterminals)
+        self.n_terminales = len(self.terminales)
+        self.ancho = self.n_terminales + 1
+        self.desconocido = self.n_terminales
+        self.simbolos = self.terminales + ["?"] + self.no_terminales
+        self.ids = {s: i for i, s in enumerate(self.simbolos)}
+        del self.ids["?"]
+        self.term_id = {t: i for i, t in enumerate(self.terminales)}
+        self.eof = self.term_id["$"]
+        self.inicio = self.ids[self.no_terminales[0]]
+        self.eps = eps
+        self._sincronizacion = {}
+
+        #Internado de producciones: cada (A, producción) distinta recibe un índice
+        self.producciones = []
+        self.cabezas = []
+        self.invertidas = []
+        self.plantillas = []
+        indice = {}
+        self.celdas = array("i", [-1]) * (len(self.no_terminales) * self.ancho)
+        for r, A in enumerate(self.no_terminales):
+            for a, prod in table.get(A, {}).items():
+                if a not in self.term_id:
+                    continue
+                clave = (A, tuple(prod))
+                k = indice.get(clave)
+                if k is None:
+                    k = len(self.producciones)
+                    indice[clave] = k
+                    self._agregar_produccion(A, prod)
+                self.celdas[r * self.ancho + self.term_id[a]] = k
+
+    def _agregar_produccion(self, A, prod):
+        #Guarda la producción original con su no terminal, sus ids invertidos y la plantilla de nodos hijos
+        self.producciones.append(prod)
+        self.cabezas.append(A)
+        if len(prod) == 1 and prod[0] == self.eps:
+            self.invertidas.append(())
+            self.plantillas.append((("EPS_", "ε"),))
+            return
+        self.invertidas.append(tuple(self.ids[s] for s in reversed(prod)))
+        plantilla = []
+        for s in prod:
+            if s in self.ids and self.ids[s] > self.desconocido:
+                plantilla.append((f"{s}_", s))
+            else:
+                plantilla.append((f"TK_{s}_", s))
+        self.plantillas.append(tuple(plantilla))
+
+    def sincronizacion(self, follow, anclas=(";", "{", "}")):
+        #Para cada no terminal X: (terminales con producción en la tabla, FOLLOW(X) + anclas),
+        #como sets de ids; la usa la recuperación en modo pánico y se calcula una vez por FOLLOW
+        clave = (frozenset((A, frozenset(s)) for A, s in follow.items()), tuple(anclas))
+        sinc = self._sincronizacion.get(clave)
+        if sinc is None:
+            sinc = {}
+            for r, A in enumerate(self.no_terminales):
+                X = self.ancho + r
+                expandibles = {a for a in range(self.n_terminales) if self.celdas[r * self.ancho + a] >= 0}
+                sincronizar = {self.term_id[t] for t in set(follow.get(A, ())) | set(anclas) if t in self.term_id}
+                sinc[X] = (frozenset(expandibles), frozenset(sincronizar - expandibles))
+            self._sincronizacion[clave] = sinc
+        return sinc
+
+    def es_no_terminal(self, x):
+        return x > self.desconocido
+
+    def tipo_id(self, tipo):
+        #Id entero del tipo de token; los tipos fuera de la gramática usan el id "desconocido"
+        return self.term_id.get(tipo, self.desconocido)
+
+    def produccion(self, X, a):
+        #Índice de la producción para el no terminal X con el terminal a, o -1
+        return self.celdas[(X - self.ancho) * self.ancho + a]
@@ -0,0 +1,160 @@
+from gramatica import Gramatica
+from almacen_tokens import AlmacenTokens
+from acciones import Acciones
+
+
+class TablaSimbolos:
+    #Tabla de símbolos que se arma durante el parse (con Acciones, sin árbol de derivación):
+    #  - declaraciones: miembros de la clase (campos y métodos), parámetros y locales de cada método,
+    #    como dicts {"nombre","tipo","clase","line","col","ambito"}; ambito es el índice de la
+    #    declaración del método que los contiene (None para los miembros)
+    #  - miembros[nombre] y ambitos[metodo][nombre]: búsqueda O(1) por nombre
+    #  - usos[nombre]: sitios donde aparece cada identificador, para buscar referencias
+    #  - posiciones[(line, col)]: declaración o uso en esa posición, para ir a la definición
+    OPERADORES = frozenset({"+", "-", "*", "/", "<", ">", "=="})
+    SIMBOLOS = frozenset({"{", "}", "(", ")", ",", ";"})
+
+    def __init__(self):
+        self.declaraciones = []
+        self.miembros = {}
+        self.ambitos = {}
+        self.usos = {}
+        self.posiciones = {}
+        self.clase = None
+        #Estado del recorrido: qué declaración espera su nombre y en qué método estamos
+        self._pendiente = None
+        self._tipo = None
+        self._miembro = None
+        self._metodo = None
+        self._en_cuerpo = False
+        self._ultimo_uso = None
+
+    @staticmethod
+    def construir(tokens, gram=None, *oyentes, recuperacion="token"):
+        #Parsea tokens (sin árbol de derivación) y devuelve (tabla, resultado del parse)
+        tabla = TablaSimbolos()
+        acc = Acciones(*oyentes)
+        tabla.registrar(acc)
+        return tabla, acc.ejecutar(tokens, gram or Gramatica.compilar(), recuperacion=recuperacion)
+
+    def registrar(self, acciones):
+        #Engancha la tabla a un Acciones para que se llene en el mismo ciclo del parser
+        acciones.al_expandir(("ClassDecl", "Member", "MemberP", "Param", "Stmt", "StmtP", "FactorP"), self._expandir)
+        acciones.al_coincidir(("id", "{", "}", "int", "void"), self._coincidir)
+        acciones.al_insertar("id", self._insertar_id)
+        return acciones
+
+    def _expandir(self, sym, prod):
+        if sym == "Member":
+            self._pendiente, self._tipo = "campo", None
+            self._miembro, self._metodo, self._en_cuerpo = None, None, False
+        elif sym == "MemberP":
+            if prod[0] == "(" and self._miembro is not None:
+                #El miembro recién declarado es un método: abre su ámbito (si le faltó el
+                #nombre, _miembro quedó en None y sus parámetros y locales no tienen ámbito)
+                self._miembro["clase"] = "metodo"
+                self._metodo = self._miembro["indice"]
+                self.ambitos[self._metodo] = {}
+        elif sym == "Param":
+            self._pendiente, self._tipo = "parametro", None
+        elif sym == "Stmt":
+            if prod[0] == "Type":
+                self._pendiente, self._tipo = "local", None
+        elif sym == "ClassDecl":
+            self._pendiente = "clase"
+        elif prod[0] == "(" and self._ultimo_uso is not None:
+            #StmtP o FactorP con paréntesis: el identificador anterior es una llamada
+            self._ultimo_uso["llamada"] = True
+
+    def _coincidir(self, tok):
+        tipo = tok["type"]
+        if tipo == "id":
+            if self._pendiente is None:
+                self._usar(tok)
+            else:
+                self._declarar(tok)
+            return
+        self._ultimo_uso = None
+        if self._metodo is not None and tipo in ("{", "}"):
+            if tipo == "{":
+                self._en_cuerpo = True
+            elif self._en_cuerpo:
+                self._metodo, self._en_cuerpo = None, False
+        elif tipo in ("int", "void") and self._pendiente is not None:
+            self._tipo = tok["lexeme"]
+
+    def _insertar_id(self, sym):
+        #Falta el nombre de la declaración o de la sentencia (error de sintaxis): se descarta,
+        #y un paréntesis que siga no es la llamada de ningún uso anterior
+        self._pendiente = None
+        self._ultimo_uso = None
+
+    def _declarar(self, tok):
+        clase = self._pendiente
+        self._pendiente = None
+        self._ultimo_uso = None
+        if clase == "clase":
+            self.clase = tok["lexeme"]
+            return
+        nombre = tok["lexeme"]
+        ambito = None if clase == "campo" else self._metodo
+        if ambito is None and clase != "campo":
+            #Parámetro o local de un método sin nombre: no hay ámbito donde declararlo
+            return
+        d = {"nombre": nombre, "tipo": self._tipo, "clase": clase, "line": tok["line"], "col": tok["col"],
+             "ambito": ambito, "indice": len(self.declaraciones)}
+        self.declaraciones.append(d)
+        self.posiciones[(d["line"], d["col"])] = d
+        if ambito is None:
+            self._miembro = d
+            self.miembros.setdefault(nombre, []).append(d)
+        else:
+            #Locales/parámetros repetidos en el mismo método: se conserva el primero
+            self.ambitos[ambito].setdefault(nombre, d)
+
+    def _usar(self, tok):
+        u = {"nombre": tok["lexeme"], "line": tok["line"], "col": tok["col"], "ambito": self._metodo, "llamada": False}
+        self.usos.setdefault(u["nombre"], []).append(u)
+        self.posiciones[(u["line"], u["col"])] = u
+        self._ultimo_uso = u
+
+    #Consultas
+    def buscar(self, nombre, metodo=None, llamada=False):
+        #Resuelve un nombre como lo haría un uso dentro de metodo (índice de su declaración):
+        #primero parámetros y locales, después miembros de la clase
+        if not llamada and metodo is not None:
+            d = self.ambitos.get(metodo, {}).get(nombre)
+            if d is not None:
+                return d
+        candidatos = self.miembros.get(nombre)
+        if not candidatos:
+            return None
+        for d in candidatos:
+            if (d["clase"] == "metodo") == llamada:
+                return d
+        return candidatos[0]
+
+    def definicion(self, line, col):
+        #Declaración del identificador que está en (line, col), o None
+        s = self.posiciones.get((line, col))
+        if s is None or "clase" in s:
+            return s
+        return self.buscar(s["nombre"], s["ambito"], s["llamada"])
+
+    def referencias(self, decl):
+        #Usos que resuelven a la declaración dada
+        return [u for u in self.usos.get(decl["nombre"], ())
+                if self.buscar(u["nombre"], u["ambito"], u["llamada"]) is decl]
+
+    def metodos(self):
+        return [d for d in self.declaraciones if d["clase"] == "metodo"]
+
+    def resumen(self, tokens=()):
+        #Conteos del resumen: variables y métodos salen de las declaraciones; operadores y
+        #símbolos, de los tipos de todos los tokens (también los que el parser saltó por errores)
+        n_vars = sum(1 for d in self.declaraciones if d["clase"] in ("campo", "local"))
+        n_metodos = sum(1 for d in self.declaraciones if d["clase"] == "metodo")
+        types = tokens.tipos() if isinstance(tokens, AlmacenTokens) else [t["type"] for t in tokens]
+        n_ops = sum(1 for t in types if t in TablaSimbolos.OPERADORES)
+        n_syms = sum(1 for t in types if t in TablaSimbolos.SIMBOLOS)
+        return {"vars": n_vars, "methods": n_metodos, "ops": n_ops, "symbols": n_syms}
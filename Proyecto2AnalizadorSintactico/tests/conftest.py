@@ -0,0 +1,6 @@
+import os
+import sys
+
+#Los módulos del proyecto están sueltos en la carpeta padre (se ejecutan desde ahí)
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CARPETA)
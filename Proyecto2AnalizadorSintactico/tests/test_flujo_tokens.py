@@ -0,0 +1,44 @@
+import io
+import random
+import pytest
+from lexico import Lexico
+
+
+class Tubo:
+    #Fuente que no se puede releer (como stdin)
+    def __init__(self, data):
+        self.f = io.BytesIO(data)
+
+    def read(self, n):
+        return self.f.read(n)
+
+
+def fuentes(text):
+    data = text.encode("utf-8")
+    return [text, data, memoryview(data), io.StringIO(text), io.BytesIO(data), Tubo(data)]
+
+
+@pytest.mark.parametrize("motor", Lexico.MOTORES)
+def test_flujo_igual_al_lexer(motor):
+    rnd = random.Random(3)
+    alfabeto = list("ab1 \n\t{};+-*/=@é") + ["/*", "*/", "*\n/", "/**/", "int", "ñññ"]
+    lexico = Lexico(motor)
+    for _ in range(300):
+        text = "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 120)))
+        res = lexico.lexer(text)
+        esperado = [(t["type"], t["lexeme"], t["line"], t["col"]) for t in res["tokens"]]
+        for bloque in (16, 23):
+            for fuente in fuentes(text):
+                flujo = lexico.lexer_stream(fuente, bloque)
+                assert list(flujo) == esperado, (bloque, text)
+                assert flujo.errors == res["errors"] and flujo.lines == res["lines"]
+
+
+def test_comentario_largo_no_se_guarda():
+    #Dentro de un comentario solo se cuentan líneas: el buffer no crece con el comentario
+    text = "int x; /*" + "comentario\n" * 20000 + "*/ int y; /* sin cerrar\nint z;"
+    flujo = Lexico().lexer_stream(io.BytesIO(text.encode()), 64)
+    tokens = list(flujo)
+    assert tokens[3:6] == [("int", "int", 20001, 4), ("id", "y", 20001, 8), (";", ";", 20001, 9)]
+    assert [t[0] for t in tokens[6:]] == ["/", "*", "id", "id", "int", "id", ";"]
+    assert flujo.lines == 20002
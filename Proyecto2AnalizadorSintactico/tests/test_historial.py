@@ -0,0 +1,31 @@
+import os
+import random
+import pytest
+from lexico import Lexico
+from gramatica import Gramatica
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def normal(n):
+    #Hijos como listas: el árbol rehecho deja tuplas vacías en las hojas, igual que el parser
+    return {k: ([normal(c) for c in v] if k == "children" else v) for k, v in n.items()}
+
+
+@pytest.mark.parametrize("recuperacion", ["token", "panico"])
+@pytest.mark.parametrize("nombre", ["programa.txt", "programa_error.txt"])
+def test_pasos_sin_arbol_rehacen_el_mismo_arbol(nombre, recuperacion):
+    with open(os.path.join(CARPETA, nombre), encoding="utf-8") as f:
+        tokens = Lexico().lexer(f.read())["tokens"]
+    gram = Gramatica.compilar()
+    con = Lexico.parse(tokens, gram.first, gram.follow, gram.compilada, recuperacion=recuperacion)
+    sin = Lexico.parse(tokens, gram.first, gram.follow, gram.compilada, recuperacion=recuperacion, arbol=False)
+    assert sin["tree"] is None and len(sin["steps"]) == len(con["steps"])
+    #En desorden: el árbol se rehace solo hasta el paso pedido y después sigue desde ahí
+    orden = list(range(len(con["steps"])))
+    random.Random(7).shuffle(orden)
+    for i in sorted(orden[:20]) + orden[:200]:
+        a, b = con["steps"][i], sin["steps"][i]
+        assert (a["action"], a["info"]) == (b["action"], b["info"])
+        assert normal(a["tree"]) == normal(b["tree"])
+    assert normal(sin["steps"].arbol_final()) == normal(con["tree"])
@@ -0,0 +1,139 @@
+import os
+import random
+import pytest
+from lexico import Lexico
+from gramatica import Gramatica
+from incremental import AnalisisIncremental
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+#Fragmentos que se insertan: sentencias, llaves sueltas, comentarios y caracteres ilegales
+FRAGMENTOS = ["int x;", "\n", " ", "return a+b;", "}", "{", "/*", "*/", "@", "@@#", "12a", "á", "==",
+              "void f(int a){ x = 1; }\n", "int", "x", ";", "(", ")", "//c\n", "} void g() {"]
+#Métodos con muchas sentencias, para ejercitar las fronteras entre sentencias
+LARGO = "class A {\n" + "".join(
+    "  int f%d(int a) {\n" % k + "".join("    x%d = a + %d;\n    int y%d;\n" % (i, i, i) for i in range(15))
+    + "    return a;\n  }\n  int c%d;\n" % k for k in range(3)) + "}\n"
+
+
+def leer(nombre):
+    with open(os.path.join(CARPETA, nombre), encoding="utf-8") as f:
+        return f.read()
+
+
+def forma(n):
+    #Árbol de derivación sin ids de nodo, que no se conservan entre análisis
+    if n is None:
+        return None
+    pila, salida = [(n, None)], []
+    while pila:
+        nodo, padre = pila.pop()
+        fila = [nodo["sym"], nodo.get("expanded"), []]
+        (salida if padre is None else padre).append(fila)
+        pila.extend((c, fila[2]) for c in reversed(nodo["children"]))
+    return salida
+
+
+def completo(text, lexico, gram):
+    lex = lexico.lexer(text)
+    return lex, Lexico.parse(lex["tokens"], gram.first, gram.follow, gram.compilada, record="none")
+
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+@pytest.mark.parametrize("motor", Lexico.MOTORES)
+def test_ediciones_aleatorias_igual_que_analisis_completo(semilla, motor):
+    rnd = random.Random(semilla)
+    lexico = Lexico(motor)
+    gram = Gramatica.compilar()
+    for base in (leer("programa.txt"), leer("programa_error.txt"), LARGO):
+        text = base
+        inc = AnalisisIncremental(lexico)
+        inc.analizar(text)
+        for paso in range(40):
+            a = rnd.randrange(len(text) + 1)
+            b = min(len(text), a + rnd.choice([0, 0, 1, 2, 5, 20]))
+            nuevo = "".join(rnd.choice(FRAGMENTOS) for _ in range(rnd.choice([0, 1, 1, 2, 3])))
+            text = text[:a] + nuevo + text[b:]
+            #Alterna entre la edición explícita y la que se calcula comparando textos
+            if paso % 2:
+                inc.editar(a, b, nuevo)
+            else:
+                inc.actualizar(text)
+            res = inc.resultado()
+            lex, parse = completo(text, lexico, gram)
+            ctx = (motor, semilla, paso, a, b, nuevo)
+            assert list(res["lex"]["tokens"]) == list(lex["tokens"]), ctx
+            assert res["lex"]["errors"] == lex["errors"], ctx
+            assert res["lex"]["lines"] == lex["lines"], ctx
+            assert res["parse"]["errors"] == parse["errors"], ctx
+            assert res["parse"]["used_cells"] == parse["used_cells"], ctx
+            assert forma(res["parse"]["tree"]) == forma(parse["tree"]), ctx
+
+
+def test_tope_de_errores_vuelve_al_analisis_completo():
+    lexico = Lexico(max_errores=3)
+    gram = Gramatica.compilar()
+    text = leer("programa.txt")
+    inc = AnalisisIncremental(lexico)
+    inc.analizar(text)
+    for k in range(6):
+        a = text.index("{") + 1 + k
+        text = text[:a] + "@ " + text[a:]
+        inc.actualizar(text)
+        lex, _ = completo(text, lexico, gram)
+        assert list(inc.resultado()["lex"]["tokens"]) == list(lex["tokens"])
+        assert inc.resultado()["lex"]["errors"] == lex["errors"]
+
+
+@pytest.mark.parametrize("marca, nuevo", [("x12 ", "z = 2;\n"), ("x0 ", "int w;"), ("(int a)", " "),
+                                          ("class A", "B"), ("x5 = a", "} void g() {")])
+def test_edicion_sin_analisis_completo(marca, nuevo):
+    #Las ediciones dentro de un método, en su cabecera o en la de la clase se reanudan desde una
+    #frontera (o desde el principio) sin volver a analizar todo
+    lexico = Lexico()
+    gram = Gramatica.compilar()
+    inc = AnalisisIncremental(lexico)
+    inc.analizar(LARGO)
+    inc.analizar = inc._parsear_todo = None
+    a = LARGO.index(marca)
+    inc.editar(a, a, nuevo)
+    text = LARGO[:a] + nuevo + LARGO[a:]
+    res = inc.resultado()
+    lex, parse = completo(text, lexico, gram)
+    assert list(res["lex"]["tokens"]) == list(lex["tokens"])
+    assert res["parse"]["errors"] == parse["errors"]
+    assert res["parse"]["used_cells"] == parse["used_cells"]
+    assert forma(res["parse"]["tree"]) == forma(parse["tree"])
+
+
+@pytest.mark.parametrize("semilla", [1, 2])
+def test_limite_devuelve_none_sin_tocar_el_estado(semilla):
+    #Una edición que no se resuelve dentro del límite deja el análisis anterior intacto y
+    #después se puede aplicar sin límite
+    rnd = random.Random(semilla)
+    lexico = Lexico()
+    gram = Gramatica.compilar()
+    text = LARGO
+    inc = AnalisisIncremental(lexico)
+    inc.analizar(text)
+    rechazadas = 0
+    for paso in range(60):
+        a = rnd.randrange(len(text) + 1)
+        b = min(len(text), a + rnd.choice([0, 0, 1, 2, 5, 20]))
+        nuevo = "".join(rnd.choice(FRAGMENTOS) for _ in range(rnd.choice([1, 1, 2])))
+        antes = inc.resultado()
+        forma_antes = forma(antes["parse"]["tree"])
+        text = text[:a] + nuevo + text[b:]
+        if inc.actualizar(text, limite=rnd.choice([5, 40])) is None:
+            rechazadas += 1
+            res = inc.resultado()
+            assert inc.text != text
+            assert list(res["lex"]["tokens"]) == list(antes["lex"]["tokens"])
+            assert res["parse"]["errors"] == antes["parse"]["errors"]
+            assert forma(res["parse"]["tree"]) == forma_antes
+            inc.actualizar(text)
+        res = inc.resultado()
+        lex, parse = completo(text, lexico, gram)
+        assert list(res["lex"]["tokens"]) == list(lex["tokens"]), paso
+        assert res["parse"]["errors"] == parse["errors"], paso
+        assert forma(res["parse"]["tree"]) == forma(parse["tree"]), paso
+    assert rechazadas
@@ -0,0 +1,57 @@
+import os
+import random
+import pytest
+from lexico import Lexico
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MALFORMADOS = [
+    "int x@y;",                          #carácter ilegal suelto
+    "class A { int x; } @@#$ ¿¿",       #rachas de caracteres ilegales
+    "int a; /* sin cerrar\nint b;",      #comentario de bloque sin cerrar
+    "a /* uno */ b /* dos\n\n */ c",     #comentarios que cruzan líneas
+    "x = 1; // línea\n//\n",
+    "class classe int int1 void voids return returnx _r",  #palabras clave frente a identificadores
+    "123abc abc123 12 3a é ñame x١٢ ٣٤",  #\b de NUMBER e ID con letras y dígitos Unicode
+    "a==b=c===d<>+-*/",
+    "\t\r\n\x0b\x0c\x85 x",
+    "",
+]
+
+
+def leer(nombre):
+    with open(os.path.join(CARPETA, nombre), encoding="utf-8") as f:
+        return f.read()
+
+
+def comparar(text, **opciones):
+    regex, dfa = Lexico("regex", **opciones).lexer(text), Lexico("dfa", **opciones).lexer(text)
+    assert list(dfa["tokens"]) == list(regex["tokens"]), text
+    assert dfa["errors"] == regex["errors"], text
+    assert dfa["lines"] == regex["lines"], text
+
+
+@pytest.mark.parametrize("nombre", ["programa.txt", "programa_error.txt"])
+def test_programas_de_ejemplo(nombre):
+    comparar(leer(nombre))
+
+
+@pytest.mark.parametrize("text", MALFORMADOS)
+def test_entradas_malformadas(text):
+    comparar(text)
+    comparar(text, max_errores=1)
+
+
+def test_textos_aleatorios():
+    rnd = random.Random(7)
+    alfabeto = list("abcxyz_019 \t\r\n{}(),;+-*/=<>@#$.\"'éñ٣²") + ["/*", "*/", "//", "==", "class", "int", "return", "int1"]
+    for _ in range(500):
+        comparar("".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 60))))
+
+
+@pytest.mark.parametrize("bloque", [16, 37])
+def test_lexer_por_bloques(bloque):
+    text = leer("programa_error.txt") + "\n/* a */ x@@ 12ab /* sin cerrar"
+    flujos = [Lexico(m).lexer_stream(text, bloque) for m in Lexico.MOTORES]
+    regex, dfa = [list(f) for f in flujos]
+    assert dfa == regex
+    assert flujos[1].errors == flujos[0].errors and flujos[1].lines == flujos[0].lines
@@ -0,0 +1,13 @@
+from gramatica import Gramatica
+
+
+def test_sincronizacion_sigue_al_follow_recibido():
+    gram = Gramatica.compilar()
+    tabla = gram.compilada
+    X = tabla.ids["Stmt"]
+    normal = tabla.sincronizacion(gram.follow)[X][1]
+    #Un FOLLOW distinto no recibe los sets calculados para el anterior
+    follow = dict(gram.follow, Stmt=set(gram.follow["Stmt"]) | {"=="})
+    ampliado = tabla.sincronizacion(follow)[X][1]
+    assert tabla.term_id["=="] in ampliado - normal
+    assert tabla.sincronizacion(gram.follow)[X][1] == normal
@@ -0,0 +1,70 @@
+from lexico import Lexico
+from tabla_simbolos import TablaSimbolos
+
+PROGRAMA = """class A {
+  int f(int a) { int b; b = a; return b; }
+  int ;
+  void (int c) { int d; }
+  void g(int e) { int h; }
+}"""
+
+
+def construir(text):
+    return TablaSimbolos.construir(Lexico().lexer(text)["tokens"])
+
+
+SENCILLO = """class A {
+  int x;
+  int f(int a) { int b; b = a + x; return f(b); }
+}"""
+
+
+def test_declaraciones_y_ambitos():
+    tabla, res = construir(SENCILLO)
+    assert res["errors"] == [] and tabla.clase == "A"
+    assert [(d["nombre"], d["clase"]) for d in tabla.declaraciones] == \
+        [("x", "campo"), ("f", "metodo"), ("a", "parametro"), ("b", "local")]
+    f, = tabla.miembros["f"]
+    assert sorted(tabla.ambitos[f["indice"]]) == ["a", "b"]
+
+
+def test_definicion_y_referencias():
+    tabla, _ = construir(SENCILLO)
+    x, = tabla.miembros["x"]
+    f, = tabla.miembros["f"]
+    b = tabla.ambitos[f["indice"]]["b"]
+    #Cada uso se resuelve a su declaración: local, campo de la clase o el método llamado
+    for nombre, decl in (("b", b), ("x", x), ("f", f)):
+        for u in tabla.usos[nombre]:
+            assert tabla.definicion(u["line"], u["col"]) is decl
+    assert tabla.usos["f"][0]["llamada"]
+    assert len(tabla.referencias(b)) == 2
+
+
+def test_miembro_sin_nombre_no_pisa_el_metodo_anterior():
+    tabla, res = construir(PROGRAMA)
+    assert len(res["errors"]) == 2
+    f, = tabla.miembros["f"]
+    g, = tabla.miembros["g"]
+    assert f["clase"] == "metodo" and g["clase"] == "metodo"
+    assert sorted(tabla.ambitos[f["indice"]]) == ["a", "b"]
+    assert sorted(tabla.ambitos[g["indice"]]) == ["e", "h"]
+    #Los parámetros y locales del método sin nombre no se atribuyen a ningún otro
+    assert [d["nombre"] for d in tabla.declaraciones] == ["f", "a", "b", "g", "e", "h"]
+    assert tabla.resumen()["methods"] == 2
+
+
+def test_resolucion_dentro_del_metodo():
+    tabla, _ = construir(PROGRAMA)
+    f, = tabla.miembros["f"]
+    usos = tabla.usos["b"]
+    assert [tabla.definicion(u["line"], u["col"])["indice"] for u in usos] == [f["indice"] + 2] * 2
+
+
+def test_resumen_cuenta_los_tokens_saltados():
+    #Operadores y símbolos se cuentan sobre todos los tokens, aunque el parser salte algunos
+    tokens = Lexico().lexer("class A { int x = 1 + 2 * 3; }")["tokens"]
+    tabla, res = TablaSimbolos.construir(tokens)
+    assert res["errors"]
+    resumen = tabla.resumen(tokens)
+    assert (resumen["ops"], resumen["symbols"]) == (2, 3)
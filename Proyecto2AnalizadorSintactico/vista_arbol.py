@@ -0,0 +1,328 @@
+import math
+from bisect import bisect_left, bisect_right
+from arbol import Arbol
+
+
+class VistaArbol:
+    #Vista virtualizada del árbol sobre un tk.Canvas: solo existen items para los nodos que
+    #caen en la región visible (más un margen). Con el zoom alejado los subárboles angostos se
+    #resumen en un glifo con su cantidad de nodos. Los items que salen de la vista se ocultan
+    #y se reutilizan para los que entran, así el canvas nunca crece con el tamaño del árbol.
+    MARGEN = 200
+    MARGEN_X = 60
+    MARGEN_Y = 40
+    PX_POR_UNIDAD = 100
+    Y0 = 30
+    Y_STEP = 70
+    #Por debajo de ESCALA_TEXTO no se dibujan etiquetas; por debajo de ESCALA_RESUMEN los
+    #subárboles más angostos que ANCHO_RESUMEN píxeles se dibujan como un solo glifo
+    ESCALA_TEXTO = 0.45
+    ESCALA_RESUMEN = 0.6
+    ANCHO_RESUMEN = 48
+    ZOOM_MIN = 0.02
+    ZOOM_MAX = 4.0
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.escala = 1.0
+        self.compacto = False
+        #Caché de anchos compartida entre pasos (ver Arbol.layout_tree)
+        self.anchos = {}
+        self.marco = None
+        #Árbol del paso mostrado (para exportarlo)
+        self.arbol = None
+        self.resaltados = set()
+        #Items dibujados: clave -> [tipo, item, texto, coords, borde]; aristas: clave del hijo -> [item, coords]
+        self.dibujados = {}
+        self.aristas = {}
+        self.libres = {"oval": [], "text": [], "line": [], "rectangle": []}
+        self.caption = None
+        self.texto_caption = ""
+        self._pendiente = None
+
+    def reiniciar(self):
+        #Olvida el análisis anterior (los ids de nodo se repiten entre análisis)
+        self.canvas.delete("all")
+        self.anchos.clear()
+        self.marco = None
+        self.arbol = None
+        self.resaltados = set()
+        self.dibujados = {}
+        self.aristas = {}
+        self.libres = {k: [] for k in self.libres}
+        self.caption = None
+
+    def mostrar(self, step, current, total_steps):
+        #Calcula el layout del paso y dibuja la parte visible
+        if not step or not step.get("tree"):
+            self.reiniciar()
+            self.canvas.create_text(200, 150, text="Ejecuta 'Analizar' primero", fill="#888", font=("Arial", 13))
+            return
+        self.arbol = step["tree"]
+        orden, primer, niveles, xs = Arbol.layout_arreglos(self.arbol, self.compacto, self.anchos)
+        n_nodos = len(orden)
+        #La caché se queda solo con los nodos de este paso: los subárboles terminados que
+        #Historial comparte con el paso siguiente siguen en ella y las copias de un solo paso
+        #se sueltan, así no crece con cada paso recorrido
+        anchos = self.anchos
+        vigentes = {}
+        for n in orden:
+            ent = anchos.get(id(n))
+            if ent is not None:
+                vigentes[id(n)] = ent
+        self.anchos = vigentes
+        claves = [n.get("id", id(n)) for n in orden]
+        padre = [-1] * n_nodos
+        for i in range(n_nodos):
+            for j in range(primer[i], primer[i + 1]):
+                padre[j] = i
+        #Extensión horizontal y tamaño de cada subárbol, de abajo hacia arriba
+        ext_min = list(xs)
+        ext_max = list(xs)
+        tam = [1] * n_nodos
+        for i in range(n_nodos - 1, -1, -1):
+            p, q = primer[i], primer[i + 1]
+            if p < q:
+                ext_min[i] = min(xs[i], min(ext_min[p:q]))
+                ext_max[i] = max(xs[i], max(ext_max[p:q]))
+                tam[i] = 1 + sum(tam[p:q])
+        #Resalta los nodos que no estaban en el paso anterior y los nodos que los expandieron
+        conjunto = set(claves)
+        resaltados = set()
+        if self.marco is not None:
+            previo = self.marco["conjunto"]
+            for i, k in enumerate(claves):
+                if k not in previo:
+                    resaltados.add(k)
+                    if padre[i] >= 0:
+                        resaltados.add(claves[padre[i]])
+        self.resaltados = resaltados
+        self.marco = {
+            "orden": orden, "primer": primer, "niveles": niveles, "xs": xs, "claves": claves,
+            "padre": padre, "ext_min": ext_min, "ext_max": ext_max, "tam": tam, "conjunto": conjunto,
+            "minx": min(xs), "maxx": max(xs),
+        }
+        self.texto_caption = f"Paso {current + 1}/{total_steps} | {step.get('action', '')}"
+        self._preparar_detalle()
+        self._ajustar_region()
+        self.render()
+
+    def _preparar_detalle(self):
+        #Decide qué nodos se dibujan completos, cuáles como resumen y cuáles quedan ocultos
+        #para la escala actual, y arma por nivel las listas ordenadas por x para la búsqueda
+        m = self.marco
+        orden, primer, niveles, xs = m["orden"], m["primer"], m["niveles"], m["xs"]
+        ext_min, ext_max = m["ext_min"], m["ext_max"]
+        resumir = self.escala < VistaArbol.ESCALA_RESUMEN
+        umbral = VistaArbol.ANCHO_RESUMEN / (VistaArbol.PX_POR_UNIDAD * self.escala)
+        #0 = nodo, 1 = resumen del subárbol, 2 = oculto dentro de un resumen
+        tipo = [0] * len(orden)
+        por_nivel = []
+        for d in range(len(niveles) - 1):
+            xs_d = []
+            idx_d = []
+            for i in range(niveles[d], niveles[d + 1]):
+                t = tipo[i]
+                if t == 2:
+                    continue
+                p, q = primer[i], primer[i + 1]
+                if resumir and p < q and ext_max[i] - ext_min[i] < umbral:
+                    tipo[i] = t = 1
+                if t == 1:
+                    for j in range(p, q):
+                        tipo[j] = 2
+                xs_d.append(xs[i])
+                idx_d.append(i)
+            if not idx_d:
+                break
+            por_nivel.append((xs_d, idx_d))
+        m["tipo"] = tipo
+        m["por_nivel"] = por_nivel
+
+    def _px(self, x):
+        m = self.marco
+        return (VistaArbol.MARGEN_X + (x - m["minx"]) * VistaArbol.PX_POR_UNIDAD) * self.escala
+
+    def _py(self, depth):
+        return (VistaArbol.MARGEN_Y + VistaArbol.Y0 + depth * VistaArbol.Y_STEP) * self.escala
+
+    def _ajustar_region(self):
+        m = self.marco
+        ancho = self._px(m["maxx"]) + VistaArbol.MARGEN_X * self.escala
+        alto = self._py(len(m["por_nivel"]) - 1) + VistaArbol.MARGEN_Y * self.escala
+        self.canvas.configure(scrollregion=(0, 0, ancho, alto))
+        return ancho, alto
+
+    def programar(self):
+        #Agrupa los cambios de scroll y tamaño en un solo redibujo cuando Tk queda libre
+        if self._pendiente is None and self.marco is not None:
+            self._pendiente = self.canvas.after_idle(self._render_pendiente)
+
+    def _render_pendiente(self):
+        self._pendiente = None
+        self.render()
+
+    def zoom(self, factor, x, y):
+        #Cambia la escala manteniendo fijo el punto bajo el cursor
+        if self.marco is None:
+            return
+        c = self.canvas
+        ux = c.canvasx(x) / self.escala
+        uy = c.canvasy(y) / self.escala
+        escala = min(VistaArbol.ZOOM_MAX, max(VistaArbol.ZOOM_MIN, self.escala * factor))
+        if escala == self.escala:
+            return
+        self.escala = escala
+        #Cambian los tamaños y el nivel de detalle: todos los items vuelven a la reserva
+        for k in list(self.dibujados):
+            self._liberar(k)
+        for k in list(self.aristas):
+            self._liberar_arista(k)
+        self._preparar_detalle()
+        ancho, alto = self._ajustar_region()
+        c.xview_moveto(max(0, ux * escala - x) / ancho)
+        c.yview_moveto(max(0, uy * escala - y) / alto)
+        self.render()
+
+    def render(self):
+        #Sincroniza los items del canvas con los nodos dentro de la región visible
+        m = self.marco
+        if m is None:
+            return
+        c = self.canvas
+        e = self.escala
+        w, h = max(c.winfo_width(), 1), max(c.winfo_height(), 1)
+        vx0, vx1 = c.canvasx(0) - VistaArbol.MARGEN, c.canvasx(w) + VistaArbol.MARGEN
+        vy0, vy1 = c.canvasy(0) - VistaArbol.MARGEN, c.canvasy(h) + VistaArbol.MARGEN
+        ux0 = (vx0 / e - VistaArbol.MARGEN_X) / VistaArbol.PX_POR_UNIDAD + m["minx"]
+        ux1 = (vx1 / e - VistaArbol.MARGEN_X) / VistaArbol.PX_POR_UNIDAD + m["minx"]
+        base = VistaArbol.MARGEN_Y + VistaArbol.Y0
+        d0 = max(0, math.ceil((vy0 / e - base) / VistaArbol.Y_STEP))
+        d1 = min(len(m["por_nivel"]) - 1, math.floor((vy1 / e - base) / VistaArbol.Y_STEP))
+
+        #Nodos visibles por nivel con búsqueda binaria sobre x
+        claves, tipo, primer, padre = m["claves"], m["tipo"], m["primer"], m["padre"]
+        visibles = {}
+        for d in range(d0, d1 + 1):
+            xs_d, idx_d = m["por_nivel"][d]
+            for i in idx_d[bisect_left(xs_d, ux0):bisect_right(xs_d, ux1)]:
+                visibles[claves[i]] = (i, d)
+        #Aristas: hacia el padre de cada nodo visible y hacia los hijos de los nodos visibles
+        con_arista = {}
+        for k, (i, d) in visibles.items():
+            if padre[i] >= 0:
+                con_arista[k] = (padre[i], i, d)
+            if tipo[i] == 0:
+                for j in range(primer[i], primer[i + 1]):
+                    con_arista[claves[j]] = (i, j, d + 1)
+
+        for k in [k for k in self.dibujados if k not in visibles]:
+            self._liberar(k)
+        for k in [k for k in self.aristas if k not in con_arista]:
+            self._liberar_arista(k)
+
+        xs = m["xs"]
+        lw = max(1, 2 * e)
+        for k, (pi, ci, d) in con_arista.items():
+            coords = (self._px(xs[pi]), self._py(d - 1) + 16 * e, self._px(xs[ci]), self._py(d) - 16 * e)
+            ent = self.aristas.get(k)
+            if ent is None:
+                item = self._tomar("line", coords, width=lw, fill="#5599ff", smooth=True, tags="arista")
+                self.aristas[k] = [item, coords]
+            elif ent[1] != coords:
+                c.coords(ent[0], *coords)
+                ent[1] = coords
+
+        orden = m["orden"]
+        for k, (i, d) in visibles.items():
+            x, y = self._px(xs[i]), self._py(d)
+            ent = self.dibujados.get(k)
+            t = tipo[i]
+            if ent is not None and ent[0] != t:
+                self._liberar(k)
+                ent = None
+            if t == 1:
+                self._dibujar_resumen(k, i, x, y, ent)
+            else:
+                self._dibujar_nodo(k, orden[i], x, y, ent)
+        c.tag_lower("arista")
+
+        #Información del paso, fija en la esquina de la vista
+        pos = (c.canvasx(10), c.canvasy(max(h, 400) - 15))
+        if self.caption is None:
+            self.caption = c.create_text(*pos, text=self.texto_caption, anchor="w", fill="#94a3b8", font=("Arial", 10))
+        else:
+            c.coords(self.caption, *pos)
+            c.itemconfigure(self.caption, text=self.texto_caption)
+        c.tag_raise(self.caption)
+
+    def _dibujar_nodo(self, k, n, x, y, ent):
+        c = self.canvas
+        e = self.escala
+        lab = n.get("sym", "?")
+        w, h, fill, outline, text_color = Arbol.estilo_nodo(lab)
+        if k in self.resaltados:
+            outline, ancho_borde = "#facc15", 3
+        else:
+            ancho_borde = 2
+        coords = (x - w * e / 2, y - h * e / 2, x + w * e / 2, y + h * e / 2)
+        if ent is None:
+            oval = self._tomar("oval", coords, fill=fill, outline=outline, width=ancho_borde)
+            texto = None
+            if e >= VistaArbol.ESCALA_TEXTO:
+                texto = self._tomar("text", (x, y), text=lab, font=("Consolas", max(1, round(11 * e)), "bold"), fill=text_color)
+            self.dibujados[k] = [0, oval, texto, coords, outline]
+            return
+        if ent[3] != coords:
+            c.coords(ent[1], *coords)
+            if ent[2] is not None:
+                c.coords(ent[2], x, y)
+            ent[3] = coords
+        if ent[4] != outline:
+            c.itemconfigure(ent[1], outline=outline, width=ancho_borde)
+            ent[4] = outline
+
+    def _dibujar_resumen(self, k, i, x, y, ent):
+        #Glifo que reemplaza a un subárbol: un rectángulo con la cantidad de nodos
+        c = self.canvas
+        m = self.marco
+        e = self.escala
+        x0 = min(self._px(m["ext_min"][i]), x - 8 * e)
+        x1 = max(self._px(m["ext_max"][i]), x + 8 * e)
+        coords = (x0, y - 12 * e, x1, y + 12 * e)
+        if ent is None:
+            rect = self._tomar("rectangle", coords, fill="#334155", outline="#64748b", width=1)
+            texto = None
+            if x1 - x0 >= 24:
+                texto = self._tomar("text", (x, y), text=f"+{m['tam'][i]}", font=("Arial", 8), fill="#e2e8f0")
+            self.dibujados[k] = [1, rect, texto, coords, None]
+        elif ent[3] != coords:
+            c.coords(ent[1], *coords)
+            if ent[2] is not None:
+                c.coords(ent[2], x, y)
+            ent[3] = coords
+
+    def _tomar(self, tipo, coords, **opts):
+        #Reutiliza un item oculto del mismo tipo o crea uno nuevo
+        c = self.canvas
+        libres = self.libres[tipo]
+        if libres:
+            item = libres.pop()
+            c.coords(item, *coords)
+            c.itemconfigure(item, state="normal", **opts)
+            return item
+        return getattr(c, "create_" + tipo)(*coords, **opts)
+
+    def _liberar(self, k):
+        t, item, texto, _, _ = self.dibujados.pop(k)
+        c = self.canvas
+        c.itemconfigure(item, state="hidden")
+        self.libres["oval" if t == 0 else "rectangle"].append(item)
+        if texto is not None:
+            c.itemconfigure(texto, state="hidden")
+            self.libres["text"].append(texto)
+
+    def _liberar_arista(self, k):
+        item = self.aristas.pop(k)[0]
+        self.canvas.itemconfigure(item, state="hidden")
+        self.libres["line"].append(item)